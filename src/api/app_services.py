@@ -1,6 +1,9 @@
+from functools import lru_cache
+
 from ingestion.loader import PDFLoader
 from ingestion.cleaner import Cleaner
-from ingestion.chunker import Chunker
+from ingestion.chunker import Chunker, load_tokenizer
+from ingestion.hashing import ChunkHasher
 from ingestion.version_manager import VersionManager
 
 from rag.pipeline import RAGPipeline
@@ -12,48 +15,65 @@ from rag.llm import LLMInterface
 
 from config.config import AppConfig
 
-from fastapi import Depends
-from pathlib import Path
+from api.resources import AppResources
+
+from fastapi import Depends, Request
 
+
+@lru_cache
 def get_config() -> AppConfig:
     return AppConfig()
 
 
-def get_vectorstore(config: AppConfig = Depends(get_config)) -> VectorStoreBuilder:
-    return VectorStoreBuilder(
-        collection_name=config.CHROMA_COLLECTION,
-        host=config.CHROMA_HOST,
-        port=config.CHROMA_PORT,
-        embedding_model=config.EMBEDDING_MODEL,
-    )
+def get_resources(request: Request) -> AppResources:
+    return request.app.state.resources
 
 
-def get_version_manager(config: AppConfig = Depends(get_config)) -> VersionManager:
-    return VersionManager(Path(config.DATA_VERSION_FILE))
+def get_vectorstore(resources: AppResources = Depends(get_resources)) -> VectorStoreBuilder:
+    return resources.vectorstore
 
 
-def get_versioned_store(vectorstore: VectorStoreBuilder = Depends(get_vectorstore), version_manager: VersionManager = Depends(get_version_manager)) -> VersionedVectorStore:
-    return VersionedVectorStore(store=vectorstore, versions=version_manager)
+def get_version_manager(resources: AppResources = Depends(get_resources)) -> VersionManager:
+    return resources.version_manager
 
 
-def get_llm(config: AppConfig = Depends(get_config)) -> LLMInterface:
-    return LLMInterface(
-        model=config.LLM_MODEL,
-        inference_server_url=config.INFERENCE_SERVER_URL,
-        temperature=config.LLM_TEMPERATURE,
-        max_tokens=config.LLM_MAX_TOKENS,
-    )
+def get_versioned_store(resources: AppResources = Depends(get_resources)) -> VersionedVectorStore:
+    return resources.versioned_store
+
+
+def get_llm(resources: AppResources = Depends(get_resources)) -> LLMInterface:
+    return resources.llm
 
 
 def get_ingestion_components(config: AppConfig = Depends(get_config)):
     return (
-        PDFLoader(config.PDF_LOCATION),
-        Cleaner(),
-        Chunker(
-            chunk_size=config.CHUNK_SIZE,
-            chunk_overlap=config.CHUNK_OVERLAP,
+        PDFLoader(
+            config.PDF_LOCATION,
+            workers=config.PDF_LOADER_WORKERS,
+            chunksize=config.PDF_LOADER_CHUNKSIZE,
         ),
+        Cleaner(workers=config.CLEANER_WORKERS),
+        build_chunker(config),
     )
 
-async def get_rag_pipeline(vectorstore: VectorStoreBuilder = Depends(get_vectorstore), llm: LLMInterface = Depends(get_llm)):
-    return RAGPipeline(vectorstore=vectorstore, llm=llm)
+
+def build_chunker(config: AppConfig) -> Chunker:
+    hasher = ChunkHasher(config.CHUNK_HASH_ALGORITHM)
+
+    if config.CHUNKING == "tokens":
+        return Chunker(
+            chunk_size=config.CHUNK_TOKENS,
+            chunk_overlap=config.CHUNK_TOKEN_OVERLAP,
+            hasher=hasher,
+            tokenizer=load_tokenizer(config.EMBEDDING_MODEL),
+        )
+
+    return Chunker(
+        chunk_size=config.CHUNK_SIZE,
+        chunk_overlap=config.CHUNK_OVERLAP,
+        hasher=hasher,
+    )
+
+
+async def get_rag_pipeline(resources: AppResources = Depends(get_resources)) -> RAGPipeline:
+    return resources.rag_pipeline
@@ -0,0 +1,277 @@
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config.config import AppConfig
+
+from ingestion.hashing import ChunkHasher
+from ingestion.sqlite_version_manager import SQLiteVersionManager
+from ingestion.version_manager import VersionManager
+
+from rag.answer_cache import AnswerCache
+from rag.context import ContextPacker
+from rag.llm import LLMInterface
+from rag.pipeline import RAGPipeline
+from rag.reranker import CrossEncoderReranker
+
+from vectorstore.embedding_cache import EmbeddingCache
+from vectorstore.embedding_executor import EmbeddingExecutor
+from vectorstore.lexical_index import LexicalIndex
+from vectorstore.query_batcher import QueryEmbeddingBatcher
+from vectorstore.vectorstore import VectorStoreBuilder
+from vectorstore.versioned_store import VersionedVectorStore
+
+
+def build_embedding_cache(config: AppConfig) -> Optional[EmbeddingCache]:
+    if not config.EMBEDDING_CACHE_FILE:
+        return None
+    return EmbeddingCache(Path(config.EMBEDDING_CACHE_FILE))
+
+
+def build_vectorstore(config: AppConfig) -> VectorStoreBuilder:
+    return VectorStoreBuilder(
+        collection_name=config.CHROMA_COLLECTION,
+        host=config.CHROMA_HOST,
+        port=config.CHROMA_PORT,
+        embedding_model=config.EMBEDDING_MODEL,
+        embedding_cache=build_embedding_cache(config),
+        backend=config.VECTOR_BACKEND,
+        local_directory=Path(config.VECTOR_INDEX_DIR),
+        quantization=config.VECTOR_QUANTIZATION,
+        rescore_factor=config.VECTOR_RESCORE_FACTOR,
+        embedding_dimension=config.EMBEDDING_DIMENSION or None,
+        embedding_backend=config.EMBEDDING_BACKEND,
+        onnx_directory=Path(config.EMBEDDING_ONNX_DIR),
+        onnx_quantized=config.EMBEDDING_ONNX_QUANTIZED,
+        onnx_threads=config.EMBEDDING_ONNX_THREADS,
+        chunk_hash_algorithm=config.CHUNK_HASH_ALGORITHM,
+    )
+
+
+def build_embedding_executor(config: AppConfig, vectorstore: VectorStoreBuilder) -> Optional[EmbeddingExecutor]:
+    if config.EMBEDDING_EXECUTOR == "none":
+        return None
+
+    return EmbeddingExecutor(
+        embeddings=vectorstore.embedding_model,
+        mode=config.EMBEDDING_EXECUTOR,
+        max_workers=config.EMBEDDING_WORKERS,
+        torch_threads=config.EMBEDDING_TORCH_THREADS,
+        max_queue_size=config.EMBEDDING_QUEUE_SIZE,
+        retry_after=config.EMBEDDING_RETRY_AFTER,
+        factory=vectorstore.embedding_factory,
+    )
+
+
+def build_query_batcher(config: AppConfig, vectorstore: VectorStoreBuilder) -> Optional[QueryEmbeddingBatcher]:
+    if not config.QUERY_BATCHING:
+        return None
+
+    return QueryEmbeddingBatcher(
+        embed_batch=vectorstore.embed_queries,
+        max_batch_size=config.QUERY_BATCH_SIZE,
+        max_wait_ms=config.QUERY_BATCH_WAIT_MS,
+    )
+
+
+def build_version_manager(config: AppConfig):
+    if config.VERSION_BACKEND == "sqlite":
+        # An existing JSON version file is imported the first time the database is opened
+        return SQLiteVersionManager.migrate_json(
+            Path(config.DATA_VERSION_FILE),
+            Path(config.VERSION_DB_FILE),
+            keep_versions=config.VERSION_HISTORY_KEEP,
+        )
+    return VersionManager(Path(config.DATA_VERSION_FILE), keep_versions=config.VERSION_HISTORY_KEEP)
+
+
+def build_lexical_index(config: AppConfig) -> Optional[LexicalIndex]:
+    if not config.HYBRID_RETRIEVAL:
+        return None
+    return LexicalIndex(Path(config.LEXICAL_INDEX_DIR))
+
+
+def build_llm(config: AppConfig) -> LLMInterface:
+    return LLMInterface(
+        model=config.LLM_MODEL,
+        inference_server_url=config.INFERENCE_SERVER_URL,
+        temperature=config.LLM_TEMPERATURE,
+        max_tokens=config.LLM_MAX_TOKENS,
+    )
+
+
+def build_reranker(config: AppConfig, vectorstore: VectorStoreBuilder) -> Optional[CrossEncoderReranker]:
+    if not config.RERANK:
+        return None
+
+    return CrossEncoderReranker(
+        model_name=config.RERANK_MODEL,
+        batch_size=config.RERANK_BATCH_SIZE,
+        cache_size=config.RERANK_CACHE_SIZE,
+        executor=vectorstore.embedding_executor,
+    )
+
+
+# System prompt and message template around the context and question
+PROMPT_OVERHEAD_TOKENS = 150
+
+
+def build_context_packer(config: AppConfig) -> Optional[ContextPacker]:
+    if not config.CONTEXT_PACKING:
+        return None
+
+    max_tokens = config.CONTEXT_MAX_TOKENS
+    if max_tokens <= 0:
+        # Whatever the context window leaves after the answer and the prompt template
+        max_tokens = max(config.LLM_CONTEXT_WINDOW - config.LLM_MAX_TOKENS - PROMPT_OVERHEAD_TOKENS, 0)
+
+    return ContextPacker(max_tokens=max_tokens, duplicate_threshold=config.CONTEXT_DUPLICATE_THRESHOLD)
+
+
+def build_answer_cache(config: AppConfig) -> Optional[AnswerCache]:
+    if not config.ANSWER_CACHE:
+        return None
+
+    return AnswerCache(
+        ttl_seconds=config.ANSWER_CACHE_TTL_SECONDS,
+        max_entries=config.ANSWER_CACHE_MAX_ENTRIES,
+        max_bytes=config.ANSWER_CACHE_MAX_BYTES,
+        semantic_distance=config.ANSWER_CACHE_SEMANTIC_DISTANCE,
+        generation_file=Path(config.INDEX_GENERATION_FILE),
+    )
+
+
+class AppResources:
+    """
+    Process-wide registry of the expensive clients used by the API.
+
+    Built once in the app lifespan and stored on ``app.state.resources`` so
+    that request dependencies hand out shared instances instead of loading
+    the embedding model and opening new clients per request.
+    """
+
+    def __init__(self, config: AppConfig):
+        self.config = config
+
+        self.vectorstore: Optional[VectorStoreBuilder] = None
+        self.version_manager: Optional[VersionManager] = None
+        self.lexical_index: Optional[LexicalIndex] = None
+        self.versioned_store: Optional[VersionedVectorStore] = None
+        self.llm: Optional[LLMInterface] = None
+        self.answer_cache: Optional[AnswerCache] = None
+        self.reranker: Optional[CrossEncoderReranker] = None
+        self.context_packer: Optional[ContextPacker] = None
+        self.rag_pipeline: Optional[RAGPipeline] = None
+
+        self.started = False
+
+    def start(self):
+        if self.started:
+            return
+
+        self.vectorstore = build_vectorstore(self.config)
+        self.vectorstore.ensure_dimension()
+        self.vectorstore.embedding_executor = build_embedding_executor(self.config, self.vectorstore)
+        self.vectorstore.query_batcher = build_query_batcher(self.config, self.vectorstore)
+        self.version_manager = build_version_manager(self.config)
+        self.lexical_index = build_lexical_index(self.config)
+        self.versioned_store = VersionedVectorStore(
+            store=self.vectorstore,
+            versions=self.version_manager,
+            batch_size=self.config.INGEST_BATCH_SIZE,
+            max_retries=self.config.INGEST_MAX_RETRIES,
+            hasher=ChunkHasher(self.config.CHUNK_HASH_ALGORITHM),
+            lexical_index=self.lexical_index,
+            generation_file=Path(self.config.INDEX_GENERATION_FILE),
+        )
+        self.llm = build_llm(self.config)
+
+        self.answer_cache = build_answer_cache(self.config)
+        if self.answer_cache is not None:
+            self.versioned_store.subscribe(self.answer_cache.invalidate)
+
+        self.reranker = build_reranker(self.config, self.vectorstore)
+        self.context_packer = build_context_packer(self.config)
+        self.rag_pipeline = RAGPipeline(
+            vectorstore=self.vectorstore,
+            llm=self.llm,
+            cache=self.answer_cache,
+            lexical_index=self.lexical_index,
+            hybrid_candidates=self.config.HYBRID_CANDIDATES,
+            rrf_k=self.config.RRF_K,
+            packer=self.context_packer,
+            reranker=self.reranker,
+            rerank_candidates=self.config.RERANK_CANDIDATES,
+        )
+
+        self.started = True
+
+    def warm_up(self):
+        # Force the embedding weights into memory before the first request
+        self.vectorstore.embedding_model.embed_query("warm-up")
+        if self.reranker is not None:
+            self.reranker.warm_up()
+
+    def health(self) -> Dict[str, str]:
+        if not self.started:
+            return {"vectorstore": "not started", "llm": "not started"}
+
+        components = {}
+
+        try:
+            self.vectorstore.heartbeat()
+            components["vectorstore"] = "OK"
+        except Exception as e:
+            components["vectorstore"] = f"unavailable: {e}"
+
+        try:
+            self.llm.heartbeat(self.config.LLM_HEALTH_TIMEOUT)
+            components["llm"] = "OK"
+        except Exception as e:
+            components["llm"] = f"unavailable: {e}"
+
+        return components
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {}
+        if not self.started:
+            return stats
+
+        if self.vectorstore.embedding_executor is not None:
+            stats["embedding_executor"] = self.vectorstore.embedding_executor.stats()
+        if self.vectorstore.query_batcher is not None:
+            stats["query_batcher"] = self.vectorstore.query_batcher.stats()
+        if self.vectorstore.embedding_cache is not None:
+            stats["embedding_cache"] = {
+                "hits": self.vectorstore.cached_embeddings.hits,
+                "misses": self.vectorstore.cached_embeddings.misses,
+            }
+        if self.vectorstore.backend == "local":
+            stats["vector_store"] = {
+                "chunks": self.vectorstore.vector_store.size,
+                "quantization": self.vectorstore.vector_store.quantization,
+                "bytes_per_chunk": self.vectorstore.vector_store.bytes_per_chunk,
+            }
+        if self.answer_cache is not None:
+            stats["answer_cache"] = self.answer_cache.stats()
+        if self.lexical_index is not None:
+            stats["lexical_index"] = {"chunks": self.lexical_index.size}
+        if self.reranker is not None:
+            stats["reranker"] = self.reranker.stats()
+        if self.context_packer is not None:
+            stats["context_packing"] = self.context_packer.stats()
+
+        stats["time_to_first_token"] = self.rag_pipeline.time_to_first_token.snapshot()
+
+        return stats
+
+    async def close(self):
+        if not self.started:
+            return
+
+        await self.llm.aclose()
+        self.vectorstore.close()
+        self.version_manager.close()
+        if self.lexical_index is not None:
+            self.lexical_index.close()
+
+        self.started = False
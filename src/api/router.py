@@ -1,23 +1,126 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 
 from rag.pipeline import RAGPipeline
 
 from api.schemas import HealthCheck, LLMQuestion, LLMAnswer
-from api.app_services import get_rag_pipeline
+from api.app_services import get_rag_pipeline, get_resources
+from api.resources import AppResources
+
+from vectorstore.embedding_executor import EmbeddingQueueFull
+from vectorstore.filters import MetadataFilter
 
 from api.app_services import get_config
 
 api_router = APIRouter()
 
 @api_router.get('/health', response_model=HealthCheck)
-def check_health_status() -> HealthCheck:
+def check_health_status(request: Request) -> HealthCheck:
+    resources = getattr(request.app.state, "resources", None)
+    if resources is None:
+        return HealthCheck(status="OK")
+
+    components = resources.health()
+    status = "OK" if all(state == "OK" for state in components.values()) else "DEGRADED"
+
+    return HealthCheck(status=status, components=components)
+
+
+@api_router.get('/health/live', response_model=HealthCheck)
+def check_liveness() -> HealthCheck:
+    # The process is up and serving; dependencies are covered by readiness
     return HealthCheck(status="OK")
 
 
+@api_router.get('/health/ready', response_model=HealthCheck)
+def check_readiness(request: Request, response: Response) -> HealthCheck:
+    resources = getattr(request.app.state, "resources", None)
+    if resources is None:
+        response.status_code = 503
+        return HealthCheck(status="NOT_READY")
+
+    components = resources.health()
+
+    ingestion = getattr(request.app.state, "ingestion", None)
+    if ingestion is not None:
+        components["ingestion"] = ingestion.status()["state"]
+
+    ready = all(components[name] == "OK" for name in ("vectorstore", "llm"))
+    if ready and get_config().READY_REQUIRES_INGESTION and ingestion is not None:
+        ready = components["ingestion"] == "completed"
+
+    if not ready:
+        response.status_code = 503
+        return HealthCheck(status="NOT_READY", components=components)
+
+    return HealthCheck(status="OK", components=components)
+
+
+@api_router.get('/ingest/status')
+def get_ingestion_status(request: Request) -> dict:
+    ingestion = getattr(request.app.state, "ingestion", None)
+    if ingestion is None:
+        return {"state": "disabled"}
+    return ingestion.status()
+
+
+@api_router.get('/stats')
+def get_stats(resources: AppResources = Depends(get_resources)) -> dict:
+    return resources.stats()
+
+
+def metadata_filter(payload: LLMQuestion) -> MetadataFilter:
+    return MetadataFilter(
+        document_ids=tuple(payload.document_ids),
+        sources=tuple(payload.sources),
+        year_from=payload.year_from,
+        year_to=payload.year_to,
+    )
+
+
 @api_router.post('/ask', response_model=LLMAnswer)
 async def ask_question(payload: LLMQuestion, rag: RAGPipeline = Depends(get_rag_pipeline)) -> LLMAnswer:
     try:
         config = get_config()
-        return await rag.ask(payload.question, config.N_SOURCE_RETRIEVAL)
+        return await rag.ask(payload.question, config.N_SOURCE_RETRIEVAL, filters=metadata_filter(payload))
+    except EmbeddingQueueFull as e:
+        raise HTTPException(status_code=503, detail="Server busy", headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        raise HTTPException(status_code=500)
+
+
+def format_sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@api_router.post('/ask/stream')
+async def ask_question_stream(payload: LLMQuestion, request: Request, rag: RAGPipeline = Depends(get_rag_pipeline)) -> StreamingResponse:
+    config = get_config()
+    events = rag.ask_stream(payload.question, config.N_SOURCE_RETRIEVAL, filters=metadata_filter(payload))
+
+    # Run retrieval before the response starts so failures still map to a status code
+    try:
+        first_event = await events.__anext__()
+    except EmbeddingQueueFull as e:
+        await events.aclose()
+        raise HTTPException(status_code=503, detail="Server busy", headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
-        raise HTTPException(status_code=500)
\ No newline at end of file
+        await events.aclose()
+        raise HTTPException(status_code=500)
+
+    async def event_stream():
+        try:
+            yield format_sse(first_event["event"], first_event["data"])
+            async for event in events:
+                if await request.is_disconnected():
+                    break
+                yield format_sse(event["event"], event["data"])
+        except Exception:
+            yield format_sse("error", {"detail": "Generation failed"})
+        finally:
+            # Cancels the upstream generation if the client went away mid-stream
+            await events.aclose()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -1,9 +1,10 @@
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional
 
 class HealthCheck(BaseModel):
 
     status: str = "OK"
+    components: Dict[str, str] = {}
 
 
 class Source(BaseModel):
@@ -15,7 +16,14 @@ class Source(BaseModel):
 class LLMAnswer(BaseModel):
     answer: str
     sources: List[Source]
+    # Prompt-token accounting of context packing; absent for cached answers
+    context: Optional[Dict[str, int]] = None
 
 
 class LLMQuestion(BaseModel):
-    question: str
\ No newline at end of file
+    question: str
+    # Optional retrieval filters; chunks must match all of the fields that are set
+    document_ids: List[str] = []
+    sources: List[str] = []
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
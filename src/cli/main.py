@@ -0,0 +1,207 @@
+"""
+Command line entry point.
+
+    ntt-rag ingest [--workers N] [--concurrency N] [--batch-size N] [--dry-run] [--since DATE]
+    ntt-rag snapshot DIR
+    ntt-rag restore DIR
+"""
+import argparse
+import json
+import shutil
+import signal
+import sqlite3
+import sys
+
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from api.app_services import get_ingestion_components
+from api.resources import build_lexical_index, build_vectorstore, build_version_manager
+from config.config import AppConfig
+from ingestion.checkpoint import IngestCheckpoint
+from ingestion.hashing import ChunkHasher
+from ingestion.runner import IngestionRunner
+from vectorstore.local_store import IndexLocked, LocalVectorStore, locked_directory
+from vectorstore.versioned_store import VersionedVectorStore
+
+
+def parse_since(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an ISO date or datetime, got {value!r}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="ntt-rag")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="index the PDF directory into Chroma")
+    ingest.add_argument("--workers", type=int, help="PDF parsing processes (NTT_RAG_PDF_LOADER_WORKERS)")
+    ingest.add_argument("--concurrency", type=int, help="documents ingested at once (NTT_RAG_INGEST_CONCURRENCY)")
+    ingest.add_argument("--batch-size", type=int, help="chunks per Chroma upsert (NTT_RAG_INGEST_BATCH_SIZE)")
+    ingest.add_argument("--dry-run", action="store_true", help="report what would be added or deleted without writing anything")
+    ingest.add_argument("--since", type=parse_since, help="only consider files modified at or after this ISO date/datetime")
+    ingest.add_argument("--checkpoint", type=Path, default=Path(".ingest_checkpoint"), help="file recording finished sources")
+    ingest.add_argument("--restart", action="store_true", help="ignore an existing checkpoint and start over")
+
+    snapshot = commands.add_parser("snapshot", help="copy the local vector index (NTT_RAG_VECTOR_BACKEND=local) to a directory")
+    snapshot.add_argument("target", type=Path)
+
+    restore = commands.add_parser("restore", help="replace the local vector index with a snapshot; stop the API and any ingest first")
+    restore.add_argument("snapshot", type=Path)
+
+    return parser
+
+
+def version_files(config: AppConfig) -> List[Path]:
+    # The version state says which chunks are indexed, so it travels with the index
+    return [Path(config.DATA_VERSION_FILE), Path(config.VERSION_DB_FILE)]
+
+
+def local_index(config: AppConfig) -> Optional[Path]:
+    if config.VECTOR_BACKEND != "local":
+        print(f"Snapshots need NTT_RAG_VECTOR_BACKEND=local, not {config.VECTOR_BACKEND!r}", file=sys.stderr)
+        return None
+    return Path(config.VECTOR_INDEX_DIR)
+
+
+def snapshot(args: argparse.Namespace, config: AppConfig) -> int:
+    index = local_index(config)
+    if index is None:
+        return 1
+
+    try:
+        # The shared lock keeps writers out until the copy is complete
+        with locked_directory(index, shared=True):
+            store = LocalVectorStore(index, read_only=True)
+            try:
+                store.snapshot(args.target / "index")
+                for path in version_files(config):
+                    if path.suffix == ".db" and path.exists():
+                        source, destination = sqlite3.connect(str(path)), sqlite3.connect(str(args.target / path.name))
+                        source.backup(destination)
+                        source.close()
+                        destination.close()
+                    elif path.exists():
+                        shutil.copy2(path, args.target / path.name)
+                print(f"Copied {store.size} chunks from {index} to {args.target}")
+            finally:
+                store.close()
+    except (FileNotFoundError, IndexLocked) as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+def restore(args: argparse.Namespace, config: AppConfig) -> int:
+    index = local_index(config)
+    if index is None:
+        return 1
+
+    index.mkdir(parents=True, exist_ok=True)
+    try:
+        with locked_directory(index):
+            LocalVectorStore.restore(args.snapshot / "index", index)
+            for path in version_files(config):
+                for stale in [path, path.with_name(path.name + "-wal"), path.with_name(path.name + "-shm")]:
+                    stale.unlink(missing_ok=True)
+                if (args.snapshot / path.name).exists():
+                    shutil.copy2(args.snapshot / path.name, path)
+    except (FileNotFoundError, IndexLocked) as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    print(f"Restored {index} from {args.snapshot}")
+    return 0
+
+
+def ingest(args: argparse.Namespace, config: AppConfig) -> int:
+    overrides = {
+        "PDF_LOADER_WORKERS": args.workers,
+        "INGEST_CONCURRENCY": args.concurrency,
+        "INGEST_BATCH_SIZE": args.batch_size,
+    }
+    config = config.model_copy(update={k: v for k, v in overrides.items() if v is not None})
+
+    loader, cleaner, chunker = get_ingestion_components(config)
+    versions = build_version_manager(config)
+
+    # A dry run only reads version state, so it needs neither the model nor Chroma
+    try:
+        store = None if args.dry_run else build_vectorstore(config)
+    except IndexLocked as e:
+        versions.close()
+        print(e, file=sys.stderr)
+        return 1
+    if store is not None:
+        store.ensure_dimension()
+    lexical_index = None if args.dry_run else build_lexical_index(config)
+    versioned_store = VersionedVectorStore(
+        store=store,
+        versions=versions,
+        batch_size=config.INGEST_BATCH_SIZE,
+        max_retries=config.INGEST_MAX_RETRIES,
+        hasher=ChunkHasher(config.CHUNK_HASH_ALGORITHM),
+        lexical_index=lexical_index,
+        # Tells a running API that its cached answers are stale
+        generation_file=None if args.dry_run else Path(config.INDEX_GENERATION_FILE),
+    )
+
+    checkpoint = None
+    if not args.dry_run:
+        if args.restart:
+            args.checkpoint.unlink(missing_ok=True)
+        checkpoint = IngestCheckpoint(args.checkpoint)
+        if checkpoint.completed:
+            print(f"Resuming: {len(checkpoint.completed)} sources already ingested according to {args.checkpoint}")
+
+    runner = IngestionRunner(
+        loader,
+        cleaner,
+        chunker,
+        versioned_store,
+        fingerprint_content=config.FINGERPRINT_CONTENT_HASH,
+        concurrency=config.INGEST_CONCURRENCY,
+        dry_run=args.dry_run,
+        checkpoint=checkpoint,
+        since=args.since,
+    )
+
+    # Ctrl-C finishes the document in progress; the checkpoint covers the rest
+    signal.signal(signal.SIGINT, lambda *_: runner.cancel())
+
+    try:
+        status = runner.run()
+    finally:
+        if store is not None:
+            store.close()
+        if lexical_index is not None:
+            lexical_index.close()
+        versions.close()
+
+    print(json.dumps(status, indent=2))
+    if loader.errors:
+        print(f"{len(loader.errors)} files could not be parsed:", file=sys.stderr)
+        for path, error in loader.errors.items():
+            print(f"  {path}: {error}", file=sys.stderr)
+
+    return 0 if status["state"] == "completed" else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    config = AppConfig()
+
+    if args.command == "ingest":
+        return ingest(args, config)
+    if args.command == "snapshot":
+        return snapshot(args, config)
+    if args.command == "restore":
+        return restore(args, config)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,20 +11,75 @@ class BaseConfig(BaseSettings):
     INFERENCE_SERVER_URL: str = Field(..., alias="NTT_RAG_INFERENCE_SERVER_URL")
     LLM_MAX_TOKENS: int = 512
     LLM_TEMPERATURE: float = 0.0
+    LLM_HEALTH_TIMEOUT: float = 2.0
 
     CHROMA_HOST: str = "localhost"
     CHROMA_PORT: int = 8000
     CHROMA_COLLECTION: str = "ntt-rag"
+    VECTOR_BACKEND: str = "chroma"
+    VECTOR_INDEX_DIR: str = ".vector_index"
+    VECTOR_QUANTIZATION: str = "none"
+    VECTOR_RESCORE_FACTOR: int = 0
     EMBEDDING_MODEL: str = "Qwen/Qwen3-Embedding-0.6B"
+    EMBEDDING_DIMENSION: int = 0
+    EMBEDDING_BACKEND: str = "torch"
+    EMBEDDING_ONNX_DIR: str = ".onnx_embeddings"
+    EMBEDDING_ONNX_QUANTIZED: bool = False
+    EMBEDDING_ONNX_THREADS: int = 0
+    EMBEDDING_WARMUP: bool = True
+    EMBEDDING_CACHE_FILE: str = ""
+    EMBEDDING_EXECUTOR: str = "thread"
+    EMBEDDING_WORKERS: int = 1
+    EMBEDDING_TORCH_THREADS: int = 0
+    EMBEDDING_QUEUE_SIZE: int = 64
+    EMBEDDING_RETRY_AFTER: int = 1
+    QUERY_BATCHING: bool = True
+    QUERY_BATCH_SIZE: int = 32
+    QUERY_BATCH_WAIT_MS: float = 5.0
 
     PDF_LOCATION: str = Field(..., alias="NTT_RAG_PDF_LOCATION")
     DATA_VERSION_FILE: str = ".document_versions.json"
+    VERSION_BACKEND: str = "json"
+    VERSION_DB_FILE: str = ".document_versions.db"
+    VERSION_HISTORY_KEEP: int = 0
+    INDEX_GENERATION_FILE: str = ".index_generation"
+    PDF_LOADER_WORKERS: int = 1
+    PDF_LOADER_CHUNKSIZE: int = 4
+    CLEANER_WORKERS: int = 1
+    FINGERPRINT_CONTENT_HASH: bool = False
+    INGEST_BATCH_SIZE: int = 256
+    INGEST_MAX_RETRIES: int = 3
+    INGEST_CONCURRENCY: int = 1
     CHUNK_SIZE: int = 880
     CHUNK_OVERLAP: int = 100
+    CHUNKING: str = "chars"
+    CHUNK_TOKENS: int = 256
+    CHUNK_TOKEN_OVERLAP: int = 32
+    CHUNK_HASH_ALGORITHM: str = "sha256"
     N_SOURCE_RETRIEVAL: int = 20
+    HYBRID_RETRIEVAL: bool = False
+    LEXICAL_INDEX_DIR: str = ".lexical_index"
+    HYBRID_CANDIDATES: int = 50
+    RRF_K: int = 60
+    RERANK: bool = False
+    RERANK_MODEL: str = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+    RERANK_CANDIDATES: int = 30
+    RERANK_BATCH_SIZE: int = 32
+    RERANK_CACHE_SIZE: int = 10000
+    CONTEXT_PACKING: bool = True
+    LLM_CONTEXT_WINDOW: int = 4096
+    CONTEXT_MAX_TOKENS: int = 0
+    CONTEXT_DUPLICATE_THRESHOLD: float = 0.9
+
+    ANSWER_CACHE: bool = True
+    ANSWER_CACHE_TTL_SECONDS: int = 3600
+    ANSWER_CACHE_MAX_ENTRIES: int = 1024
+    ANSWER_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    ANSWER_CACHE_SEMANTIC_DISTANCE: float = 0.05
 
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 9632
+    READY_REQUIRES_INGESTION: bool = False
 
     model_config = SettingsConfigDict(
         env_prefix="NTT_RAG_",
@@ -0,0 +1,38 @@
+import threading
+
+from pathlib import Path
+from typing import Set
+
+
+class IngestCheckpoint:
+    """
+    Append-only record of the sources an ingestion run has finished, one path per line,
+    so an interrupted run can skip them without re-reading the files. Removed once a
+    run completes.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.completed: Set[str] = self._load()
+
+    def _load(self) -> Set[str]:
+        if not self.path.exists():
+            return set()
+        # A run killed mid-write leaves at most one partial line without a newline
+        lines = self.path.read_text().split("\n")
+        return set(line for line in lines[:-1] if line)
+
+    def __contains__(self, source: str) -> bool:
+        return source in self.completed
+
+    def mark(self, source: str):
+        with self._lock:
+            self.completed.add(source)
+            with self.path.open("a") as f:
+                f.write(source + "\n")
+
+    def clear(self):
+        with self._lock:
+            self.completed.clear()
+            self.path.unlink(missing_ok=True)
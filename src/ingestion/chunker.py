@@ -1,13 +1,38 @@
-import hashlib
-
-from typing import List
+from typing import Any, Iterable, Iterator, List, Optional
 
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from ingestion.hashing import ChunkHasher
+
+
+def load_tokenizer(model_name: str):
+    # transformers comes with sentence-transformers; imported lazily as only token chunking needs it
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(model_name)
+
 
 class Chunker:
-    def __init__(self, chunk_size: int = 800, chunk_overlap: int = 150):
+    """
+    Splits pages into chunks of ``chunk_size`` characters, or tokens of ``tokenizer``
+    when one is given so chunks line up with what the embedding model sees.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 800,
+        chunk_overlap: int = 150,
+        hasher: Optional[ChunkHasher] = None,
+        tokenizer: Optional[Any] = None,
+    ):
+        self.hasher = hasher or ChunkHasher()
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.tokenizer = tokenizer
+        if tokenizer is not None and chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+
         self.chunker = RecursiveCharacterTextSplitter(
             chunk_size = chunk_size,
             chunk_overlap = chunk_overlap,
@@ -16,10 +41,43 @@ class Chunker:
 
 
     def chunk(self, documents: List[Document]) -> List[Document]:
-        chunks = self.chunker.split_documents(documents)
+        return list(self.chunk_iter(documents))
 
+    def chunk_iter(self, documents: Iterable[Document]) -> Iterator[Document]:
         chunk_counters = {}
 
+        for document in documents:
+            yield from self._chunk_document(document, chunk_counters)
+
+    def _split_tokens(self, document: Document) -> List[Document]:
+        """
+        Tokenizes the page once and slices the text at token offsets, so overlapping
+        windows are never re-tokenized or decoded.
+        """
+        text = document.page_content
+        encoding = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        offsets = [(start, end) for start, end in encoding["offset_mapping"] if end > start]
+
+        chunks = []
+        step = self.chunk_size - self.chunk_overlap
+        for first in range(0, len(offsets), step):
+            last = min(first + self.chunk_size, len(offsets)) - 1
+            metadata = dict(document.metadata, token_count=last - first + 1)
+            # Byte-level BPE offsets can include the space before a word
+            content = text[offsets[first][0]:offsets[last][1]].strip()
+            chunks.append(Document(page_content=content, metadata=metadata))
+
+            if last == len(offsets) - 1:
+                break
+
+        return chunks
+
+    def _chunk_document(self, document: Document, chunk_counters: dict) -> List[Document]:
+        if self.tokenizer is not None:
+            chunks = self._split_tokens(document)
+        else:
+            chunks = self.chunker.split_documents([document])
+
         for chunk in chunks:
             source = chunk.metadata.get("source", "unknown")
             page = chunk.metadata.get("page", -1)
@@ -28,16 +86,16 @@ class Chunker:
             chunk_index = chunk_counters.get(key, 0)
             chunk_counters[key] = chunk_index + 1
 
-            content_fingerprint = chunk.page_content.strip()
-
-            raw_id = f"{page}::{chunk_index}::{content_fingerprint}"
-            chunk_id = hashlib.sha256(raw_id.encode("utf-8")).hexdigest()
+            # Hashed once here; the version store and document hash reuse it
+            content_hash = self.hasher.content_hash(chunk.page_content)
+            chunk_id = self.hasher.chunk_id(page, chunk_index, chunk.page_content, content_hash)
 
             chunk.metadata.update({
                 "file_name": source.split("/")[-1],
                 "page": page,
                 "chunk_index": chunk_index,
-                "chunk_id": chunk_id
+                "chunk_id": chunk_id,
+                "content_hash": content_hash,
             })
             
         return chunks
\ No newline at end of file
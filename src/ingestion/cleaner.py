@@ -1,43 +1,77 @@
 import re
 import unicodedata
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List
 
 from langchain_core.documents import Document
 
+# Private Use Area glyphs that PDF fonts leak into extracted text
+_PRIVATE_USE = re.compile("[\ue000-\uf8ff]")
+_HYPHENATION = re.compile(r"(\w)-\n(\w)")
+_NEWLINES = re.compile(r"\n{3,}")
+_SPACES = re.compile(r"[ \t]{2,}")
+
+
+def clean_text(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text)
+
+    # Remove Private Use Area glyphs
+    text = _PRIVATE_USE.sub(" ", text)
+
+    # Fix hyphenation across line breaks; the regex tests every word character, so skip it when it can't match
+    if "-\n" in text:
+        text = _HYPHENATION.sub(r"\1\2", text)
+
+    # Normalize line breaks
+    text = text.replace("\r\n", "\n")
+
+    # Collapse excessive newlines
+    text = _NEWLINES.sub("\n\n", text)
+
+    # Collapse multiple spaces
+    text = _SPACES.sub(" ", text)
+
+    return text.strip()
+
 
 class Cleaner:
     """
     Cleans PDF-extracted documents for RAG consumption.
+
+    With ``workers`` above 1, pages are cleaned on a process pool in batches of
+    ``chunksize`` per worker; ``clean_iter()`` keeps one batch in memory at a time.
     """
 
+    def __init__(self, workers: int = 1, chunksize: int = 64):
+        self.workers = workers
+        self.chunksize = chunksize
+
     def clean(self, documents: List[Document]) -> List[Document]:
-        return [
-            Document(
+        if self.workers <= 1 or len(documents) <= self.chunksize:
+            return list(self._clean_serial(documents))
+        return list(self._clean_parallel(documents))
+
+    def clean_iter(self, documents: Iterable[Document]) -> Iterator[Document]:
+        if self.workers <= 1:
+            return self._clean_serial(documents)
+        return self._clean_parallel(documents)
+
+    def _clean_serial(self, documents: Iterable[Document]) -> Iterator[Document]:
+        for doc in documents:
+            yield Document(
                 page_content=self._clean_text(doc.page_content),
                 metadata=dict(doc.metadata),
             )
-            for doc in documents
-        ]
-
-    def _clean_text(self, text: str) -> str:
-        text = unicodedata.normalize("NFKC", text)
 
-        # Remove Private Use Area glyphs
-        text = "".join(
-            " " if 0xE000 <= ord(ch) <= 0xF8FF else ch
-            for ch in text
-        )
+    def _clean_parallel(self, documents: Iterable[Document]) -> Iterator[Document]:
+        # Closing the generator early shuts the pool down
+        documents = iter(documents)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while batch := list(islice(documents, self.chunksize * self.workers)):
+                texts = pool.map(clean_text, [doc.page_content for doc in batch], chunksize=self.chunksize)
+                for doc, text in zip(batch, texts):
+                    yield Document(page_content=text, metadata=dict(doc.metadata))
 
-        # Fix hyphenation across line breaks
-        text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
-
-        # Normalize line breaks
-        text = text.replace("\r\n", "\n")
-
-        # Collapse excessive newlines
-        text = re.sub(r"\n{3,}", "\n\n", text)
-
-        # Collapse multiple spaces
-        text = re.sub(r"[ \t]{2,}", " ", text)
-
-        return text.strip()
+    def _clean_text(self, text: str) -> str:
+        return clean_text(text)
@@ -0,0 +1,73 @@
+import hashlib
+
+from functools import partial
+from typing import Callable, List
+
+from langchain_core.documents import Document
+
+from ingestion.version_manager import hash_chunk_content, hash_document_chunks
+
+HASH_ALGORITHMS = ("sha256", "blake2b", "xxhash")
+
+
+def _hash_factory(algorithm: str) -> Callable:
+    if algorithm == "sha256":
+        return hashlib.sha256
+    if algorithm == "blake2b":
+        return partial(hashlib.blake2b, digest_size=16)
+    if algorithm == "xxhash":
+        try:
+            import xxhash
+        except ImportError:
+            raise ImportError("The xxhash chunk hash algorithm requires the xxhash package: pip install xxhash")
+        return xxhash.xxh3_128
+    raise ValueError(f"Unknown chunk hash algorithm {algorithm!r}, expected one of {HASH_ALGORITHMS}")
+
+
+class ChunkHasher:
+    """
+    Computes the content hash, chunk id and document hash of chunks, hashing the
+    text of each chunk once.
+
+    ``sha256`` is the compatibility mode: it reproduces the ids and hashes stored
+    in existing version files and Chroma collections, at the cost of hashing the
+    text twice per chunk and once more per document. The other algorithms derive
+    the chunk id and document hash from the per-chunk content hash. Switching
+    algorithms changes every chunk id, so the next ingest replaces each document's
+    chunks once.
+    """
+
+    def __init__(self, algorithm: str = "sha256"):
+        self.algorithm = algorithm
+        self._new = _hash_factory(algorithm)
+        self.compatible = algorithm == "sha256"
+
+    def digest(self, text: str) -> str:
+        return self._new(text.encode("utf-8")).hexdigest()
+
+    def content_hash(self, text: str) -> str:
+        if self.compatible:
+            return hash_chunk_content(text)
+        return self.digest(text)
+
+    def chunk_id(self, page: int, chunk_index: int, text: str, content_hash: str) -> str:
+        if self.compatible:
+            return self.digest(f"{page}::{chunk_index}::{text.strip()}")
+        return self.digest(f"{page}::{chunk_index}::{content_hash}")
+
+    def document_hash(self, chunks: List[Document]) -> str:
+        if self.compatible:
+            return hash_document_chunks(chunks)
+
+        h = self._new()
+        for chunk in sorted(chunks, key=lambda c: c.metadata["chunk_id"]):
+            h.update(chunk.metadata["chunk_id"].encode("utf-8"))
+            h.update(self.chunk_content_hash(chunk).encode("utf-8"))
+        return h.hexdigest()
+
+    def chunk_content_hash(self, chunk: Document) -> str:
+        # Chunks from Chunker carry their hash; others (older callers, tests) are hashed here
+        content_hash = chunk.metadata.get("content_hash")
+        if content_hash is None:
+            content_hash = self.content_hash(chunk.page_content)
+        return content_hash
@@ -1,15 +1,43 @@
+import logging
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
 from langchain_community.document_loaders import PyMuPDFLoader, DirectoryLoader
 from langchain_core.documents import Document
 
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def load_pdf(path: str) -> Tuple[str, List[Document], Optional[str]]:
+    # Runs in a worker process; errors are returned instead of raised so one bad file can't abort the run
+    try:
+        return path, PyMuPDFLoader(path).load(), None
+    except Exception as e:
+        # Logged here, where the traceback is, rather than by the parent process
+        logger.warning("Failed to load %s", path, exc_info=e)
+        return path, [], f"{type(e).__name__}: {e}"
+
+
+def load_pdfs(paths: List[str]) -> List[Tuple[str, List[Document], Optional[str]]]:
+    return [load_pdf(path) for path in paths]
 
 
 class PDFLoader:
-    def __init__(self, input_directory: str):
+    def __init__(self, input_directory: str, workers: int = 1, chunksize: int = 4):
         self.input_directory = input_directory
+        self.workers = workers
+        self.chunksize = chunksize
         self.loader = None
+        self.errors: Dict[str, str] = {}
 
     def load(self) -> List[Document]:
+        if self.workers > 1:
+            return list(self.lazy_load())
+
         if self.loader == None:
             self.loader = DirectoryLoader(
                 path = self.input_directory,
@@ -19,4 +47,45 @@ class PDFLoader:
 
         return self.loader.load()
 
+    def list_files(self) -> List[str]:
+        # Sorted so parallel output order is deterministic
+        return sorted(
+            str(path) for path in Path(self.input_directory).glob("**/*.pdf")
+            if path.is_file()
+        )
+
+    def lazy_load(self, paths: Optional[List[str]] = None) -> Iterator[Document]:
+        """
+        Yields pages file by file, for ``paths`` or every PDF in the directory.
+        In parallel mode at most ``workers * 2 * chunksize`` parsed files are held
+        in memory at once.
+        """
+        self.errors = {}
+
+        if paths is None:
+            paths = self.list_files()
+
+        for path, pages, error in self._iter_files(paths):
+            if error is not None:
+                self.errors[path] = error
+                continue
+            yield from pages
+
+    def _iter_files(self, paths: List[str]) -> Iterator[Tuple[str, List[Document], Optional[str]]]:
+        if self.workers <= 1:
+            for path in paths:
+                yield load_pdf(path)
+            return
+
+        batches = (paths[i:i + self.chunksize] for i in range(0, len(paths), self.chunksize))
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            # Bounded window of in-flight batches, consumed in submission order
+            in_flight = deque(pool.submit(load_pdfs, batch) for batch in islice(batches, self.workers * 2))
 
+            while in_flight:
+                results = in_flight.popleft().result()
+                next_batch = next(batches, None)
+                if next_batch is not None:
+                    in_flight.append(pool.submit(load_pdfs, next_batch))
+                yield from results
@@ -0,0 +1,329 @@
+import logging
+import re
+import threading
+import time
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from ingestion.checkpoint import IngestCheckpoint
+from ingestion.chunker import Chunker
+from ingestion.cleaner import Cleaner
+from ingestion.loader import PDFLoader
+from ingestion.version_manager import file_fingerprint
+from vectorstore.versioned_store import VersionedVectorStore
+
+logger = logging.getLogger(__name__)
+
+
+def derive_document_id(source: str) -> str:
+    """
+    sr_2015_yyyymmdd_v01.pdf  -> sr_2015
+    sr_2019_20200101_v03.pdf -> sr_2019
+    """
+    stem = Path(source).stem
+
+    # Remove _YYYYMMDD_vNN
+    stem = re.sub(r"_\d{8}_v\d+$", "", stem)
+
+    return stem.lower()
+
+
+def derive_year(source: str) -> Optional[int]:
+    """
+    sr_2015_yyyymmdd_v01.pdf -> 2015 (the report year, not the publication date)
+    """
+    match = re.search(r"(?<!\d)(?:19|20)\d{2}(?!\d)", derive_document_id(source))
+    return int(match.group()) if match else None
+
+
+def group_by_source(chunks: Iterable[Document]) -> Iterator[Tuple[str, List[Document]]]:
+    """
+    Groups a chunk stream into per-source lists as soon as each source ends.
+
+    Expects the chunks of one source to be contiguous, which is how the loader emits them.
+    """
+    seen = set()
+
+    for source, source_chunks in groupby(chunks, key=lambda c: c.metadata["source"]):
+        if source in seen:
+            # A second partial group would be diffed against the first and undo it
+            raise ValueError(f"Chunks of {source} are not contiguous")
+        seen.add(source)
+
+        yield source, list(source_chunks)
+
+
+class IngestionRunner:
+    """
+    Streams the PDF directory through load, clean, chunk and ingest one source at a
+    time while tracking progress, so it can run in the background and be polled.
+    Peak memory is bounded by the largest document rather than the corpus.
+
+    With ``concurrency`` above 1, up to that many sources are ingested at once on a
+    thread pool while the next ones are parsed. Sources of the same document are
+    still ingested in directory order, so the result matches a serial run.
+
+    ``dry_run`` only diffs each source against the version state. A ``checkpoint``
+    lets an interrupted run skip the sources it already finished; ``since`` skips
+    files last modified before that time.
+    """
+
+    def __init__(
+        self,
+        loader: PDFLoader,
+        cleaner: Cleaner,
+        chunker: Chunker,
+        versioned_store: VersionedVectorStore,
+        fingerprint_content: bool = False,
+        concurrency: int = 1,
+        dry_run: bool = False,
+        checkpoint: Optional[IngestCheckpoint] = None,
+        since: Optional[datetime] = None,
+    ):
+        self.loader = loader
+        self.cleaner = cleaner
+        self.chunker = chunker
+        self.versioned_store = versioned_store
+        self.fingerprint_content = fingerprint_content
+        self.concurrency = max(concurrency, 1)
+        self.dry_run = dry_run
+        self.checkpoint = checkpoint
+        self.since_ns = int(since.timestamp() * 1e9) if since is not None else None
+
+        # Fingerprints of files taken before parsing, recorded once each is ingested
+        self._fingerprints: Dict[str, Dict] = {}
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._status: Dict[str, Any] = {
+            "state": "pending",
+            "dry_run": dry_run,
+            "documents_total": None,
+            "documents_processed": 0,
+            "chunks_added": 0,
+            "chunks_deleted": 0,
+            "documents_skipped": 0,
+            "documents_unchanged": 0,
+            "documents_resumed": 0,
+            "documents_failed": 0,
+            "current_source": None,
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+            "elapsed_seconds": None,
+            "chunks_per_second": None,
+        }
+
+    def run(self) -> Dict[str, Any]:
+        self._update(state="running", started_at=datetime.now().isoformat())
+        started = time.perf_counter()
+
+        pages = None
+        try:
+            if not self.dry_run:
+                self.versioned_store.backfill_lexical_index()
+
+            files = self.loader.list_files()
+            remaining = files
+            if self.checkpoint is not None:
+                remaining = [path for path in files if path not in self.checkpoint]
+
+            pending = self.changed_files(remaining)
+            self._update(
+                documents_total=len(files),
+                documents_resumed=len(files) - len(remaining),
+                documents_unchanged=len(remaining) - len(pending),
+            )
+
+            pages = self.loader.lazy_load(pending)
+            chunks = self.chunker.chunk_iter(self.cleaner.clean_iter(pages))
+            sources = self._with_empty_sources(group_by_source(chunks), pending)
+
+            if self.concurrency > 1:
+                completed = self._ingest_concurrently(sources)
+            else:
+                completed = self._ingest_serially(sources)
+
+            if completed:
+                self._update(state="completed", current_source=None)
+                if self.checkpoint is not None:
+                    self.checkpoint.clear()
+            else:
+                self._update(state="cancelled", current_source=None)
+
+        except Exception as e:
+            self._update(state="failed", error=str(e))
+
+        finally:
+            # Shuts down the loader's worker pool when we stop early
+            if pages is not None:
+                pages.close()
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            # Files that could not be parsed; their names are in loader.errors
+            self._status["documents_failed"] = len(self.loader.errors)
+            self._status["finished_at"] = datetime.now().isoformat()
+            self._status["elapsed_seconds"] = round(elapsed, 3)
+            self._status["chunks_per_second"] = round(self._status["chunks_added"] / elapsed, 1) if elapsed else 0.0
+
+        return self.status()
+
+    def _with_empty_sources(self, sources: Iterator[Tuple[str, List[Document]]], paths: List[str]) -> Iterator[Tuple[str, List[Document]]]:
+        """
+        Inserts files that loaded without yielding a chunk, such as scanned or empty
+        PDFs, as sources with no chunks at their place in the stream, so their
+        fingerprint is recorded and they are not parsed again on the next run.
+        """
+        positions = {path: i for i, path in enumerate(paths)}
+        next_path = 0
+
+        def empty_before(position: int):
+            nonlocal next_path
+            for path in paths[next_path:position]:
+                # Files that failed to load are left to be retried
+                if path not in self.loader.errors:
+                    yield path, []
+            next_path = max(next_path, position + 1)
+
+        for source, source_chunks in sources:
+            if source in positions:
+                yield from empty_before(positions[source])
+            yield source, source_chunks
+
+        yield from empty_before(len(paths))
+
+    def _ingest_serially(self, sources: Iterator[Tuple[str, List[Document]]]) -> bool:
+        for source, source_chunks in sources:
+            if self._stop.is_set():
+                return False
+
+            self._update(current_source=source)
+            self.ingest_source(source, source_chunks)
+
+        return True
+
+    def _ingest_concurrently(self, sources: Iterator[Tuple[str, List[Document]]]) -> bool:
+        """
+        Submits sources to a pool while at most ``concurrency`` are queued or running,
+        so parsing stays only a little ahead of ingestion. The first failure stops
+        submission and is re-raised once in-flight sources have finished.
+        """
+        slots = threading.BoundedSemaphore(self.concurrency)
+        # Last submitted source of each document; the next one waits for it
+        previous: Dict[str, Future] = {}
+        futures: List[Future] = []
+        failed = threading.Event()
+        completed = True
+
+        def ingest_after(source: str, source_chunks: List[Document], before: Optional[Future]):
+            if before is not None:
+                # Earlier submissions are always running or done, so this cannot deadlock
+                before.result()
+            return self.ingest_source(source, source_chunks)
+
+        def release(future: Future):
+            slots.release()
+            if future.exception() is not None:
+                failed.set()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="ingest") as pool:
+            for source, source_chunks in sources:
+                slots.acquire()
+                if self._stop.is_set() or failed.is_set():
+                    slots.release()
+                    completed = False
+                    break
+
+                self._update(current_source=source)
+                document_id = derive_document_id(source)
+                future = pool.submit(ingest_after, source, source_chunks, previous.get(document_id))
+                future.add_done_callback(release)
+                previous[document_id] = future
+                futures.append(future)
+
+        # Surfaces the first failure in submission order
+        for future in futures:
+            future.result()
+
+        return completed
+
+    def changed_files(self, files: List[str]) -> List[str]:
+        """
+        Filters out files whose fingerprint matches the one recorded at their last
+        ingest, or that were last modified before ``since``, so they are never opened.
+        """
+        versions = self.versioned_store.versions
+        pending = []
+
+        for path in files:
+            try:
+                fingerprint = file_fingerprint(path, content_hash=self.fingerprint_content)
+            except OSError:
+                # Left to the loader, which reports unreadable files per file
+                pending.append(path)
+                continue
+
+            if self.since_ns is not None and fingerprint["mtime_ns"] < self.since_ns:
+                continue
+            if versions.is_unchanged(path, fingerprint):
+                continue
+            self._fingerprints[path] = fingerprint
+            pending.append(path)
+
+        return pending
+
+    def ingest_source(self, source: str, chunks) -> Dict[str, Any]:
+        document_id = derive_document_id(source)
+        year = derive_year(source)
+
+        # Filterable fields for retrieval; they are not part of any hash, so chunk ids are unchanged
+        for chunk in chunks:
+            chunk.metadata["document_id"] = document_id
+            if year is not None:
+                chunk.metadata["year"] = year
+
+        if self.dry_run:
+            result = self.versioned_store.diff(document_id=document_id, chunks=chunks)
+        else:
+            result = self.versioned_store.ingest(
+                document_id=document_id,
+                source=source,
+                chunks=chunks,
+                fingerprint=self._fingerprints.pop(source, None),
+            )
+            if self.checkpoint is not None:
+                self.checkpoint.mark(source)
+
+        logger.info("Ingestion result | doc_id=%s | source=%s: %s", document_id, source, result)
+
+        with self._lock:
+            self._status["documents_failed"] = len(self.loader.errors)
+            self._status["documents_processed"] += 1
+            self._status["chunks_added"] += result.get("added", 0)
+            self._status["chunks_deleted"] += result.get("deleted", 0)
+            self._status["documents_skipped"] += int(result.get("skipped", False))
+
+        return result
+
+    def cancel(self):
+        # Takes effect between documents; the document being ingested is finished first
+        self._stop.set()
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._status)
+
+    @property
+    def finished(self) -> bool:
+        return self.status()["state"] in ("completed", "failed", "cancelled")
+
+    def _update(self, **fields):
+        with self._lock:
+            self._status.update(fields)
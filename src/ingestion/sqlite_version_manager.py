@@ -0,0 +1,264 @@
+import json
+import sqlite3
+import threading
+
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Optional
+
+from ingestion.version_manager import VersionStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    document_id TEXT PRIMARY KEY,
+    current_hash TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS versions (
+    document_id TEXT NOT NULL,
+    document_hash TEXT NOT NULL,
+    chunk_count INTEGER NOT NULL,
+    last_indexed TEXT NOT NULL,
+    PRIMARY KEY (document_id, document_hash)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS chunks (
+    document_id TEXT NOT NULL,
+    document_hash TEXT NOT NULL,
+    chunk_id TEXT NOT NULL,
+    chunk_hash TEXT NOT NULL,
+    PRIMARY KEY (document_id, document_hash, chunk_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS sources (
+    document_id TEXT NOT NULL,
+    document_hash TEXT NOT NULL,
+    source TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (document_id, document_hash, source)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS fingerprints (
+    source TEXT PRIMARY KEY,
+    document_id TEXT NOT NULL,
+    fingerprint TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS fingerprints_document ON fingerprints (document_id);
+"""
+
+
+class SQLiteVersionManager(VersionStore):
+    """
+    ``VersionManager`` backed by SQLite in WAL mode.
+
+    Mutations are buffered in an open transaction and committed by ``save()``, which
+    ``VersionedVectorStore`` calls once per document, so each document is written
+    atomically and the cost of a save does not grow with the corpus.
+    ``get_document`` returns only the current version; older ones stay reachable
+    through ``get_version`` until pruned.
+    """
+
+    def __init__(self, path: Path, keep_versions: int = 0):
+        super().__init__(keep_versions)
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def save(self):
+        with self._lock:
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    def get_document(self, document_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT current_hash FROM documents WHERE document_id = ?", (document_id,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            current_hash = row[0]
+            return {
+                "current_hash": current_hash,
+                "versions": {current_hash: self.get_version(document_id, current_hash)},
+            }
+
+    def get_version(self, document_id: str, document_hash: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT chunk_count, last_indexed FROM versions WHERE document_id = ? AND document_hash = ?",
+                (document_id, document_hash),
+            ).fetchone()
+            if row is None:
+                return None
+
+            chunk_hashes = dict(self._conn.execute(
+                "SELECT chunk_id, chunk_hash FROM chunks WHERE document_id = ? AND document_hash = ?",
+                (document_id, document_hash),
+            ))
+            sources = [source for (source,) in self._conn.execute(
+                "SELECT source FROM sources WHERE document_id = ? AND document_hash = ? ORDER BY position",
+                (document_id, document_hash),
+            )]
+
+        return {
+            "chunk_hashes": chunk_hashes,
+            "chunk_count": row[0],
+            "sources": sources,
+            "last_indexed": row[1],
+        }
+
+    def document_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def register_version(
+        self,
+        document_id: str,
+        document_hash: str,
+        source: str,
+        chunk_hashes: Dict[str, str],
+        last_indexed: Optional[str] = None,
+    ):
+        last_indexed = last_indexed or datetime.now().isoformat()
+
+        with self._lock:
+            # Re-registering a version replaces it, as in the JSON store
+            self._delete_version(document_id, document_hash)
+
+            self._conn.execute(
+                "INSERT INTO versions (document_id, document_hash, chunk_count, last_indexed) VALUES (?, ?, ?, ?)",
+                (document_id, document_hash, len(chunk_hashes), last_indexed),
+            )
+            self._conn.executemany(
+                "INSERT INTO chunks (document_id, document_hash, chunk_id, chunk_hash) VALUES (?, ?, ?, ?)",
+                [(document_id, document_hash, chunk_id, chunk_hash) for chunk_id, chunk_hash in chunk_hashes.items()],
+            )
+            self._conn.execute(
+                "INSERT INTO sources (document_id, document_hash, source, position) VALUES (?, ?, ?, 0)",
+                (document_id, document_hash, source),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (document_id, current_hash) VALUES (?, ?)",
+                (document_id, document_hash),
+            )
+
+            self._apply_retention(document_id)
+
+    def add_source(
+        self,
+        document_id: str,
+        document_hash: str,
+        source: str,
+    ):
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR IGNORE INTO sources (document_id, document_hash, source, position)
+                SELECT ?, ?, ?, COALESCE(MAX(position) + 1, 0)
+                FROM sources WHERE document_id = ? AND document_hash = ?
+                """,
+                (document_id, document_hash, source, document_id, document_hash),
+            )
+
+    def _prune(self, document_id: Optional[str], keep: int) -> int:
+        with self._lock:
+            if document_id is None:
+                document_ids = [d for (d,) in self._conn.execute("SELECT document_id FROM documents")]
+            else:
+                document_ids = [document_id]
+
+            removed = 0
+            for doc_id in document_ids:
+                stale = self._conn.execute(
+                    """
+                    SELECT v.document_hash FROM versions v JOIN documents d USING (document_id)
+                    WHERE v.document_id = ? AND v.document_hash != d.current_hash
+                    ORDER BY v.last_indexed DESC LIMIT -1 OFFSET ?
+                    """,
+                    (doc_id, keep - 1),
+                ).fetchall()
+
+                for (document_hash,) in stale:
+                    self._delete_version(doc_id, document_hash)
+                removed += len(stale)
+
+            return removed
+
+    def get_fingerprint(self, source: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint FROM fingerprints WHERE source = ?", (source,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def record_fingerprint(
+        self,
+        document_id: str,
+        source: str,
+        fingerprint: Dict,
+    ):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints (source, document_id, fingerprint) VALUES (?, ?, ?)",
+                (source, document_id, json.dumps(fingerprint, sort_keys=True)),
+            )
+
+    def import_state(self, state: Dict):
+        """
+        Loads the contents of a JSON version file in a single transaction.
+        """
+        keep_versions, self.keep_versions = self.keep_versions, 0
+
+        with self._lock:
+            for document_id, doc in state.items():
+                for document_hash, version in doc["versions"].items():
+                    sources = version["sources"]
+                    self.register_version(
+                        document_id,
+                        document_hash,
+                        sources[0],
+                        version["chunk_hashes"],
+                        last_indexed=version.get("last_indexed"),
+                    )
+                    for source in sources[1:]:
+                        self.add_source(document_id, document_hash, source)
+
+                self._conn.execute(
+                    "UPDATE documents SET current_hash = ? WHERE document_id = ?",
+                    (doc["current_hash"], document_id),
+                )
+
+                for source, fingerprint in doc.get("fingerprints", {}).items():
+                    self.record_fingerprint(document_id, source, fingerprint)
+
+            self.keep_versions = keep_versions
+            self._apply_retention()
+            self.save()
+
+    @classmethod
+    def migrate_json(cls, json_file: Path, path: Path, keep_versions: int = 0) -> "SQLiteVersionManager":
+        """
+        Opens the SQLite store at ``path``, importing ``json_file`` first if the store is empty.
+        """
+        versions = cls(path, keep_versions=keep_versions)
+        if json_file.exists() and versions.document_count() == 0:
+            versions.import_state(json.loads(json_file.read_text()))
+        return versions
+
+    def _delete_version(self, document_id: str, document_hash: str):
+        for table in ("versions", "chunks", "sources"):
+            self._conn.execute(
+                f"DELETE FROM {table} WHERE document_id = ? AND document_hash = ?",
+                (document_id, document_hash),
+            )
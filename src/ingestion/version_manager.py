@@ -1,5 +1,7 @@
+import os
 import json
 import hashlib
+from abc import ABC, abstractmethod
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
@@ -18,6 +20,28 @@ def hash_document_chunks(chunks: List[Document]) -> str:
     return h.hexdigest()
 
 
+def hash_file(path: str, block_size: int = 1 << 20) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def file_fingerprint(path: str, content_hash: bool = False) -> Dict:
+    """
+    Cheap identity of a file on disk; the optional content hash guards against
+    edits that preserve size and mtime.
+    """
+    stat = os.stat(path)
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    if content_hash:
+        fingerprint["content_hash"] = hash_file(path)
+
+    return fingerprint
+
+
 def diff_chunks(old: Dict[str, str], new: Dict[str, str]) -> Dict[str, set]:
     old_ids = set(old.keys())
     new_ids = set(new.keys())
@@ -38,21 +62,81 @@ def diff_chunks(old: Dict[str, str], new: Dict[str, str]) -> Dict[str, set]:
     }
 
 
-class VersionManager:
-    def __init__(self, version_file: Path):
+class VersionStore(ABC):
+    """
+    Behaviour shared by the JSON and SQLite version stores. ``keep_versions`` of 0
+    keeps every version; otherwise older versions are pruned as new ones are registered.
+    """
+
+    def __init__(self, keep_versions: int = 0):
+        self.keep_versions = keep_versions
+
+    def prune_history(self, document_id: Optional[str] = None, keep: int = 1) -> int:
+        """
+        Drops all but the ``keep`` most recently indexed versions of a document (or of
+        every document), never the current one. Returns the number of versions removed.
+        """
+        return self._prune(document_id, max(keep, 1))
+
+    def _apply_retention(self, document_id: Optional[str] = None):
+        if self.keep_versions:
+            self.prune_history(document_id, keep=self.keep_versions)
+
+    @abstractmethod
+    def register_version(self, document_id: str, document_hash: str, source: str, chunk_hashes: Dict[str, str]):
+        ...
+
+    @abstractmethod
+    def _prune(self, document_id: Optional[str], keep: int) -> int:
+        ...
+
+    @abstractmethod
+    def get_fingerprint(self, source: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def record_fingerprint(self, document_id: str, source: str, fingerprint: Dict):
+        ...
+
+    @abstractmethod
+    def save(self):
+        ...
+
+    @abstractmethod
+    def close(self):
+        ...
+
+    def is_unchanged(self, source: str, fingerprint: Dict) -> bool:
+        return self.get_fingerprint(source) == fingerprint
+
+
+class VersionManager(VersionStore):
+    def __init__(self, version_file: Path, keep_versions: int = 0):
+        super().__init__(keep_versions)
         self.version_file = version_file
         self.state = self._load()
+        self.source_index = self._index_sources()
 
     def _load(self) -> Dict:
         if self.version_file.exists():
             return json.loads(self.version_file.read_text())
         return {}
 
+    def _index_sources(self) -> Dict[str, str]:
+        return {
+            source: document_id
+            for document_id, doc in self.state.items()
+            for source in doc.get("fingerprints", {})
+        }
+
     def save(self):
         self.version_file.write_text(
             json.dumps(self.state, indent=2, sort_keys=True)
         )
 
+    def close(self):
+        pass
+
 
     def get_document(self, document_id: str) -> Optional[Dict]:
         return self.state.get(document_id)
@@ -104,6 +188,8 @@ class VersionManager:
 
         self.state[document_id]["current_hash"] = document_hash
 
+        self._apply_retention(document_id)
+
     def add_source(
         self,
         document_id: str,
@@ -113,3 +199,43 @@ class VersionManager:
         version = self.get_version(document_id, document_hash)
         if source not in version["sources"]:
             version["sources"].append(source)
+
+
+    def _prune(self, document_id: Optional[str], keep: int) -> int:
+        document_ids = list(self.state) if document_id is None else [document_id]
+
+        removed = 0
+        for doc_id in document_ids:
+            doc = self.state[doc_id]
+            stale = sorted(
+                (h for h in doc["versions"] if h != doc["current_hash"]),
+                key=lambda h: doc["versions"][h]["last_indexed"],
+                reverse=True,
+            )[keep - 1:]
+
+            for document_hash in stale:
+                del doc["versions"][document_hash]
+            removed += len(stale)
+
+        return removed
+
+
+    def get_fingerprint(self, source: str) -> Optional[Dict]:
+        document_id = self.source_index.get(source)
+        if document_id is None:
+            return None
+        return self.state[document_id]["fingerprints"].get(source)
+
+
+    def record_fingerprint(
+        self,
+        document_id: str,
+        source: str,
+        fingerprint: Dict,
+    ):
+        previous = self.source_index.get(source)
+        if previous is not None and previous != document_id:
+            self.state[previous]["fingerprints"].pop(source, None)
+
+        self.state[document_id].setdefault("fingerprints", {})[source] = fingerprint
+        self.source_index[source] = document_id
@@ -0,0 +1,198 @@
+import copy
+import json
+import threading
+import time
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class CacheEntry:
+    answer: Dict[str, Any]
+    embedding: Optional[np.ndarray]
+    created_at: float
+    size_bytes: int
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(question.lower().split()).rstrip("?!. ")
+
+
+class AnswerCache:
+    """
+    Two-tier cache of ``/ask`` answers.
+
+    The exact tier matches the normalized question together with every setting that
+    changes the answer (``k``, model, temperature, collection, metadata filters). The semantic tier
+    returns an answer cached for a different question under the same settings when
+    the question embeddings are within ``semantic_distance`` cosine distance.
+    Entries are evicted least-recently-used once ``max_entries`` or ``max_bytes``
+    is exceeded, and expire after ``ttl_seconds``.
+
+    Ingestion in this process calls ``invalidate``. An ingest in another process
+    (``ntt-rag ingest``) rewrites ``generation_file`` instead, and the cache clears
+    itself on the next lookup that finds the file changed.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 3600,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        semantic_distance: float = 0.05,
+        generation_file: Optional[Path] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.semantic_distance = semantic_distance
+
+        self._entries: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+
+        # Bumped on invalidation so answers computed against an older corpus are not stored
+        self.generation = 0
+        self.generation_file = generation_file
+        self._marker = self._read_marker()
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.semantic_distance > 0
+
+    @staticmethod
+    def make_key(question: str, k: int, model: str, temperature: float, collection: str, filters: Optional[Any] = None) -> Tuple:
+        return (collection, model, temperature, k, filters, normalize_question(question))
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._sync()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._expired(entry):
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry.answer)
+
+    def get_similar(self, key: Tuple, embedding: List[float]) -> Optional[Dict[str, Any]]:
+        query = self._normalize(embedding)
+        scope = key[:-1]
+
+        with self._lock:
+            self._sync()
+            candidates = [
+                (candidate_key, entry)
+                for candidate_key, entry in self._entries.items()
+                if candidate_key[:-1] == scope and entry.embedding is not None and not self._expired(entry)
+            ]
+
+            if candidates:
+                matrix = np.stack([entry.embedding for _, entry in candidates])
+                distances = 1.0 - matrix @ query
+                best = int(np.argmin(distances))
+
+                if distances[best] <= self.semantic_distance:
+                    best_key, entry = candidates[best]
+                    self._entries.move_to_end(best_key)
+                    self.semantic_hits += 1
+                    return copy.deepcopy(entry.answer)
+
+            self.misses += 1
+            return None
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def put(self, key: Tuple, answer: Dict[str, Any], embedding: Optional[List[float]] = None, generation: Optional[int] = None):
+        vector = self._normalize(embedding) if embedding is not None else None
+        size_bytes = len(json.dumps(answer, default=str)) + (vector.nbytes if vector is not None else 0)
+
+        with self._lock:
+            self._sync()
+            if generation is not None and generation != self.generation:
+                return
+            if size_bytes > self.max_bytes:
+                return
+
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = CacheEntry(
+                answer=copy.deepcopy(answer),
+                embedding=vector,
+                created_at=time.monotonic(),
+                size_bytes=size_bytes,
+            )
+            self._size_bytes += size_bytes
+
+            while len(self._entries) > self.max_entries or self._size_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._marker = self._read_marker()
+            self._clear()
+
+    def _clear(self):
+        self._entries.clear()
+        self._size_bytes = 0
+        self.generation += 1
+        self.invalidations += 1
+
+    def _read_marker(self) -> Optional[str]:
+        if self.generation_file is None:
+            return None
+        try:
+            return self.generation_file.read_text()
+        except FileNotFoundError:
+            return None
+
+    def _sync(self):
+        marker = self._read_marker()
+        if marker != self._marker:
+            self._marker = marker
+            self._clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size_bytes,
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.semantic_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _expired(self, entry: CacheEntry) -> bool:
+        return time.monotonic() - entry.created_at > self.ttl_seconds
+
+    def _remove(self, key: Tuple):
+        entry = self._entries.pop(key)
+        self._size_bytes -= entry.size_bytes
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
@@ -0,0 +1,172 @@
+import math
+import re
+
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from langchain_core.documents import Document
+
+_WORD = re.compile(r"\w+")
+
+# Shorter suffix/prefix matches between neighbouring chunks are more likely coincidence than overlap
+MIN_OVERLAP_CHARS = 20
+
+
+def estimate_tokens(text: str) -> int:
+    # About four characters per token for Llama-style BPE vocabularies on English and Spanish text
+    return math.ceil(len(text) / 4)
+
+
+def shingles(text: str, size: int = 3) -> Set[Tuple[str, ...]]:
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return {tuple(words)}
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def jaccard(a: Set, b: Set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def overlap_length(first: str, second: str, max_overlap: int) -> int:
+    """
+    Length of the longest suffix of ``first`` that is also a prefix of ``second``.
+    """
+    for length in range(min(len(first), len(second), max_overlap), MIN_OVERLAP_CHARS - 1, -1):
+        if first.endswith(second[:length]):
+            return length
+    return 0
+
+
+class ContextPacker:
+    """
+    Turns the ranked retrieval results into the documents placed in the prompt.
+
+    Exact and near duplicates (word-shingle Jaccard similarity of at least
+    ``duplicate_threshold``) are dropped in favour of the better-ranked copy.
+    Consecutive chunks of the same page are merged and their shared overlap is
+    written once. Merged passages are then taken in rank order while they fit in
+    the token budget. The result is emitted in document order (source, page,
+    position), so questions that retrieve overlapping passages produce prompts with
+    a long common prefix that the inference server can reuse from its KV cache.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 3000,
+        duplicate_threshold: float = 0.9,
+        max_overlap: int = 1000,
+        count_tokens: Callable[[str], int] = estimate_tokens,
+    ):
+        self.max_tokens = max_tokens
+        self.duplicate_threshold = duplicate_threshold
+        self.max_overlap = max_overlap
+        self.count_tokens = count_tokens
+
+        self.requests = 0
+        self.tokens_retrieved = 0
+        self.tokens_packed = 0
+
+    def pack(self, documents: List[Document], max_tokens: Optional[int] = None) -> Tuple[List[Document], Dict[str, Any]]:
+        budget = self.max_tokens if max_tokens is None else max_tokens
+        tokens_retrieved = sum(self.count_tokens(doc.page_content) for doc in documents)
+
+        unique = self._deduplicate(documents)
+        passages = self._merge_adjacent(unique)
+
+        packed, tokens_packed = [], 0
+        for rank, passage in passages:
+            tokens = self.count_tokens(passage.page_content)
+            if tokens_packed + tokens > budget:
+                continue
+            packed.append(passage)
+            tokens_packed += tokens
+
+        packed.sort(key=self._position)
+
+        self.requests += 1
+        self.tokens_retrieved += tokens_retrieved
+        self.tokens_packed += tokens_packed
+
+        return packed, {
+            "chunks_retrieved": len(documents),
+            "chunks_duplicate": len(documents) - len(unique),
+            "passages": len(passages),
+            "passages_packed": len(packed),
+            "tokens_retrieved": tokens_retrieved,
+            "tokens_packed": tokens_packed,
+            "tokens_saved": tokens_retrieved - tokens_packed,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "tokens_retrieved": self.tokens_retrieved,
+            "tokens_packed": self.tokens_packed,
+            "tokens_saved": self.tokens_retrieved - self.tokens_packed,
+            "savings_ratio": 1 - self.tokens_packed / self.tokens_retrieved if self.tokens_retrieved else 0.0,
+        }
+
+    def _deduplicate(self, documents: List[Document]) -> List[Tuple[int, Document]]:
+        kept: List[Tuple[int, Document]] = []
+        kept_shingles: List[Set] = []
+        seen_ids = set()
+
+        for rank, doc in enumerate(documents):
+            chunk_id = doc.metadata.get("chunk_id")
+            if chunk_id is not None and chunk_id in seen_ids:
+                continue
+
+            doc_shingles = shingles(doc.page_content)
+            if any(jaccard(doc_shingles, other) >= self.duplicate_threshold for other in kept_shingles):
+                continue
+
+            seen_ids.add(chunk_id)
+            kept.append((rank, doc))
+            kept_shingles.append(doc_shingles)
+
+        return kept
+
+    def _merge_adjacent(self, ranked: List[Tuple[int, Document]]) -> List[Tuple[int, Document]]:
+        """
+        Merges runs of consecutive chunks of one page. A run ranks as its best chunk.
+        """
+        ordered = sorted(ranked, key=lambda item: self._position(item[1]))
+
+        runs: List[List[Tuple[int, Document]]] = []
+        for rank, doc in ordered:
+            if runs and self._follows(runs[-1][-1][1], doc):
+                runs[-1].append((rank, doc))
+            else:
+                runs.append([(rank, doc)])
+
+        passages = []
+        for run in runs:
+            text = run[0][1].page_content
+            for _, doc in run[1:]:
+                overlap = overlap_length(text, doc.page_content, self.max_overlap)
+                text = text + doc.page_content[overlap:] if overlap else f"{text} {doc.page_content}"
+
+            metadata = dict(run[0][1].metadata)
+            if len(run) > 1:
+                metadata["merged_chunks"] = len(run)
+            passages.append((min(rank for rank, _ in run), Document(page_content=text, metadata=metadata)))
+
+        passages.sort(key=lambda item: item[0])
+        return passages
+
+    @staticmethod
+    def _position(doc: Document) -> Tuple:
+        metadata = doc.metadata
+        return (str(metadata.get("source", "")), metadata.get("page", -1), metadata.get("chunk_index", -1))
+
+    @staticmethod
+    def _follows(previous: Document, doc: Document) -> bool:
+        if "chunk_index" not in doc.metadata or "chunk_index" not in previous.metadata:
+            return False
+        return (
+            previous.metadata.get("source") == doc.metadata.get("source")
+            and previous.metadata.get("page") == doc.metadata.get("page")
+            and previous.metadata["chunk_index"] + 1 == doc.metadata["chunk_index"]
+        )
@@ -1,8 +1,14 @@
+from contextlib import aclosing
+from typing import AsyncIterator
+
 from langchain_openai import ChatOpenAI
 
 
 class LLMInterface:
     def __init__(self, model: str, inference_server_url: str, max_tokens: int = 512, temperature: float = 0.0):
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
         self.llm = ChatOpenAI(
             model=model,
             openai_api_key="EMPTY",
@@ -13,4 +19,22 @@ class LLMInterface:
 
     async def generate(self, messages: str) -> str:
         result = await self.llm.agenerate([messages])
-        return result.generations[0][0].text
\ No newline at end of file
+        return result.generations[0][0].text
+
+    async def stream(self, messages) -> AsyncIterator[str]:
+        # Closing this generator closes the upstream HTTP stream, freeing the inference slot
+        async with aclosing(self.llm.astream(messages)) as chunks:
+            async for chunk in chunks:
+                if chunk.content:
+                    yield chunk.content
+
+    def heartbeat(self, timeout: float = 2.0):
+        # Lists the served models, which fails fast when the inference server is down
+        self.llm.root_client.with_options(timeout=timeout, max_retries=0).models.list()
+
+    async def aclose(self):
+        # Release the pooled HTTP connections held by the OpenAI clients
+        if self.llm.root_async_client is not None:
+            await self.llm.root_async_client.close()
+        if self.llm.root_client is not None:
+            self.llm.root_client.close()
@@ -1,16 +1,71 @@
-from typing import Dict, Any, List
+import asyncio
+import time
 
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+
+from monitoring.latency import LatencyStats
+from rag.answer_cache import AnswerCache
+from rag.context import ContextPacker
 from rag.llm import LLMInterface
+from rag.reranker import CrossEncoderReranker
+from vectorstore.filters import MetadataFilter
+from vectorstore.lexical_index import LexicalIndex
 from vectorstore.vectorstore import VectorStoreBuilder
 
+from langchain_core.documents import Document
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_core.messages.base import BaseMessage
 
 
+@dataclass
+class CacheLookup:
+    key: Optional[Tuple] = None
+    generation: Optional[int] = None
+    embedding: Optional[List[float]] = None
+    answer: Optional[Dict[str, Any]] = None
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Scores each id by the sum of ``1 / (k + rank)`` over the rankings it appears in.
+    Ties keep the order of first appearance, so earlier rankings win them.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
 class RAGPipeline:
-    def __init__(self, vectorstore: VectorStoreBuilder, llm: LLMInterface):
+    def __init__(
+        self,
+        vectorstore: VectorStoreBuilder,
+        llm: LLMInterface,
+        cache: Optional[AnswerCache] = None,
+        lexical_index: Optional[LexicalIndex] = None,
+        hybrid_candidates: int = 50,
+        rrf_k: int = 60,
+        packer: Optional[ContextPacker] = None,
+        reranker: Optional[CrossEncoderReranker] = None,
+        rerank_candidates: int = 30,
+    ):
         self.vectorstore = vectorstore
         self.llm = llm
+        self.cache = cache
+        # With a lexical index, dense and BM25 candidates are fused by reciprocal rank
+        self.lexical_index = lexical_index
+        self.hybrid_candidates = hybrid_candidates
+        self.rrf_k = rrf_k
+        # Without a packer the retrieved chunks go into the prompt unchanged
+        self.packer = packer
+        # With a reranker, rerank_candidates chunks are retrieved and only the best k are kept
+        self.reranker = reranker
+        self.rerank_candidates = rerank_candidates
+        self.time_to_first_token = LatencyStats()
 
     
     def create_rag_messages(self, context: str, question: str) -> List[BaseMessage]:
@@ -33,33 +88,176 @@ class RAGPipeline:
         return [system_message, human_message]
 
     
-    async def ask(self, question: str, k: int = 3) -> Dict[str, Any]:
+    async def ask(self, question: str, k: int = 3, filters: Optional[MetadataFilter] = None) -> Dict[str, Any]:
+        lookup = await self._cache_lookup(question, k, filters)
+        if lookup.answer is not None:
+            return lookup.answer
+
         # Retrieve relevant documents
-        results = await self.vectorstore.search(query=question, k=k)
+        documents = await self._retrieve(question, k, embedding=lookup.embedding, filters=filters)
+        documents, packing = self._pack(question, documents)
+
+        messages = self.create_rag_messages(self._build_context(documents), question)
+
+        # Generate answer
+        answer = await self.llm.generate(messages)
 
+        result = {
+            "answer": answer.strip(),
+            "sources": self._collect_sources(documents),
+        }
+        self._cache_store(lookup, result)
+
+        if packing is not None:
+            result = {**result, "context": packing}
+        return result
+
+    async def ask_stream(self, question: str, k: int = 3, filters: Optional[MetadataFilter] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields ``sources`` right after retrieval, then one ``token`` event per generated
+        token and a final ``done`` event carrying the time to first token and, when the
+        context is packed, its token savings.
+        """
+        started = time.perf_counter()
+
+        lookup = await self._cache_lookup(question, k, filters)
+        if lookup.answer is not None:
+            yield {"event": "sources", "data": lookup.answer["sources"]}
+            yield {"event": "token", "data": lookup.answer["answer"]}
+            yield {"event": "done", "data": {"cached": True, "time_to_first_token_ms": (time.perf_counter() - started) * 1000}}
+            return
+
+        documents = await self._retrieve(question, k, embedding=lookup.embedding, filters=filters)
+        documents, packing = self._pack(question, documents)
+        sources = self._collect_sources(documents)
+        yield {"event": "sources", "data": sources}
+
+        messages = self.create_rag_messages(self._build_context(documents), question)
+
+        time_to_first_token = None
+        tokens = []
+        # aclosing propagates a close of this generator to the upstream LLM stream
+        async with aclosing(self.llm.stream(messages)) as token_stream:
+            async for token in token_stream:
+                if time_to_first_token is None:
+                    time_to_first_token = time.perf_counter() - started
+                    self.time_to_first_token.record(time_to_first_token)
+                tokens.append(token)
+                yield {"event": "token", "data": token}
+
+        # Only complete answers are cached; a disconnect closes this generator before here
+        self._cache_store(lookup, {"answer": "".join(tokens).strip(), "sources": sources})
+
+        done = {
+            "cached": False,
+            "time_to_first_token_ms": time_to_first_token * 1000 if time_to_first_token is not None else None,
+        }
+        if packing is not None:
+            done["context"] = packing
+        yield {"event": "done", "data": done}
+
+    async def _cache_lookup(self, question: str, k: int, filters: Optional[MetadataFilter] = None) -> CacheLookup:
+        if self.cache is None:
+            return CacheLookup()
+
+        key = self.cache.make_key(
+            question,
+            k=k,
+            model=self.llm.model,
+            temperature=self.llm.temperature,
+            collection=self.vectorstore.collection_name,
+            filters=filters or None,
+        )
+        lookup = CacheLookup(key=key, generation=self.cache.generation)
+
+        lookup.answer = self.cache.get(key)
+        if lookup.answer is not None:
+            return lookup
+
+        if self.cache.semantic_enabled:
+            lookup.embedding = await self.vectorstore.embed_query(question)
+            lookup.answer = self.cache.get_similar(key, lookup.embedding)
+        else:
+            self.cache.record_miss()
+
+        return lookup
+
+    def _cache_store(self, lookup: CacheLookup, result: Dict[str, Any]):
+        if self.cache is None:
+            return
+        self.cache.put(lookup.key, result, embedding=lookup.embedding, generation=lookup.generation)
+
+    async def _retrieve(
+        self,
+        question: str,
+        k: int,
+        embedding: Optional[List[float]] = None,
+        filters: Optional[MetadataFilter] = None,
+    ) -> List[Document]:
+        candidates = k if self.reranker is None else max(k, self.rerank_candidates)
+        fetch = candidates if self.lexical_index is None else max(candidates, self.hybrid_candidates)
+        # An empty filter is dropped so unfiltered searches stay identical
+        filters = filters or None
+
+        if embedding is None:
+            results = await self.vectorstore.search(query=question, k=fetch, filters=filters)
+        else:
+            results = await self.vectorstore.search_by_vector(embedding, k=fetch, filters=filters)
 
         documents = [doc for doc, _ in results]
+        if self.lexical_index is not None:
+            documents = await self._fuse(question, documents, candidates, filters)
+        if self.reranker is not None:
+            documents = await self.reranker.rerank(question, documents, top_n=k)
+        return documents
+
+    async def _fuse(self, question: str, dense: List[Document], k: int, filters: Optional[MetadataFilter] = None) -> List[Document]:
+        lexical = await asyncio.to_thread(self.lexical_index.search, question, max(k, self.hybrid_candidates))
+
+        by_id = {self._chunk_id(doc): doc for doc in dense}
+        dense_ids = list(by_id)
+        lexical_ids = [chunk_id for chunk_id, _ in lexical]
+
+        if filters is not None:
+            # The lexical index has no metadata, so its hits are fetched first and filtered here
+            for doc in await self.vectorstore.get_by_ids([i for i in lexical_ids if i not in by_id]):
+                if filters.matches(doc.metadata):
+                    by_id[self._chunk_id(doc)] = doc
+            lexical_ids = [chunk_id for chunk_id in lexical_ids if chunk_id in by_id]
+
+        fused = reciprocal_rank_fusion([dense_ids, lexical_ids], k=self.rrf_k)[:k]
 
-        # Build context
-        context = "\n\n".join(
+        # Chunks only the lexical index found are fetched from Chroma in one call
+        missing = [chunk_id for chunk_id, _ in fused if chunk_id not in by_id]
+        if missing:
+            for doc in await self.vectorstore.get_by_ids(missing):
+                by_id[self._chunk_id(doc)] = doc
+
+        return [by_id[chunk_id] for chunk_id, _ in fused if chunk_id in by_id]
+
+    def _pack(self, question: str, documents: List[Document]) -> Tuple[List[Document], Optional[Dict[str, Any]]]:
+        if self.packer is None:
+            return documents, None
+        # The question shares the prompt with the context, so it comes out of the same budget
+        budget = max(self.packer.max_tokens - self.packer.count_tokens(question), 0)
+        return self.packer.pack(documents, max_tokens=budget)
+
+    @staticmethod
+    def _chunk_id(doc: Document) -> Optional[str]:
+        return doc.metadata.get("chunk_id", doc.id)
+
+    @staticmethod
+    def _build_context(documents: List[Document]) -> str:
+        return "\n\n".join(
             f"[Source: {doc.metadata.get('source', 'unknown')}]\n{doc.page_content}"
             for doc in documents
         )
 
-        messages = self.create_rag_messages(context, question)
-
-        # Generate answer
-        answer = await self.llm.generate(messages)
-
-        # Collect sources
-        sources = list(
+    @staticmethod
+    def _collect_sources(documents: List[Document]) -> List[Dict[str, Any]]:
+        return list(
             {"source": doc.metadata.get("source", "unknown"),
              "file_name": doc.metadata.get("file_name", "unknown"),
              "page": doc.metadata.get("page", "unknown")}
              for doc in documents
         )
-
-        return {
-            "answer": answer.strip(),
-            "sources": sources,
-        }
\ No newline at end of file
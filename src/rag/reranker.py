@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from monitoring.latency import LatencyStats
+from vectorstore.embedding_executor import EmbeddingExecutor
+
+# Cross-encoders loaded in this process, by model name; worker processes load their own
+_CROSS_ENCODERS: Dict[str, Any] = {}
+_CROSS_ENCODERS_LOCK = threading.Lock()
+
+
+def _cross_encoder(model_name: str):
+    with _CROSS_ENCODERS_LOCK:
+        if model_name not in _CROSS_ENCODERS:
+            from sentence_transformers import CrossEncoder
+            _CROSS_ENCODERS[model_name] = CrossEncoder(model_name, device="cpu")
+        return _CROSS_ENCODERS[model_name]
+
+
+def score_pairs(model_name: str, batch_size: int, pairs: List[Tuple[str, str]]) -> List[float]:
+    """
+    Relevance of each (query, passage) pair. Module-level so process workers can run it.
+    """
+    scores = _cross_encoder(model_name).predict(pairs, batch_size=batch_size, show_progress_bar=False)
+    return [float(score) for score in scores]
+
+
+class CrossEncoderReranker:
+    """
+    Reorders retrieval candidates by a cross-encoder score of (question, chunk).
+
+    Scores are cached per (question, chunk id) in an LRU of ``cache_size`` entries;
+    chunk ids include the content hash, so re-ingested text is scored again. Pairs
+    missing from the cache are scored in one batch on the embedding worker pool
+    when an executor is given, so reranking shares its queue bound and threads.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        batch_size: int = 32,
+        cache_size: int = 10_000,
+        executor: Optional[EmbeddingExecutor] = None,
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.executor = executor
+
+        self._scores: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.run_time = LatencyStats()
+
+    async def rerank(self, question: str, documents: List[Document], top_n: int) -> List[Document]:
+        started = time.perf_counter()
+
+        keys = [(question, self._chunk_id(doc)) for doc in documents]
+        scores = self._cached(keys)
+
+        missing = [i for i, key in enumerate(keys) if key not in scores]
+        if missing:
+            # Identical chunks are scored once
+            unique = list(dict.fromkeys(keys[i] for i in missing))
+            texts = {keys[i]: documents[i].page_content for i in missing}
+            computed = await self._score([(question, texts[key]) for key in unique])
+            fresh = dict(zip(unique, computed))
+            self._store(fresh)
+            scores.update(fresh)
+
+        order = sorted(range(len(documents)), key=lambda i: scores[keys[i]], reverse=True)
+        self.run_time.record(time.perf_counter() - started)
+
+        return [documents[i] for i in order[:top_n]]
+
+    def warm_up(self):
+        # Process workers load their own copy on first use
+        if self.executor is None or self.executor.mode == "thread":
+            score_pairs(self.model_name, 1, [("warm-up", "warm-up")])
+
+    async def _score(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        fn = partial(score_pairs, self.model_name, self.batch_size)
+        if self.executor is None:
+            return await asyncio.to_thread(fn, pairs)
+        return await self.executor.run(fn, pairs)
+
+    def _cached(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], float]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                score = self._scores.get(key)
+                if score is None:
+                    self.misses += 1
+                    continue
+                self._scores.move_to_end(key)
+                found[key] = score
+                self.hits += 1
+        return found
+
+    def _store(self, scores: Dict[Tuple[str, str], float]):
+        with self._lock:
+            self._scores.update(scores)
+            while len(self._scores) > self.cache_size:
+                self._scores.popitem(last=False)
+
+    @staticmethod
+    def _chunk_id(doc: Document) -> str:
+        return doc.metadata.get("chunk_id") or doc.id or doc.page_content
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "cached_scores": len(self._scores),
+                "hits": self.hits,
+                "misses": self.misses,
+                "run_time": self.run_time.snapshot(),
+            }
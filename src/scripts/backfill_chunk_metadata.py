@@ -0,0 +1,57 @@
+"""
+Adds the filterable ``document_id`` and ``year`` fields to chunks indexed before
+ingestion wrote them, so metadata filters also match older chunks. Only metadata
+is updated; no embeddings are recomputed.
+
+    PYTHONPATH=src python src/scripts/backfill_chunk_metadata.py
+    PYTHONPATH=src python src/scripts/backfill_chunk_metadata.py --dry-run
+"""
+import argparse
+
+import chromadb
+
+from config.config import AppConfig
+from ingestion.runner import derive_document_id, derive_year
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    config = AppConfig()
+    collection = chromadb.HttpClient(host=config.CHROMA_HOST, port=config.CHROMA_PORT).get_collection(config.CHROMA_COLLECTION)
+
+    scanned = updated = 0
+    offset = 0
+    while True:
+        page = collection.get(limit=args.batch_size, offset=offset, include=["metadatas"])
+        if not page["ids"]:
+            break
+        offset += len(page["ids"])
+        scanned += len(page["ids"])
+
+        ids, metadatas = [], []
+        for chunk_id, metadata in zip(page["ids"], page["metadatas"]):
+            source = metadata.get("source")
+            if source is None or "document_id" in metadata:
+                continue
+
+            metadata = dict(metadata, document_id=derive_document_id(source))
+            year = derive_year(source)
+            if year is not None:
+                metadata["year"] = year
+            ids.append(chunk_id)
+            metadatas.append(metadata)
+
+        if ids and not args.dry_run:
+            collection.update(ids=ids, metadatas=metadatas)
+        updated += len(ids)
+
+    action = "would update" if args.dry_run else "updated"
+    print(f"{config.CHROMA_COLLECTION}: scanned {scanned} chunks, {action} {updated}")
+
+
+if __name__ == "__main__":
+    main()
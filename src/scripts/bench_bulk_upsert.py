@@ -0,0 +1,46 @@
+"""
+Ingest throughput of the pipelined bulk upsert against embedding and uploading in turn,
+with synthetic per-batch embedding and upload costs.
+
+    PYTHONPATH=src python src/scripts/bench_bulk_upsert.py --chunks 5000 --batch-size 256
+"""
+import argparse
+import time
+
+from langchain_core.documents import Document
+
+from vectorstore.bulk import batched, bulk_upsert
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--embed-ms-per-chunk", type=float, default=2.0)
+    parser.add_argument("--upload-ms-per-chunk", type=float, default=1.5)
+    args = parser.parse_args()
+
+    documents = [Document(page_content=f"chunk {i}", metadata={"chunk_id": str(i)}) for i in range(args.chunks)]
+
+    def embed(texts):
+        time.sleep(len(texts) * args.embed_ms_per_chunk / 1000)
+        return [[0.0] for _ in texts]
+
+    def upsert(batch, embeddings):
+        time.sleep(len(batch) * args.upload_ms_per_chunk / 1000)
+
+    started = time.perf_counter()
+    for batch in batched(documents, args.batch_size):
+        upsert(batch, embed([doc.page_content for doc in batch]))
+    sequential = args.chunks / (time.perf_counter() - started)
+
+    stats = bulk_upsert(documents, embed=embed, upsert=upsert, batch_size=args.batch_size)
+
+    print(f"{'mode':>12} {'chunks/s':>10}")
+    print(f"{'sequential':>12} {sequential:>10.1f}")
+    print(f"{'pipelined':>12} {stats['chunks_per_second']:>10.1f}")
+    print(f"speedup {stats['chunks_per_second'] / sequential:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+CPU spent hashing chunks per ingest: the original three SHA-256 passes against
+ChunkHasher with each algorithm.
+
+    PYTHONPATH=src python src/scripts/bench_chunk_hashing.py --chunks 100000
+"""
+import argparse
+import hashlib
+import time
+
+from langchain_core.documents import Document
+
+from ingestion.hashing import HASH_ALGORITHMS, ChunkHasher
+from ingestion.version_manager import hash_chunk_content, hash_document_chunks
+
+
+def legacy(chunks):
+    for i, chunk in enumerate(chunks):
+        raw_id = f"0::{i}::{chunk.page_content.strip()}"
+        chunk.metadata["chunk_id"] = hashlib.sha256(raw_id.encode("utf-8")).hexdigest()
+    {c.metadata["chunk_id"]: hash_chunk_content(c.page_content) for c in chunks}
+    hash_document_chunks(chunks)
+
+
+def with_hasher(hasher: ChunkHasher, chunks):
+    for i, chunk in enumerate(chunks):
+        content_hash = hasher.content_hash(chunk.page_content)
+        chunk.metadata["content_hash"] = content_hash
+        chunk.metadata["chunk_id"] = hasher.chunk_id(0, i, chunk.page_content, content_hash)
+    {c.metadata["chunk_id"]: hasher.chunk_content_hash(c) for c in chunks}
+    hasher.document_hash(chunks)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=880)
+    args = parser.parse_args()
+
+    text = ("Operating margin improved as a result of cost efficiency programs. " * 20)[:args.chunk_size]
+
+    def fresh():
+        return [Document(page_content=f"{i} {text}", metadata={}) for i in range(args.chunks)]
+
+    runs = [("legacy", legacy)]
+    for algorithm in HASH_ALGORITHMS:
+        try:
+            hasher = ChunkHasher(algorithm)
+        except ImportError as e:
+            print(f"skipping {algorithm}: {e}")
+            continue
+        runs.append((algorithm, lambda chunks, hasher=hasher: with_hasher(hasher, chunks)))
+
+    baseline = None
+    print(f"{'hashing':>8} {'seconds':>8} {'chunks/s':>10} {'speedup':>8}")
+    for name, run in runs:
+        chunks = fresh()
+        started = time.perf_counter()
+        run(chunks)
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        print(f"{name:>8} {elapsed:>8.2f} {args.chunks / elapsed:>10.0f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
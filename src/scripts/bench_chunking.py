@@ -0,0 +1,84 @@
+"""
+Embedding throughput for character-based against token-based chunks, with batches
+in input order and sorted by length. Loads the embedding model and its tokenizer.
+
+    PYTHONPATH=src python src/scripts/bench_chunking.py --pages 200
+    PYTHONPATH=src python src/scripts/bench_chunking.py --model Qwen/Qwen3-Embedding-0.6B --chunk-tokens 256
+"""
+import argparse
+import random
+import statistics
+import time
+
+from langchain_core.documents import Document
+
+from ingestion.chunker import Chunker, load_tokenizer
+
+SENTENCES = [
+    "Net revenue increased compared to the prior year.",
+    "Growth was driven by digital services and managed infrastructure, particularly in the public sector and financial services segments across EMEA and the Americas.",
+    "Operating margin improved.",
+    "Cost efficiency programs, including the consolidation of data centers and the migration of legacy workloads to cloud platforms, contributed to the improvement.",
+    "See note 12.",
+]
+
+
+def generate_pages(pages: int, seed: int = 0):
+    rng = random.Random(seed)
+    for page in range(pages):
+        paragraphs = [" ".join(rng.choices(SENTENCES, k=rng.randint(1, 12))) for _ in range(rng.randint(3, 10))]
+        yield Document(page_content="\n\n".join(paragraphs), metadata={"source": "bench.pdf", "page": page})
+
+
+def embed_throughput(model, texts, batch_size: int, sort: bool) -> float:
+    texts = sorted(texts, key=len) if sort else list(texts)
+    started = time.perf_counter()
+    for start in range(0, len(texts), batch_size):
+        # One encode call per batch, as bulk_add does; encode's own sorting only sees this batch
+        model.encode(texts[start:start + batch_size], batch_size=batch_size)
+    return len(texts) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="Qwen/Qwen3-Embedding-0.6B")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--chunk-size", type=int, default=880)
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    parser.add_argument("--chunk-tokens", type=int, default=256)
+    parser.add_argument("--chunk-token-overlap", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(args.model, device="cpu")
+    tokenizer = load_tokenizer(args.model)
+    pages = list(generate_pages(args.pages))
+
+    chunkers = {
+        "chars": Chunker(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap),
+        "tokens": Chunker(chunk_size=args.chunk_tokens, chunk_overlap=args.chunk_token_overlap, tokenizer=tokenizer),
+    }
+
+    print(f"max_seq_length={model.max_seq_length}")
+    print(f"{'chunking':>9} {'chunks':>7} {'mean tok':>9} {'stdev':>7} {'over max':>9} {'chunk s':>8} {'unsorted/s':>11} {'sorted/s':>9}")
+    for name, chunker in chunkers.items():
+        started = time.perf_counter()
+        texts = [c.page_content for c in chunker.chunk(pages)]
+        chunk_seconds = time.perf_counter() - started
+
+        lengths = [len(ids) for ids in tokenizer(texts, add_special_tokens=False)["input_ids"]]
+        over = sum(length > model.max_seq_length for length in lengths)
+
+        unsorted = embed_throughput(model, texts, args.batch_size, sort=False)
+        ordered = embed_throughput(model, texts, args.batch_size, sort=True)
+
+        print(
+            f"{name:>9} {len(texts):>7} {statistics.mean(lengths):>9.1f} {statistics.pstdev(lengths):>7.1f} "
+            f"{over:>9} {chunk_seconds:>8.2f} {unsorted:>11.1f} {ordered:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
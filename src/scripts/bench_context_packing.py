@@ -0,0 +1,94 @@
+"""
+Prompt tokens saved by ContextPacker and its latency, on synthetic retrievals of
+880-character chunks with 100 characters of overlap. A share of the hits are
+neighbours of another hit and a share are copies from a re-issued report.
+
+    PYTHONPATH=src python src/scripts/bench_context_packing.py --k 20
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from langchain_core.documents import Document
+
+from rag.context import ContextPacker
+
+
+def synthetic_page(rng: random.Random, words: int) -> str:
+    vocabulary = [f"term{i}" for i in range(3000)]
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+def split(text: str, size: int, overlap: int):
+    chunks, start = [], 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            end = max(text.rfind(" ", start, end), start + 1)
+        chunks.append(text[start:end].strip())
+        if end == len(text):
+            break
+        # Restart at a word boundary inside the overlap window
+        start = text.find(" ", end - overlap, end) + 1
+    return chunks
+
+
+def retrieval(rng: random.Random, pages, k: int, neighbours: float, duplicates: float):
+    documents = []
+    while len(documents) < k:
+        page = rng.randrange(len(pages))
+        chunks = pages[page]
+        index = rng.randrange(len(chunks))
+        documents.append(chunk_document(chunks, page, index, "sr_2015.pdf"))
+        if rng.random() < neighbours and index + 1 < len(chunks):
+            documents.append(chunk_document(chunks, page, index + 1, "sr_2015.pdf"))
+        if rng.random() < duplicates:
+            documents.append(chunk_document(chunks, page, index, "sr_2015_reissued.pdf"))
+    rng.shuffle(documents)
+    return documents[:k]
+
+
+def chunk_document(chunks, page: int, index: int, source: str) -> Document:
+    return Document(
+        page_content=chunks[index],
+        metadata={"source": source, "page": page, "chunk_index": index, "chunk_id": f"{source}:{page}:{index}"},
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=3434, help="context tokens (4096 window - 512 answer - 150 template)")
+    parser.add_argument("--neighbours", type=float, default=0.3)
+    parser.add_argument("--duplicates", type=float, default=0.1)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pages = [split(synthetic_page(rng, 600), 880, 100) for _ in range(args.pages)]
+    requests = [retrieval(rng, pages, args.k, args.neighbours, args.duplicates) for _ in range(args.requests)]
+
+    packer = ContextPacker(max_tokens=args.budget)
+    latencies = []
+    for documents in requests:
+        started = time.perf_counter()
+        packer.pack(documents)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    # Without a binding budget, only deduplication and merging save tokens
+    unbounded = ContextPacker(max_tokens=10 ** 9)
+    for documents in requests:
+        unbounded.pack(documents)
+
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(f"{args.requests} requests, k={args.k}, budget {args.budget} tokens")
+    for label, stats in [("dedup + merge", unbounded.stats()), ("with budget", packer.stats())]:
+        print(f"{label:>14}: {stats['tokens_retrieved'] / args.requests:.0f} -> {stats['tokens_packed'] / args.requests:.0f} prompt tokens per request ({stats['savings_ratio']:.1%} saved)")
+    print(f"pack latency: p50 {p50:.2f} ms  p99 {p99:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Search latency and recall@k per truncated embedding dimension, against the model's
+full dimension, on chunks of the configured collection. Chunks and questions are
+embedded once at full dimension, then truncated and re-normalized per dimension.
+
+Questions come from --questions (one per line), or else the first sentence of
+sampled chunks stands in for them.
+
+    PYTHONPATH=src python src/scripts/bench_embedding_dimension.py --chunks 5000 --dims 1024 768 512 256 128
+"""
+import argparse
+import random
+import tempfile
+import time
+
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+from api.resources import build_vectorstore
+from config.config import AppConfig
+from vectorstore.local_store import LocalVectorStore
+from vectorstore.truncated_embeddings import truncate
+
+
+def search_all(store: LocalVectorStore, queries, k: int):
+    results, latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        found = store.similarity_search_by_vector_with_relevance_scores(query, k=k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append({doc.id for doc, _ in found})
+    return results, np.percentile(latencies, [50, 95])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--dims", type=int, nargs="+", default=[1024, 768, 512, 256, 128])
+    parser.add_argument("--questions", type=Path)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    config = AppConfig().model_copy(update={"EMBEDDING_DIMENSION": 0})
+    builder = build_vectorstore(config)
+    chunks = [text for page in islice(builder.iter_texts(), (args.chunks + 999) // 1000) for text in page][:args.chunks]
+    ids = [chunk_id for chunk_id, _ in chunks]
+    texts = [text for _, text in chunks]
+
+    if args.questions:
+        questions = [line.strip() for line in args.questions.read_text().splitlines() if line.strip()]
+    else:
+        questions = [text.split(". ")[0] for text in random.Random(0).sample(texts, min(args.queries, len(texts)))]
+
+    started = time.perf_counter()
+    documents = builder.embedding_model.embed_documents(texts)
+    queries = [builder.embedding_model.embed_query(question) for question in questions]
+    print(f"embedded {len(texts)} chunks and {len(queries)} questions in {time.perf_counter() - started:.1f}s")
+    builder.close()
+
+    full = len(documents[0])
+    expected = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for dim in sorted({min(d, full) for d in args.dims} | {full}, reverse=True):
+            store = LocalVectorStore(Path(tmp) / str(dim))
+            store.upsert(ids, truncate(documents, dim), texts, [{}] * len(ids))
+            found, (p50, p95) = search_all(store, truncate(queries, dim), args.k)
+            if expected is None:
+                expected = found
+            recall = np.mean([len(a & b) / max(len(a), 1) for a, b in zip(expected, found)])
+            print(f"dim {dim:5d}: {dim * 4:5d} B/chunk  p50 {p50:6.2f} ms  p95 {p95:6.2f} ms  recall@{args.k} {recall:.3f}")
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
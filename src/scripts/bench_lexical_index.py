@@ -0,0 +1,93 @@
+"""
+BM25 lookup latency of LexicalIndex on a synthetic corpus with a Zipf-distributed
+vocabulary, before and after a snapshot reload (memory-mapped postings).
+
+    PYTHONPATH=src python src/scripts/bench_lexical_index.py --chunks 1000000
+"""
+import argparse
+import tempfile
+import time
+
+from pathlib import Path
+
+import numpy as np
+
+from vectorstore.lexical_index import LexicalIndex
+
+
+def synthetic_chunks(count: int, words: int, vocabulary: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    batch = 10_000
+    for start in range(0, count, batch):
+        size = min(batch, count - start)
+        terms = np.minimum(rng.zipf(1.1, size=(size, words)), vocabulary)
+        for offset, row in enumerate(terms):
+            yield f"chunk-{start + offset}", " ".join(f"w{t}" for t in row)
+
+
+def measure(index: LexicalIndex, queries, k: int):
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, k=k)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return np.percentile(latencies, [50, 95, 99])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=1_000_000)
+    parser.add_argument("--words", type=int, default=130, help="tokens per chunk")
+    parser.add_argument("--vocabulary", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    # Query terms skew towards the mid-frequency band, like names, years and product terms
+    queries = [" ".join(f"w{t}" for t in rng.integers(10, 5000, size=rng.integers(2, 7))) for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp) / "lexical"
+        index = LexicalIndex(directory)
+
+        started = time.perf_counter()
+        batch = []
+        for chunk in synthetic_chunks(args.chunks, args.words, args.vocabulary):
+            batch.append(chunk)
+            if len(batch) == 1000:
+                index.add(batch)
+                index.flush()
+                batch = []
+        if batch:
+            index.add(batch)
+            index.flush()
+        build = time.perf_counter() - started
+        print(f"indexed {args.chunks} chunks in {build:.1f}s ({args.chunks / build:.0f} chunks/s)")
+
+        p50, p95, p99 = measure(index, queries, args.k)
+        print(f"in memory:   p50 {p50:.2f} ms  p95 {p95:.2f} ms  p99 {p99:.2f} ms")
+
+        started = time.perf_counter()
+        index.close()
+        print(f"snapshot written in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        index = LexicalIndex(directory)
+        print(f"snapshot loaded in {time.perf_counter() - started:.1f}s")
+
+        p50, p95, p99 = measure(index, queries, args.k)
+        print(f"memory-mapped: p50 {p50:.2f} ms  p95 {p95:.2f} ms  p99 {p99:.2f} ms")
+
+        # Single-document updates on top of the snapshot, as during incremental ingest
+        started = time.perf_counter()
+        for i in range(100):
+            index.delete([f"chunk-{i}"])
+            index.add([(f"chunk-{i}", queries[i % len(queries)])])
+            index.flush()
+        print(f"100 replace+flush: {(time.perf_counter() - started) * 10:.2f} ms each")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
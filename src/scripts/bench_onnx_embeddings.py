@@ -0,0 +1,69 @@
+"""
+Query latency and ingest throughput of the embedding model on PyTorch, on the ONNX
+export and on its int8 graph, over chunks of the configured collection. Run
+export_onnx_embeddings.py first (with --quantize for the int8 row).
+
+    PYTHONPATH=src python src/scripts/bench_onnx_embeddings.py --chunks 2000 --threads 4
+"""
+import argparse
+import random
+import time
+
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from api.resources import build_vectorstore
+from config.config import AppConfig
+from vectorstore.onnx_embeddings import QUANTIZED_MODEL_FILE, OnnxEmbeddings
+
+
+def measure(name: str, embeddings, texts, queries, reference=None):
+    embeddings.embed_documents(texts[:8])
+
+    started = time.perf_counter()
+    vectors = np.asarray(embeddings.embed_documents(texts))
+    ingest = len(texts) / (time.perf_counter() - started)
+
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        embeddings.embed_query(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+    p50, p95 = np.percentile(latencies, [50, 95])
+
+    line = f"{name:10s} ingest {ingest:7.1f} chunks/s  query p50 {p50:7.2f} ms  p95 {p95:7.2f} ms"
+    if reference is not None:
+        cosine = (vectors * reference).sum(axis=1) / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(reference, axis=1))
+        line += f"  min cosine vs torch {cosine.min():.5f}"
+    print(line)
+    return vectors
+
+
+def main():
+    config = AppConfig()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=config.EMBEDDING_ONNX_THREADS)
+    parser.add_argument("--onnx-dir", type=Path, default=Path(config.EMBEDDING_ONNX_DIR))
+    args = parser.parse_args()
+
+    builder = build_vectorstore(config.model_copy(update={"EMBEDDING_BACKEND": "torch", "EMBEDDING_DIMENSION": 0}))
+    texts = [text for page in islice(builder.iter_texts(), (args.chunks + 999) // 1000) for _, text in page][:args.chunks]
+    builder.close()
+    queries = [text.split(". ")[0] for text in random.Random(0).sample(texts, min(args.queries, len(texts)))]
+    print(f"{len(texts)} chunks, {len(queries)} queries, {args.threads or 'default'} onnxruntime threads")
+
+    reference = measure("torch", HuggingFaceEmbeddings(model=config.EMBEDDING_MODEL, model_kwargs={"device": "cpu"}, encode_kwargs={"batch_size": 64}), texts, queries)
+    measure("onnx", OnnxEmbeddings(args.onnx_dir, intra_op_threads=args.threads), texts, queries, reference)
+    if (args.onnx_dir / QUANTIZED_MODEL_FILE).exists():
+        measure("onnx-int8", OnnxEmbeddings(args.onnx_dir, quantized=True, intra_op_threads=args.threads), texts, queries, reference)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+PDF parsing throughput against worker count on a generated corpus.
+
+    PYTHONPATH=src python src/scripts/bench_pdf_loader.py --files 200 --pages 20
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from pathlib import Path
+
+import pymupdf
+
+from ingestion.loader import PDFLoader
+
+PARAGRAPH = (
+    "Net revenue for the fiscal year increased compared to the prior year, driven by "
+    "growth in digital services and managed infrastructure. Operating margin improved "
+    "as a result of cost efficiency programs. "
+)
+
+
+def generate_corpus(directory: Path, files: int, pages: int):
+    for i in range(files):
+        pdf = pymupdf.open()
+        for p in range(pages):
+            page = pdf.new_page()
+            page.insert_textbox(pymupdf.Rect(50, 50, 550, 800), f"Report {i}, page {p}. " + PARAGRAPH * 12)
+        pdf.save(str(directory / f"sr_{2000 + i % 25}_{i:05d}.pdf"))
+        pdf.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--chunksize", type=int, default=4)
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({1, cores} | {w for w in (2, 4, 8) if w < cores})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(tmp)
+        generate_corpus(corpus, args.files, args.pages)
+        print(f"Generated {args.files} PDFs x {args.pages} pages ({cores} cores)")
+
+        baseline = None
+        print(f"{'workers':>8} {'seconds':>8} {'pages/s':>9} {'speedup':>8}")
+        for workers in worker_counts:
+            loader = PDFLoader(str(corpus), workers=workers, chunksize=args.chunksize)
+
+            started = time.perf_counter()
+            documents = loader.load()
+            elapsed = time.perf_counter() - started
+
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>8.2f} {len(documents) / elapsed:>9.1f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Recall@k, latency and first-pass memory per chunk of int8 and binary quantized
+search against the float32 baseline, on a copy of the local vector index
+(NTT_RAG_VECTOR_INDEX_DIR) or on synthetic vectors.
+
+Queries are the embedded lines of --questions (loads the embedding model), or else
+stored chunk vectors, in which case each query's own chunk is left out of the results.
+
+    PYTHONPATH=src python src/scripts/bench_quantization.py --questions questions.txt
+    PYTHONPATH=src python src/scripts/bench_quantization.py --synthetic 100000 --dim 1024
+"""
+import argparse
+import tempfile
+import time
+
+from pathlib import Path
+
+import numpy as np
+
+from config.config import AppConfig
+from vectorstore.local_store import LocalVectorStore
+
+
+def synthetic_index(directory: Path, count: int, dim: int):
+    rng = np.random.default_rng(0)
+    centres = rng.standard_normal((256, dim)).astype(np.float32)
+    store = LocalVectorStore(directory)
+    for start in range(0, count, 10_000):
+        size = min(10_000, count - start)
+        vectors = centres[rng.integers(0, 256, size)] + rng.standard_normal((size, dim)).astype(np.float32)
+        store.upsert([str(i) for i in range(start, start + size)], vectors, ["x"] * size, [{}] * size)
+    store.close()
+
+
+def load_queries(args, store: LocalVectorStore):
+    if args.questions:
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        questions = [line.strip() for line in args.questions.read_text().splitlines() if line.strip()]
+        embeddings = HuggingFaceEmbeddings(model=AppConfig().EMBEDDING_MODEL, model_kwargs={"device": "cpu"})
+        return np.asarray(embeddings.embed_documents(questions), dtype=np.float32), [None] * len(questions)
+
+    rng = np.random.default_rng(1)
+    rows = rng.choice(np.flatnonzero(store._alive), size=min(args.queries, store.size), replace=False)
+    ids = store._documents_at(rows)
+    return np.asarray(store._matrix[rows]), [ids[int(row)].id for row in rows]
+
+
+def run(store: LocalVectorStore, queries: np.ndarray, own_ids, k: int):
+    results, latencies = [], []
+    for query, own_id in zip(queries, own_ids):
+        started = time.perf_counter()
+        found = store.similarity_search_by_vector_with_relevance_scores(query, k=k + 1)
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append([doc.id for doc, _ in found if doc.id != own_id][:k])
+    return results, np.percentile(latencies, [50, 95])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--index-dir", type=Path, default=Path(AppConfig().VECTOR_INDEX_DIR))
+    parser.add_argument("--synthetic", type=int, help="benchmark this many synthetic vectors instead of the index")
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--questions", type=Path, help="file with one question per line")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp) / "index"
+        if args.synthetic:
+            synthetic_index(directory, args.synthetic, args.dim)
+        else:
+            # A snapshot, so building codes never touches the live index
+            source = LocalVectorStore(args.index_dir, read_only=True)
+            source.snapshot(directory)
+            source.close()
+
+        baseline = LocalVectorStore(directory)
+        queries, own_ids = load_queries(args, baseline)
+        expected, (p50, p95) = run(baseline, queries, own_ids, args.k)
+        print(f"{baseline.size} chunks, {baseline.dim} dims, {len(queries)} queries, k={args.k}")
+        print(f"float32: {baseline.bytes_per_chunk:5d} B/chunk          p50 {p50:6.2f} ms  p95 {p95:6.2f} ms")
+        full_bytes = baseline.bytes_per_chunk
+        baseline.close()
+
+        for kind in ("int8", "binary"):
+            store = LocalVectorStore(directory, quantization=kind)
+            found, (p50, p95) = run(store, queries, own_ids, args.k)
+            recall = np.mean([len(set(a) & set(b)) / max(len(a), 1) for a, b in zip(expected, found)])
+            print(
+                f"{kind:>7}: {store.bytes_per_chunk:5d} B/chunk ({full_bytes / store.bytes_per_chunk:4.1f}x less)"
+                f"  p50 {p50:6.2f} ms  p95 {p95:6.2f} ms  recall@{args.k} {recall:.3f}"
+            )
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Throughput of query embedding against concurrency, batched vs. unbatched.
+
+    PYTHONPATH=src python src/scripts/bench_query_batching.py
+    PYTHONPATH=src python src/scripts/bench_query_batching.py --synthetic
+"""
+import argparse
+import asyncio
+import time
+
+from typing import List
+
+from vectorstore.embedding_executor import EmbeddingExecutor
+from vectorstore.query_batcher import QueryEmbeddingBatcher
+
+
+class SyntheticEmbeddings:
+    """
+    Stand-in with a fixed per-call overhead and a smaller per-item cost,
+    which is the cost shape of a transformer forward pass on CPU.
+    """
+
+    def __init__(self, call_overhead_ms: float = 8.0, item_cost_ms: float = 1.0):
+        self.call_overhead = call_overhead_ms / 1000
+        self.item_cost = item_cost_ms / 1000
+
+    def _encode(self, n: int) -> List[List[float]]:
+        time.sleep(self.call_overhead + self.item_cost * n)
+        return [[0.0] * 8 for _ in range(n)]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode(1)[0]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._encode(len(texts))
+
+
+async def run_level(embed, concurrency: int, requests: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            await embed(f"What was reported in {2000 + i % 25}?")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return requests / (time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="Qwen/Qwen3-Embedding-0.6B")
+    parser.add_argument("--synthetic", action="store_true", help="use a synthetic model instead of loading one")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--wait-ms", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 50])
+    args = parser.parse_args()
+
+    if args.synthetic:
+        embeddings = SyntheticEmbeddings()
+    else:
+        from langchain_huggingface import HuggingFaceEmbeddings
+        embeddings = HuggingFaceEmbeddings(model=args.model, model_kwargs={"device": "cpu"}, encode_kwargs={"batch_size": 64})
+
+    executor = EmbeddingExecutor(embeddings, max_workers=args.workers, max_queue_size=10_000)
+    batcher = QueryEmbeddingBatcher(executor.embed_documents, max_batch_size=args.batch_size, max_wait_ms=args.wait_ms)
+
+    # Load weights / JIT before timing
+    await executor.embed_query("warm-up")
+
+    print(f"{'concurrency':>12} {'unbatched q/s':>14} {'batched q/s':>12} {'speedup':>8}")
+    for concurrency in args.concurrency:
+        unbatched = await run_level(executor.embed_query, concurrency, args.requests)
+        batched = await run_level(batcher.embed, concurrency, args.requests)
+        print(f"{concurrency:>12} {unbatched:>14.1f} {batched:>12.1f} {batched / unbatched:>7.2f}x")
+
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+"""
+Cross-encoder rerank latency against the number of candidates, cold and with the
+score cache warm, plus the prompt tokens kept when only the top N chunks are passed on.
+
+    PYTHONPATH=src python src/scripts/bench_rerank.py --candidates 10 20 30 50 --top-n 5
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+
+from langchain_core.documents import Document
+
+from config.config import AppConfig
+from rag.context import estimate_tokens
+from rag.reranker import CrossEncoderReranker
+
+
+def synthetic_chunks(count: int, words: int = 140):
+    rng = random.Random(0)
+    vocabulary = ["carbon", "emissions", "SAP", "migration", "employees", "diversity", "revenue", "data", "centre", "energy",
+                  "renewable", "report", "fiscal", "year", "growth", "clients", "security", "cloud", "training", "governance"]
+    return [
+        Document(page_content=" ".join(rng.choice(vocabulary) for _ in range(words)), metadata={"chunk_id": f"chunk-{i}"})
+        for i in range(count)
+    ]
+
+
+async def measure(reranker: CrossEncoderReranker, questions, chunks, top_n: int):
+    latencies = []
+    for question in questions:
+        started = time.perf_counter()
+        await reranker.rerank(question, chunks, top_n=top_n)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return np.percentile(latencies, [50, 95])
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=AppConfig().RERANK_MODEL)
+    parser.add_argument("--candidates", type=int, nargs="+", default=[10, 20, 30, 50])
+    parser.add_argument("--top-n", type=int, default=5)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    questions = [f"How did carbon emissions change in fiscal year {2010 + i}?" for i in range(args.questions)]
+    reranker = CrossEncoderReranker(args.model, batch_size=args.batch_size)
+    reranker.warm_up()
+
+    for count in args.candidates:
+        chunks = synthetic_chunks(count)
+        cold_p50, cold_p95 = await measure(reranker, questions, chunks, args.top_n)
+        warm_p50, warm_p95 = await measure(reranker, questions, chunks, args.top_n)
+
+        tokens_all = sum(estimate_tokens(chunk.page_content) for chunk in chunks)
+        tokens_kept = sum(estimate_tokens(chunk.page_content) for chunk in chunks[:args.top_n])
+        print(
+            f"{count:>3} candidates: cold p50 {cold_p50:.1f} ms p95 {cold_p95:.1f} ms | cached p50 {warm_p50:.2f} ms"
+            f" | prompt context {tokens_all} -> {tokens_kept} tokens"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
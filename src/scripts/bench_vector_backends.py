@@ -0,0 +1,98 @@
+"""
+Search QPS and recall@k of the local vector store against Chroma, on random unit
+vectors. Recall is measured against an exact cosine scan. Chroma runs in-process
+unless --chroma-host is given, which leaves out the HTTP hop the API pays.
+
+    PYTHONPATH=src python src/scripts/bench_vector_backends.py --chunks 100000 --dim 1024
+    PYTHONPATH=src python src/scripts/bench_vector_backends.py --chroma-host localhost --chroma-port 8001
+"""
+import argparse
+import tempfile
+import time
+import uuid
+
+from pathlib import Path
+
+import chromadb
+import numpy as np
+
+from vectorstore.local_store import LocalVectorStore
+
+
+def clustered_vectors(rng, count: int, dim: int, clusters: int = 256) -> np.ndarray:
+    # Clusters give the neighbourhood structure real embeddings have, unlike uniform noise
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, count)] + 0.5 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ vectors.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def measure(search, queries: np.ndarray, truth: np.ndarray, k: int):
+    recalls = []
+    started = time.perf_counter()
+    for query, expected in zip(queries, truth):
+        found = search(query, k)
+        recalls.append(len(set(found) & set(expected.tolist())) / k)
+    elapsed = time.perf_counter() - started
+    return len(queries) / elapsed, float(np.mean(recalls))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--chroma-host")
+    parser.add_argument("--chroma-port", type=int, default=8000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = clustered_vectors(rng, args.chunks, args.dim)
+    queries = clustered_vectors(np.random.default_rng(1), args.queries, args.dim)
+    truth = exact_top_k(vectors, queries, args.k)
+    ids = [str(i) for i in range(args.chunks)]
+    texts = [f"chunk {i}" for i in range(args.chunks)]
+    metadatas = [{"chunk_id": i} for i in ids]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        local = LocalVectorStore(Path(tmp) / "index")
+        started = time.perf_counter()
+        for start in range(0, args.chunks, 5000):
+            end = start + 5000
+            local.upsert(ids[start:end], vectors[start:end], texts[start:end], metadatas[start:end])
+        print(f"local:  indexed {args.chunks} in {time.perf_counter() - started:.1f}s")
+
+        def search_local(query, k):
+            return [int(doc.id) for doc, _ in local.similarity_search_by_vector_with_relevance_scores(query.tolist(), k)]
+
+        qps, recall = measure(search_local, queries, truth, args.k)
+        print(f"local:  {qps:8.1f} QPS  recall@{args.k} {recall:.3f}")
+        local.close()
+
+    client = chromadb.HttpClient(host=args.chroma_host, port=args.chroma_port) if args.chroma_host else chromadb.EphemeralClient()
+    collection = client.create_collection(f"bench-{uuid.uuid4().hex}", metadata={"hnsw:space": "cosine"})
+    try:
+        started = time.perf_counter()
+        batch = client.get_max_batch_size()
+        for start in range(0, args.chunks, batch):
+            end = start + batch
+            collection.add(ids=ids[start:end], embeddings=vectors[start:end], documents=texts[start:end], metadatas=metadatas[start:end])
+        print(f"chroma: indexed {args.chunks} in {time.perf_counter() - started:.1f}s")
+
+        def search_chroma(query, k):
+            result = collection.query(query_embeddings=[query.tolist()], n_results=k, include=["documents", "metadatas", "distances"])
+            return [int(i) for i in result["ids"][0]]
+
+        qps, recall = measure(search_chroma, queries, truth, args.k)
+        print(f"chroma: {qps:8.1f} QPS  recall@{args.k} {recall:.3f}")
+    finally:
+        client.delete_collection(collection.name)
+
+
+if __name__ == "__main__":
+    main()
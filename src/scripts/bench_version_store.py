@@ -0,0 +1,60 @@
+"""
+Per-document write cost of the JSON and SQLite version stores as the corpus grows.
+Each document is registered and saved individually, as during ingestion.
+
+    PYTHONPATH=src python src/scripts/bench_version_store.py --documents 10000 --chunks 50
+"""
+import argparse
+import hashlib
+import tempfile
+import time
+
+from pathlib import Path
+
+from ingestion.sqlite_version_manager import SQLiteVersionManager
+from ingestion.version_manager import VersionManager
+
+
+def chunk_hashes(document: int, chunks: int):
+    return {
+        f"{document}-{i}": hashlib.sha256(f"{document}:{i}".encode()).hexdigest()
+        for i in range(chunks)
+    }
+
+
+def run(versions, documents: int, chunks: int, budget: float):
+    started = time.perf_counter()
+    report_every = max(documents // 5, 1)
+
+    for document in range(documents):
+        versions.register_version(f"sr_{document}", f"hash{document}", f"sr_{document}.pdf", chunk_hashes(document, chunks))
+        versions.save()
+
+        done = document + 1
+        elapsed = time.perf_counter() - started
+        if done % report_every == 0:
+            print(f"  {done:>7} docs {elapsed:>8.2f}s {done / elapsed:>9.1f} docs/s")
+        if elapsed > budget:
+            print(f"  stopped after {done} docs ({budget:.0f}s budget), last rate {done / elapsed:.1f} docs/s")
+            return
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=10_000)
+    parser.add_argument("--chunks", type=int, default=50)
+    parser.add_argument("--budget", type=float, default=120.0, help="seconds allowed per backend")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print("json")
+        run(VersionManager(Path(tmp) / "versions.json"), args.documents, args.chunks, args.budget)
+
+        print("sqlite")
+        versions = SQLiteVersionManager(Path(tmp) / "versions.db")
+        run(versions, args.documents, args.chunks, args.budget)
+        versions.close()
+
+
+if __name__ == "__main__":
+    main()
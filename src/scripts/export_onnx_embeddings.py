@@ -0,0 +1,55 @@
+"""
+Exports the configured embedding model for NTT_RAG_EMBEDDING_BACKEND=onnx, then
+compares the export with the PyTorch model on a few sample texts. Needs torch and
+sentence-transformers; serving the export does not.
+
+    PYTHONPATH=src python src/scripts/export_onnx_embeddings.py
+    PYTHONPATH=src python src/scripts/export_onnx_embeddings.py --quantize --output exports/qwen3
+"""
+import argparse
+
+from pathlib import Path
+
+import numpy as np
+
+from config.config import AppConfig
+from vectorstore.onnx_embeddings import OnnxEmbeddings, export_onnx, normalize
+
+SAMPLES = [
+    "What were the total Scope 1 and Scope 2 emissions reported for 2023?",
+    "¿Cuál fue el consumo energético total del grupo durante el ejercicio?",
+    "The company reduced its water withdrawal by 12% compared to the previous year,\nmainly through recycling at its data centres.",
+    "Board of Directors",
+]
+
+
+def compare(model_name: str, directory: Path, quantized: bool):
+    from sentence_transformers import SentenceTransformer
+
+    reference = SentenceTransformer(model_name, device="cpu").encode([text.replace("\n", " ") for text in SAMPLES])
+    exported = np.asarray(OnnxEmbeddings(directory, quantized=quantized).embed_documents(SAMPLES))
+
+    cosine = (normalize(reference) * normalize(exported)).sum(axis=1)
+    label = "int8" if quantized else "float32"
+    print(f"{label:8s} max |difference| {np.abs(reference - exported).max():.2e}  min cosine {cosine.min():.6f}")
+
+
+def main():
+    config = AppConfig()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=config.EMBEDDING_MODEL)
+    parser.add_argument("--output", type=Path, default=Path(config.EMBEDDING_ONNX_DIR))
+    parser.add_argument("--quantize", action="store_true", help="also write an int8 dynamically quantized graph")
+    args = parser.parse_args()
+
+    settings = export_onnx(args.model, args.output, quantize=args.quantize)
+    print(f"exported {args.model} to {args.output}: {settings['dimension']} dimensions, {settings['pooling']} pooling")
+
+    compare(args.model, args.output, quantized=False)
+    if args.quantize:
+        compare(args.model, args.output, quantized=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Imports the JSON version file into the SQLite version store.
+
+    PYTHONPATH=src python src/scripts/migrate_version_file.py
+    PYTHONPATH=src python src/scripts/migrate_version_file.py --json .document_versions.json --db .document_versions.db
+"""
+import argparse
+
+from pathlib import Path
+
+from config.config import BaseConfig
+from ingestion.sqlite_version_manager import SQLiteVersionManager
+
+
+def main():
+    defaults = BaseConfig.model_fields
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--json", type=Path, default=Path(defaults["DATA_VERSION_FILE"].default))
+    parser.add_argument("--db", type=Path, default=Path(defaults["VERSION_DB_FILE"].default))
+    parser.add_argument("--keep-versions", type=int, default=0)
+    args = parser.parse_args()
+
+    if not args.json.exists():
+        raise SystemExit(f"{args.json} does not exist")
+
+    versions = SQLiteVersionManager.migrate_json(args.json, args.db, keep_versions=args.keep_versions)
+    print(f"{args.db}: {versions.document_count()} documents")
+    versions.close()
+
+
+if __name__ == "__main__":
+    main()
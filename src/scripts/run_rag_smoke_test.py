@@ -2,7 +2,6 @@ import asyncio
 
 from ingestion.loader import PDFLoader
 from ingestion.cleaner import Cleaner
-from ingestion.chunker import Chunker
 from ingestion.version_manager import VersionManager
 
 from vectorstore.versioned_store import VersionedVectorStore
@@ -11,33 +10,30 @@ from vectorstore.vectorstore import VectorStoreBuilder
 from rag.llm import LLMInterface
 from rag.pipeline import RAGPipeline
 
-from api.app import derive_document_id
+from ingestion.runner import IngestionRunner
 
 from pathlib import Path
 
 from config.config import AppConfig
 
+from api.app_services import build_chunker
+
 VERSION_FILE = Path(".document_versions.json")
 
 async def main():
     app_config = AppConfig()
 
-    loader = PDFLoader(app_config.PDF_LOCATION)
-    documents = loader.load()
+    loader = PDFLoader(app_config.PDF_LOCATION, workers=app_config.PDF_LOADER_WORKERS)
 
-    if not documents:
+    files = loader.list_files()
+    if not files:
         print("No documents loaded")
         return
-    
-    print(f"Loaded {len(documents)} documents")
 
-    cleaner = Cleaner()
-    cleaned_documents = cleaner.clean(documents)
-    print(f"Cleaned {len(cleaned_documents)} documents")
+    print(f"Found {len(files)} PDF files")
 
-    chunker = Chunker(chunk_size=app_config.CHUNK_SIZE, chunk_overlap=app_config.CHUNK_OVERLAP)
-    chunks = chunker.chunk(cleaned_documents)
-    print(f"Created {len(chunks)} chunks")
+    cleaner = Cleaner()
+    chunker = build_chunker(app_config)
 
     vectorstore = VectorStoreBuilder(
         collection_name=app_config.CHROMA_COLLECTION,
@@ -50,6 +46,9 @@ async def main():
     versioned_store = VersionedVectorStore(
         store=vectorstore,
         versions=version_manager,
+        batch_size=app_config.INGEST_BATCH_SIZE,
+        max_retries=app_config.INGEST_MAX_RETRIES,
+        hasher=chunker.hasher,
     )
 
     collection = vectorstore.vector_store._collection
@@ -57,24 +56,18 @@ async def main():
     count_before = collection.count()
     print(f"Chunks before ingestion: {count_before}")
 
-    # Group chunks by source document
-    from collections import defaultdict
-    chunks_by_source = defaultdict(list)
-
-    for chunk in chunks:
-        chunks_by_source[chunk.metadata["source"]].append(chunk)
-
-    for source, source_chunks in chunks_by_source.items():
-        document_id = derive_document_id(source)
-        result = versioned_store.ingest(
-            document_id=document_id,
-            source=source,
-            chunks=source_chunks,
-        )
-        print(f"Ingestion result for {source}: {result}")
+    # Streams one source at a time through load -> clean -> chunk -> ingest
+    runner = IngestionRunner(
+        loader,
+        cleaner,
+        chunker,
+        versioned_store,
+        fingerprint_content=app_config.FINGERPRINT_CONTENT_HASH,
+        concurrency=app_config.INGEST_CONCURRENCY,
+    )
+    status = runner.run()
 
-    # vectorstore.add(chunks)
-    print("Documents added to vector store")
+    print(f"Ingestion finished: {status}")
 
     count_after = collection.count()
     print(f"Chunks after ingestion: {count_after}")
@@ -0,0 +1,78 @@
+import time
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.documents import Document
+
+EmbedFn = Callable[[List[str]], List[List[float]]]
+UpsertFn = Callable[[List[Document], List[List[float]]], None]
+
+
+def batched(documents: List[Document], batch_size: int) -> List[List[Document]]:
+    return [documents[start:start + batch_size] for start in range(0, len(documents), batch_size)]
+
+
+def upsert_with_retry(upsert: UpsertFn, batch: List[Document], embeddings: List[List[float]], max_retries: int, backoff: float) -> int:
+    """
+    Calls ``upsert`` up to ``max_retries + 1`` times with exponential backoff and
+    returns the number of retries it took. Upserts are idempotent on chunk ids.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            upsert(batch, embeddings)
+            return attempt
+        except Exception:
+            if attempt == max_retries:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+def bulk_upsert(
+    documents: List[Document],
+    embed: EmbedFn,
+    upsert: UpsertFn,
+    batch_size: int = 256,
+    max_retries: int = 3,
+    backoff: float = 0.5,
+) -> Dict[str, Any]:
+    """
+    Embeds and upserts ``documents`` in batches, embedding batch N+1 on the calling
+    thread while batch N is uploaded on a background thread. At most one batch is
+    in flight, so memory stays bounded by two batches of vectors.
+
+    Documents are batched in order of length so each batch pads to a similar size.
+    """
+    started = time.perf_counter()
+    documents = sorted(documents, key=lambda doc: len(doc.page_content))
+    embed_seconds = 0.0
+    retries = 0
+
+    uploader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chroma-upsert")
+    pending: Optional[Future] = None
+    batches = batched(documents, batch_size)
+
+    try:
+        for batch in batches:
+            embed_started = time.perf_counter()
+            embeddings = embed([doc.page_content for doc in batch])
+            embed_seconds += time.perf_counter() - embed_started
+
+            if pending is not None:
+                retries += pending.result()
+            pending = uploader.submit(upsert_with_retry, upsert, batch, embeddings, max_retries, backoff)
+
+        if pending is not None:
+            retries += pending.result()
+    finally:
+        uploader.shutdown(wait=True)
+
+    seconds = time.perf_counter() - started
+    return {
+        "chunks": len(documents),
+        "batches": len(batches),
+        "retries": retries,
+        "embed_seconds": round(embed_seconds, 3),
+        "seconds": round(seconds, 3),
+        "chunks_per_second": round(len(documents) / seconds, 1) if seconds else 0.0,
+    }
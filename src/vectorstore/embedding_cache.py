@@ -0,0 +1,125 @@
+import sqlite3
+import threading
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from langchain_core.embeddings import Embeddings
+
+from ingestion.hashing import ChunkHasher
+from vectorstore.sqlite_batches import in_batches
+
+
+
+class EmbeddingCache:
+    """
+    Content-addressed store mapping (embedding model, content hash of the text) to a float32 vector.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, content_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+
+    def get_many(self, model: str, content_hashes: Iterable[str]) -> Dict[str, List[float]]:
+        content_hashes = list(content_hashes)
+        found = {}
+
+        with self._lock:
+            for placeholders, batch in in_batches(content_hashes):
+                rows = self._conn.execute(
+                    f"SELECT content_hash, vector FROM embeddings WHERE model = ? AND content_hash IN ({placeholders})",
+                    [model, *batch],
+                )
+                for content_hash, vector in rows:
+                    found[content_hash] = np.frombuffer(vector, dtype=np.float32).tolist()
+
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]):
+        rows = [
+            (model, content_hash, np.asarray(vector, dtype=np.float32).tobytes())
+            for content_hash, vector in vectors.items()
+        ]
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, content_hash, vector) VALUES (?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def count(self, model: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embedding model so document embeddings are looked up in an
+    ``EmbeddingCache`` before the model is called. Only cache misses are embedded.
+
+    Texts are keyed by ``hasher``'s content hash, the one the chunker stores on each
+    chunk. Hashes other than sha256 are cached under ``model_name:algorithm`` so
+    entries of different algorithms never mix.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, model_name: str, hasher: Optional[ChunkHasher] = None):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model_name = model_name
+        self.hasher = hasher or ChunkHasher()
+        self.cache_key = model_name if self.hasher.compatible else f"{model_name}:{self.hasher.algorithm}"
+
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_documents_with_hashes(texts, [self.hasher.content_hash(text) for text in texts])
+
+    def embed_documents_with_hashes(self, texts: List[str], content_hashes: List[str]) -> List[List[float]]:
+        """
+        Like ``embed_documents``, with the content hashes the chunker already computed
+        with the same hasher.
+        """
+        vectors = self.cache.get_many(self.cache_key, set(content_hashes))
+
+        missing = {}
+        for content_hash, text in zip(content_hashes, texts):
+            if content_hash not in vectors:
+                missing.setdefault(content_hash, text)
+
+        if missing:
+            embedded = self.embeddings.embed_documents(list(missing.values()))
+            new_vectors = dict(zip(missing.keys(), embedded))
+            self.cache.put_many(self.cache_key, new_vectors)
+            vectors.update(new_vectors)
+
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        return [vectors[content_hash] for content_hash in content_hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from monitoring.latency import LatencyStats
+
+
+class EmbeddingQueueFull(RuntimeError):
+    def __init__(self, retry_after: int):
+        super().__init__("Embedding queue is full")
+        self.retry_after = retry_after
+
+
+# Per-process model used when the executor runs in process mode
+_WORKER_EMBEDDINGS: Optional[Embeddings] = None
+
+
+def _init_worker(torch_threads: int, factory: Optional[Callable[[], Embeddings]]):
+    if torch_threads > 0:
+        try:
+            import torch
+            torch.set_num_threads(torch_threads)
+        except ImportError:
+            pass
+
+    if factory is not None:
+        global _WORKER_EMBEDDINGS
+        _WORKER_EMBEDDINGS = factory()
+
+
+def _worker_embed_query(text: str) -> List[float]:
+    return _WORKER_EMBEDDINGS.embed_query(text)
+
+
+def _worker_embed_documents(texts: List[str]) -> List[List[float]]:
+    return _WORKER_EMBEDDINGS.embed_documents(texts)
+
+
+def _timed_call(fn: Callable, *args):
+    # time.monotonic is system-wide, so it is comparable across worker processes
+    started = time.monotonic()
+    return started, fn(*args)
+
+
+class EmbeddingExecutor:
+    """
+    Runs CPU-bound embedding work on a dedicated worker pool.
+
+    The number of submitted but unfinished tasks is bounded by ``max_queue_size``;
+    submissions beyond it fail fast with ``EmbeddingQueueFull`` so callers can shed
+    load instead of piling up latency.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        mode: str = "thread",
+        max_workers: int = 1,
+        torch_threads: int = 0,
+        max_queue_size: int = 64,
+        retry_after: int = 1,
+        factory: Optional[Callable[[], Embeddings]] = None,
+    ):
+        self.embeddings = embeddings
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.retry_after = retry_after
+
+        self._pending = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+        self.wait_time = LatencyStats()
+        self.run_time = LatencyStats()
+
+        self._pool = self._create_pool(mode, max_workers, torch_threads, factory)
+
+    @staticmethod
+    def _create_pool(mode: str, max_workers: int, torch_threads: int, factory) -> Executor:
+        if mode == "thread":
+            return ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix="embedding",
+                initializer=_init_worker,
+                initargs=(torch_threads, None),
+            )
+
+        if mode == "process":
+            if factory is None:
+                raise ValueError("Process mode requires an embeddings factory")
+            return ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_worker,
+                initargs=(torch_threads, factory),
+            )
+
+        raise ValueError(f"Unknown embedding executor mode: {mode}")
+
+    async def run(self, fn: Callable, *args) -> Any:
+        with self._lock:
+            if self._pending >= self.max_queue_size:
+                self._rejected += 1
+                raise EmbeddingQueueFull(self.retry_after)
+            self._pending += 1
+
+        submitted = time.monotonic()
+        try:
+            future = self._pool.submit(_timed_call, fn, *args)
+            started, result = await asyncio.wrap_future(future)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+        self.wait_time.record(started - submitted)
+        self.run_time.record(time.monotonic() - started)
+
+        return result
+
+    async def embed_query(self, text: str) -> List[float]:
+        if self.mode == "process":
+            return await self.run(_worker_embed_query, text)
+        return await self.run(self.embeddings.embed_query, text)
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.mode == "process":
+            return await self.run(_worker_embed_documents, texts)
+        return await self.run(self.embeddings.embed_documents, texts)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = self._pending
+            rejected = self._rejected
+
+        return {
+            "mode": self.mode,
+            "workers": self.max_workers,
+            "in_flight": pending,
+            # Tasks beyond the worker count are waiting for a free worker
+            "queue_depth": max(0, pending - self.max_workers),
+            "max_queue_size": self.max_queue_size,
+            "rejected": rejected,
+            "queue_wait": self.wait_time.snapshot(),
+            "run_time": self.run_time.snapshot(),
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,57 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class MetadataFilter:
+    """
+    Restricts retrieval to chunks of some documents, sources or report years.
+
+    Empty fields do not filter. Sources match either the full ``source`` path or the
+    ``file_name``. Chunks indexed before ``document_id`` and ``year`` were written to
+    metadata only match once ``scripts/backfill_chunk_metadata.py`` has run.
+    """
+
+    document_ids: Tuple[str, ...] = ()
+    sources: Tuple[str, ...] = ()
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.document_ids or self.sources or self.year_from is not None or self.year_to is not None)
+
+    def where(self) -> Optional[Dict[str, Any]]:
+        """
+        The filter as a Chroma ``where`` clause, or None when it does not filter.
+        """
+        clauses = []
+        if self.document_ids:
+            clauses.append({"document_id": {"$in": list(self.document_ids)}})
+        if self.sources:
+            clauses.append({"$or": [
+                {"source": {"$in": list(self.sources)}},
+                {"file_name": {"$in": list(self.sources)}},
+            ]})
+        if self.year_from is not None:
+            clauses.append({"year": {"$gte": self.year_from}})
+        if self.year_to is not None:
+            clauses.append({"year": {"$lte": self.year_to}})
+
+        if not clauses:
+            return None
+        if len(clauses) == 1:
+            return clauses[0]
+        return {"$and": clauses}
+
+    def matches(self, metadata: Dict[str, Any]) -> bool:
+        if self.document_ids and metadata.get("document_id") not in self.document_ids:
+            return False
+        if self.sources and metadata.get("source") not in self.sources and metadata.get("file_name") not in self.sources:
+            return False
+
+        year = metadata.get("year")
+        if self.year_from is not None and (year is None or year < self.year_from):
+            return False
+        if self.year_to is not None and (year is None or year > self.year_to):
+            return False
+        return True
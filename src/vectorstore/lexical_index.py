@@ -0,0 +1,467 @@
+import json
+import math
+import os
+import re
+import threading
+
+from collections import Counter
+from itertools import chain
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class _GrowableArray:
+    """
+    Numpy array with amortized appends. Views taken before a resize keep pointing
+    at the old buffer, so readers never see a reallocation.
+    """
+
+    def __init__(self, dtype, data: Optional[np.ndarray] = None):
+        self.data = np.array(data if data is not None else [], dtype=dtype)
+        self.size = len(self.data)
+
+    def append(self, value):
+        if self.size == len(self.data):
+            grown = np.zeros(max(1024, 2 * len(self.data)), dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size] = value
+        self.size += 1
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+
+class _Segment:
+    """
+    Immutable postings of the chunks with doc ids in ``[doc_start, doc_end)``, in
+    compressed sparse row form ordered by term. Terms ``[vocab_start, vocab_end)``
+    were first seen in this segment.
+    """
+
+    def __init__(self, name: str, offsets, docs, tfs, doc_start: int, doc_end: int, vocab_start: int, vocab_end: int):
+        self.name = name
+        self.offsets = offsets
+        self.docs = docs
+        self.tfs = tfs
+        self.doc_start = doc_start
+        self.doc_end = doc_end
+        self.vocab_start = vocab_start
+        self.vocab_end = vocab_end
+
+    @property
+    def postings(self) -> int:
+        return len(self.docs)
+
+    def triples(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        terms = np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+        return terms, np.asarray(self.docs), np.asarray(self.tfs)
+
+    def lookup(self, term: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        if term >= len(self.offsets) - 1:
+            return None
+        start, end = self.offsets[term], self.offsets[term + 1]
+        if start == end:
+            return None
+        return self.docs[start:end], self.tfs[start:end]
+
+
+class LexicalIndex:
+    """
+    In-process BM25 index over chunk texts, kept in sync with the vector store.
+
+    New chunks go to an in-memory delta. Once it holds ``merge_postings`` postings,
+    ``flush()`` seals it into an immutable segment. Adjacent segments of similar
+    size are merged, so there are O(log n) of them and each posting is rewritten
+    O(log n) times. Deleted chunks are tombstoned and dropped when their segment is
+    merged. The index is compacted once tombstones outnumber live chunks.
+
+    With a ``directory``, segments are written once and memory-mapped. Adds and
+    deletes since the last seal go to an append-only journal, which is replayed on
+    load, so a flush per document costs one small write.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, k1: float = 1.5, b: float = 0.75, merge_postings: int = 1_000_000):
+        self.directory = directory
+        self.k1 = k1
+        self.b = b
+        self.merge_postings = merge_postings
+
+        self._lock = threading.RLock()
+
+        # Doc ids are positions in chunk_ids; deleted chunks keep theirs until compaction
+        self.chunk_ids: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.doc_len = _GrowableArray(np.float32)
+        self.alive = _GrowableArray(np.bool_)
+        self.total_len = 0.0
+        self.vocab: Dict[str, int] = {}
+        self.terms: List[str] = []
+
+        self.segments: List[_Segment] = []
+        self.delta: Dict[int, Tuple[List[int], List[int]]] = {}
+        self.delta_postings = 0
+        self._next_segment = 0
+        self._saves = 0
+        self._alive_file: Optional[str] = None
+
+        self._journal = None
+        self._pending: List[str] = []
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._load()
+            self._journal = (directory / "journal.jsonl").open("a")
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    def add(self, chunks: Iterable[Tuple[str, str]]):
+        """
+        Indexes ``(chunk_id, text)`` pairs, replacing chunks that are already indexed.
+        """
+        with self._lock:
+            entries = []
+            for chunk_id, text in chunks:
+                counts = Counter(tokenize(text))
+                self._add(chunk_id, counts)
+                entries.append([chunk_id, counts])
+
+            if entries and self._journal is not None:
+                self._pending.append(json.dumps({"add": entries}))
+
+    def delete(self, chunk_ids: Iterable[str]):
+        with self._lock:
+            chunk_ids = list(chunk_ids)
+            for chunk_id in chunk_ids:
+                self._delete(chunk_id)
+            if chunk_ids and self._journal is not None:
+                self._pending.append(json.dumps({"delete": chunk_ids}))
+
+    def flush(self):
+        """
+        Makes the changes since the last flush durable, sealing the delta when it is full.
+        """
+        with self._lock:
+            if self._pending:
+                self._journal.write("\n".join(self._pending) + "\n")
+                self._journal.flush()
+                self._pending.clear()
+
+            if self.delta_postings >= self.merge_postings:
+                self.save()
+
+    def save(self):
+        """
+        Seals the delta into a segment and, with a directory, writes the manifest and
+        truncates the journal. Unflushed changes are included.
+        """
+        with self._lock:
+            self._seal()
+            if len(self.ids) < len(self.chunk_ids) - len(self.ids):
+                self._compact()
+
+            if self._journal is None:
+                return
+
+            # A new file per save, so the previous manifest keeps the liveness it was written with
+            self._saves += 1
+            self._alive_file = f"alive-{self._saves}.npy"
+            np.save(self.directory / self._alive_file, self.alive.view())
+
+            tmp = self.directory / "manifest.tmp.json"
+            tmp.write_text(json.dumps({
+                "segments": [s.name for s in self.segments],
+                "next_segment": self._next_segment,
+                "alive": self._alive_file,
+                "saves": self._saves,
+            }))
+            # Until the manifest is replaced, the previous one plus the journal describes the index
+            os.replace(tmp, self.directory / "manifest.json")
+
+            # Pending entries are covered by the segment just sealed
+            self._pending.clear()
+            self._journal.truncate(0)
+            self._journal.seek(0)
+            self._remove_orphans()
+
+    def close(self):
+        with self._lock:
+            self.save()
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Top ``k`` chunks by BM25, as ``(chunk_id, score)`` pairs.
+
+        Terms are scored from the rarest up (MaxScore). Once the k-th best candidate
+        beats the most the remaining terms could add, no other chunk can enter the top
+        k, so the longer postings lists are only probed for the existing candidates.
+        """
+        with self._lock:
+            live = len(self.ids)
+            terms = [self.vocab[t] for t in set(tokenize(query)) if t in self.vocab]
+            if live == 0 or not terms:
+                return []
+
+            avg_len = self.total_len / live
+            doc_len = self.doc_len.view()
+            alive = self.alive.view()
+            tombstones = len(self.chunk_ids) > live
+
+            # Per term, its postings as one slice per segment plus the delta, in doc id order
+            postings = []
+            for term in terms:
+                pieces = self._postings(term)
+                if tombstones:
+                    pieces = [(docs[alive[docs]], tfs[alive[docs]]) for docs, tfs in pieces]
+                pieces = [(docs, tfs) for docs, tfs in pieces if len(docs)]
+                if pieces:
+                    postings.append(pieces)
+            if not postings:
+                return []
+            postings.sort(key=lambda pieces: sum(len(docs) for docs, _ in pieces))
+
+            weights, bounds = [], []
+            for pieces in postings:
+                df = sum(len(docs) for docs, _ in pieces)
+                idf = math.log(1 + (live - df + 0.5) / (df + 0.5))
+                # Highest contribution the term can make: its largest tf in the shortest possible chunk
+                tf = max(float(tfs.max()) for _, tfs in pieces)
+                weights.append(idf)
+                bounds.append(idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b)))
+
+            scores = np.zeros(len(doc_len), dtype=np.float32)
+            # Same dtype as the postings, or searchsorted would convert every list it probes
+            candidates = np.zeros(0, dtype=np.int32)
+            threshold = 0.0
+            remaining = sum(bounds)
+
+            for pieces, idf, bound in zip(postings, weights, bounds):
+                pruned = len(candidates) >= k and threshold > remaining
+                if pruned:
+                    # Only candidates that can still reach the k-th score are worth probing
+                    candidates = candidates[scores[candidates] + remaining >= threshold]
+                    probed = []
+                    for docs, tfs in pieces:
+                        positions = np.minimum(np.searchsorted(docs, candidates), len(docs) - 1)
+                        hit = docs[positions] == candidates
+                        probed.append((candidates[hit], tfs[positions[hit]]))
+                    pieces = probed
+
+                for docs, tfs in pieces:
+                    norm = tfs + self.k1 * (1 - self.b + self.b * doc_len[docs] / avg_len)
+                    scores[docs] += idf * tfs * (self.k1 + 1) / norm
+                remaining -= bound
+
+                if not pruned:
+                    if len(candidates) + sum(len(docs) for docs, _ in pieces) < len(scores) // 16:
+                        # All parts are sorted, and timsort merges sorted runs in linear time
+                        merged = np.sort(np.concatenate([candidates] + [docs for docs, _ in pieces]), kind="stable")
+                        candidates = merged[np.concatenate(([True], merged[1:] != merged[:-1]))]
+                    else:
+                        # Scanning the score array beats sorting a large share of it
+                        candidates = np.flatnonzero(scores).astype(np.int32)
+                if len(candidates) >= k:
+                    threshold = float(np.partition(scores[candidates], len(candidates) - k)[len(candidates) - k])
+
+            candidate_scores = scores[candidates]
+            if len(candidates) > k:
+                top = np.argpartition(-candidate_scores, k - 1)[:k]
+            else:
+                top = np.arange(len(candidates))
+            top = top[np.argsort(-candidate_scores[top], kind="stable")]
+
+            return [(self.chunk_ids[candidates[i]], float(candidate_scores[i])) for i in top]
+
+    def _add(self, chunk_id: str, counts: Dict[str, int]):
+        if chunk_id in self.ids:
+            self._delete(chunk_id)
+
+        doc = len(self.chunk_ids)
+        length = sum(counts.values())
+        self.chunk_ids.append(chunk_id)
+        self.ids[chunk_id] = doc
+        self.doc_len.append(length)
+        self.alive.append(True)
+        self.total_len += length
+
+        for term, tf in counts.items():
+            index = self.vocab.get(term)
+            if index is None:
+                index = self.vocab[term] = len(self.terms)
+                self.terms.append(term)
+            docs, tfs = self.delta.setdefault(index, ([], []))
+            docs.append(doc)
+            tfs.append(tf)
+        self.delta_postings += len(counts)
+
+    def _delete(self, chunk_id: str):
+        doc = self.ids.pop(chunk_id, None)
+        if doc is None:
+            return
+        self.alive.data[doc] = False
+        self.total_len -= float(self.doc_len.data[doc])
+
+    def _postings(self, term: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        pieces = []
+        for segment in self.segments:
+            found = segment.lookup(term)
+            if found is not None:
+                pieces.append(found)
+
+        if term in self.delta:
+            docs, tfs = self.delta[term]
+            pieces.append((np.array(docs, dtype=np.int32), np.array(tfs, dtype=np.float32)))
+        return pieces
+
+    def _seal(self):
+        doc_start = self.segments[-1].doc_end if self.segments else 0
+        vocab_start = self.segments[-1].vocab_end if self.segments else 0
+        if doc_start == len(self.chunk_ids) and vocab_start == len(self.terms):
+            return
+
+        lists = self.delta.values()
+        terms = np.repeat(
+            np.fromiter(self.delta.keys(), dtype=np.int64, count=len(self.delta)),
+            np.fromiter((len(docs) for docs, _ in lists), dtype=np.int64, count=len(self.delta)),
+        )
+        docs = np.fromiter(chain.from_iterable(docs for docs, _ in lists), dtype=np.int32, count=len(terms))
+        tfs = np.fromiter(chain.from_iterable(tfs for _, tfs in lists), dtype=np.float32, count=len(terms))
+
+        self.segments.append(self._build(terms, docs, tfs, doc_start, len(self.chunk_ids), vocab_start, len(self.terms)))
+        self.delta = {}
+        self.delta_postings = 0
+
+        # Merging neighbours of similar size keeps the segment count logarithmic
+        while len(self.segments) > 1 and self.segments[-2].postings <= 2 * self.segments[-1].postings:
+            newer = self.segments.pop()
+            older = self.segments.pop()
+            self.segments.append(self._merge([older, newer]))
+
+    def _merge(self, segments: List[_Segment]) -> _Segment:
+        terms, docs, tfs = (np.concatenate(parts) for parts in zip(*(s.triples() for s in segments)))
+        return self._build(terms, docs, tfs, segments[0].doc_start, segments[-1].doc_end, segments[0].vocab_start, segments[-1].vocab_end)
+
+    def _compact(self):
+        """
+        Rewrites the index as one segment without tombstoned chunks, renumbering doc ids.
+        """
+        alive = self.alive.view()
+        terms, docs, tfs = (np.concatenate(parts) for parts in zip(*(s.triples() for s in self.segments)))
+        keep = alive[docs]
+        renumber = np.cumsum(alive, dtype=np.int64) - 1
+        terms, docs, tfs = terms[keep], renumber[docs[keep]], tfs[keep]
+
+        self.chunk_ids = [chunk_id for chunk_id, is_alive in zip(self.chunk_ids, alive) if is_alive]
+        self.ids = {chunk_id: doc for doc, chunk_id in enumerate(self.chunk_ids)}
+        self.doc_len = _GrowableArray(np.float32, self.doc_len.view()[alive])
+        self.alive = _GrowableArray(np.bool_, np.ones(len(self.chunk_ids), dtype=np.bool_))
+        self.segments = [self._build(terms, docs, tfs, 0, len(self.chunk_ids), 0, len(self.terms))]
+
+    def _build(self, terms, docs, tfs, doc_start: int, doc_end: int, vocab_start: int, vocab_end: int) -> _Segment:
+        keep = self.alive.view()[docs] if len(docs) else np.zeros(0, dtype=np.bool_)
+        terms, docs, tfs = terms[keep], docs[keep], tfs[keep]
+
+        # Stable, so each term's postings stay in doc id order
+        order = np.argsort(terms, kind="stable")
+        offsets = np.zeros(vocab_end + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(terms, minlength=vocab_end))
+
+        name = f"seg-{self._next_segment}"
+        self._next_segment += 1
+        segment = _Segment(name, offsets, docs[order].astype(np.int32), tfs[order].astype(np.float32), doc_start, doc_end, vocab_start, vocab_end)
+        if self.directory is not None:
+            segment = self._write_segment(segment)
+        return segment
+
+    def _write_segment(self, segment: _Segment) -> _Segment:
+        prefix = self.directory / segment.name
+        np.save(f"{prefix}.offsets.npy", segment.offsets)
+        np.save(f"{prefix}.docs.npy", segment.docs)
+        np.save(f"{prefix}.tfs.npy", segment.tfs)
+        np.save(f"{prefix}.doc_len.npy", self.doc_len.view()[segment.doc_start:segment.doc_end])
+        Path(f"{prefix}.json").write_text(json.dumps({
+            "doc_start": segment.doc_start,
+            "doc_end": segment.doc_end,
+            "vocab_start": segment.vocab_start,
+            "vocab_end": segment.vocab_end,
+            "chunk_ids": self.chunk_ids[segment.doc_start:segment.doc_end],
+            "terms": self.terms[segment.vocab_start:segment.vocab_end],
+        }))
+        return self._open_segment(segment.name)[0]
+
+    def _open_segment(self, name: str) -> Tuple[_Segment, Dict, np.ndarray]:
+        prefix = self.directory / name
+        meta = json.loads(Path(f"{prefix}.json").read_text())
+        segment = _Segment(
+            name,
+            np.load(f"{prefix}.offsets.npy", mmap_mode="r"),
+            np.load(f"{prefix}.docs.npy", mmap_mode="r"),
+            np.load(f"{prefix}.tfs.npy", mmap_mode="r"),
+            meta["doc_start"],
+            meta["doc_end"],
+            meta["vocab_start"],
+            meta["vocab_end"],
+        )
+        return segment, meta, np.load(f"{prefix}.doc_len.npy")
+
+    def _remove_orphans(self):
+        # Segments replaced by a merge, or written before a crash but never listed
+        live = {segment.name for segment in self.segments}
+        for path in self.directory.glob("seg-*"):
+            if path.name.split(".")[0] not in live:
+                path.unlink(missing_ok=True)
+
+        # Liveness of earlier saves, including the unnumbered file of older indexes
+        for path in self.directory.glob("alive*.npy"):
+            if path.name != self._alive_file:
+                path.unlink(missing_ok=True)
+
+    def _load(self):
+        manifest = self.directory / "manifest.json"
+        if manifest.exists():
+            state = json.loads(manifest.read_text())
+            self._next_segment = state["next_segment"]
+            self._saves = state.get("saves", 0)
+            self._alive_file = state.get("alive", "alive.npy")
+
+            doc_len = []
+            for name in state["segments"]:
+                segment, meta, lengths = self._open_segment(name)
+                self.segments.append(segment)
+                self.chunk_ids.extend(meta["chunk_ids"])
+                self.terms.extend(meta["terms"])
+                doc_len.append(lengths)
+
+            self.vocab = {term: index for index, term in enumerate(self.terms)}
+            if doc_len:
+                self.doc_len = _GrowableArray(np.float32, np.concatenate(doc_len))
+            self.alive = _GrowableArray(np.bool_, np.load(self.directory / self._alive_file))
+            self.ids = {chunk_id: doc for doc, chunk_id in enumerate(self.chunk_ids) if self.alive.data[doc]}
+            self.total_len = float(self.doc_len.view()[self.alive.view()].sum())
+
+        self._remove_orphans()
+
+        journal = self.directory / "journal.jsonl"
+        if journal.exists():
+            for line in journal.read_text().splitlines():
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn final line from a crash; everything before it is intact
+                    break
+                for chunk_id, counts in entry.get("add", []):
+                    self._add(chunk_id, counts)
+                for chunk_id in entry.get("delete", []):
+                    self._delete(chunk_id)
@@ -0,0 +1,524 @@
+import asyncio
+import fcntl
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from vectorstore.quantization import QUANTIZATIONS, RESCORE_FACTORS, code_bytes, code_scores, encode
+from vectorstore.sqlite_batches import in_batches
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    id TEXT PRIMARY KEY,
+    row INTEGER NOT NULL,
+    document TEXT NOT NULL,
+    metadata TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE UNIQUE INDEX IF NOT EXISTS chunks_row ON chunks (row);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class IndexLocked(RuntimeError):
+    pass
+
+
+def lock_directory(directory: Path, shared: bool = False) -> int:
+    """
+    Takes an advisory ``flock`` on the index directory and returns the descriptor
+    holding it. Fails at once instead of waiting when another process holds it.
+    """
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        fcntl.flock(fd, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        raise IndexLocked(f"{directory} is in use by another process, such as the API or an ingest run; stop it first")
+    return fd
+
+
+@contextmanager
+def locked_directory(directory: Path, shared: bool = False):
+    fd = lock_directory(directory, shared=shared)
+    try:
+        yield
+    finally:
+        os.close(fd)
+
+
+_COMPARISONS = {"$eq": "=", "$ne": "!=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+
+def where_sql(where: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """
+    Translates a Chroma ``where`` clause into SQL over the JSON metadata column.
+    """
+    clauses, params = [], []
+    for key, condition in where.items():
+        if key in ("$and", "$or"):
+            parts = [where_sql(part) for part in condition]
+            clauses.append("(" + f" {key[1:].upper()} ".join(sql for sql, _ in parts) + ")")
+            params.extend(p for _, part_params in parts for p in part_params)
+            continue
+
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for operator, value in condition.items():
+            field = "json_extract(metadata, ?)"
+            params.append(f'$."{key}"')
+            if operator in ("$in", "$nin"):
+                negate = "NOT " if operator == "$nin" else ""
+                clauses.append(f"{field} {negate}IN ({','.join('?' * len(value))})")
+                params.extend(value)
+            elif operator in _COMPARISONS:
+                clauses.append(f"{field} {_COMPARISONS[operator]} ?")
+                params.append(value)
+            else:
+                raise ValueError(f"Unsupported where operator: {operator}")
+
+    return " AND ".join(clauses) if clauses else "1", params
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class LocalVectorStore:
+    """
+    In-process vector store for corpora that fit in memory, used instead of a Chroma
+    server to avoid an HTTP round trip per search.
+
+    Unit-normalized float32 vectors are appended to a flat file that is memory-mapped
+    for reading; ids, texts and metadata live in SQLite, whose commit is the point
+    where an upsert or delete becomes durable. Rows written but never committed are
+    dead, as are deleted and replaced ones; once dead rows outnumber live ones the
+    file is compacted into a new generation. Search is an exact cosine scan in
+    blocks, restricted up front to the rows matching a metadata filter.
+
+    With ``quantization`` set to ``int8`` or ``binary``, a second file holds compact
+    codes of every row and the scan runs over those instead: the best
+    ``k * rescore_factor`` rows are then rescored against the float32 file, so only
+    the codes need to stay in memory. Codes missing on open, e.g. after switching
+    the setting, are rebuilt from the float32 vectors.
+
+    One process writes at a time: a writer holds an exclusive lock on the directory
+    until it is closed, and opening a second writer raises ``IndexLocked``. Recovery
+    on open (dropping files of other generations and torn rows) only happens under
+    that lock, which ``locked_directory`` takes as well. ``read_only`` opens take no
+    lock and change nothing on disk.
+
+    Mirrors the subset of the LangChain ``Chroma`` API that ``VectorStoreBuilder`` uses.
+    Like Chroma's, search scores are distances (here ``1 - cosine similarity``), so
+    lower is better.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        embedding_function: Optional[Embeddings] = None,
+        block_size: int = 65536,
+        quantization: str = "none",
+        rescore_factor: Optional[int] = None,
+        read_only: bool = False,
+    ):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization: {quantization}")
+
+        self.directory = Path(directory)
+        self.read_only = read_only
+        self._lock_fd: Optional[int] = None
+        if read_only:
+            if not (self.directory / "chunks.db").exists():
+                raise FileNotFoundError(f"No vector store in {self.directory}")
+        else:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._lock_fd = lock_directory(self.directory)
+
+        self.embedding_function = embedding_function
+        self.block_size = block_size
+        self.quantization = quantization
+        self.rescore_factor = rescore_factor or RESCORE_FACTORS.get(quantization, 1)
+
+        self._lock = threading.RLock()
+        if read_only:
+            self._conn = sqlite3.connect(f"file:{self.directory / 'chunks.db'}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(str(self.directory / "chunks.db"), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+        meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        self.dim: Optional[int] = int(meta["dim"]) if "dim" in meta else None
+        self.generation = int(meta.get("generation", 0))
+
+        if not read_only:
+            # Files of other generations are left over from an interrupted compaction
+            current = {self._vectors_path(self.generation), self._codes_path(self.generation)}
+            for path in [*self.directory.glob("vectors-*.f32"), *self.directory.glob("codes-*")]:
+                if path not in current:
+                    path.unlink()
+
+        self._rows = 0
+        self._matrix: Optional[np.ndarray] = None
+        self._codes: Optional[np.ndarray] = None
+        self._alive = np.zeros(0, dtype=bool)
+        self._load()
+
+    def _vectors_path(self, generation: int) -> Path:
+        return self.directory / f"vectors-{generation}.f32"
+
+    def _codes_path(self, generation: int) -> Path:
+        return self.directory / f"codes-{generation}.{self.quantization}"
+
+    @property
+    def quantized(self) -> bool:
+        return self.quantization != "none"
+
+    @property
+    def bytes_per_chunk(self) -> Optional[int]:
+        """
+        Bytes per chunk scanned by the first pass, which is what has to stay resident.
+        """
+        if self.dim is None:
+            return None
+        return code_bytes(self.quantization, self.dim) if self.quantized else self.dim * 4
+
+    def _load(self):
+        path = self._vectors_path(self.generation)
+        if self.dim is None or not path.exists():
+            return
+
+        row_bytes = self.dim * 4
+        size = path.stat().st_size
+        if size % row_bytes and not self.read_only:
+            # A torn final row from a crash mid-append was never committed
+            os.truncate(path, size - size % row_bytes)
+        self._rows = size // row_bytes
+
+        codes = self._codes_path(self.generation)
+        stale = not codes.exists() or codes.stat().st_size != self._rows * self.bytes_per_chunk
+        if self.quantized and stale and not self.read_only:
+            self._write_codes(codes, np.arange(self._rows))
+        self._remap()
+
+        alive = np.zeros(self._rows, dtype=bool)
+        rows = np.fromiter((row for (row,) in self._conn.execute("SELECT row FROM chunks")), dtype=np.int64)
+        alive[rows] = True
+        self._alive = alive
+
+    def _remap(self):
+        if self._rows:
+            self._matrix = np.memmap(self._vectors_path(self.generation), dtype=np.float32, mode="r", shape=(self._rows, self.dim))
+        else:
+            self._matrix = None
+
+        codes = self._codes_path(self.generation)
+        # A read-only open without matching codes scans the float32 vectors instead
+        if self._rows and self.quantized and codes.exists() and codes.stat().st_size >= self._rows * self.bytes_per_chunk:
+            self._codes = np.memmap(self._codes_path(self.generation), dtype=np.uint8, mode="r", shape=(self._rows, self.bytes_per_chunk))
+        else:
+            self._codes = None
+
+    def _write_codes(self, path: Path, rows: np.ndarray):
+        # Encodes the given rows of the current float32 file, block by block
+        matrix = np.memmap(self._vectors_path(self.generation), dtype=np.float32, mode="r", shape=(self._rows, self.dim))
+        with path.open("wb") as f:
+            for start in range(0, len(rows), self.block_size):
+                f.write(encode(self.quantization, np.asarray(matrix[rows[start:start + self.block_size]])).tobytes())
+
+    @property
+    def size(self) -> int:
+        return int(self._alive.sum())
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]], documents: List[str], metadatas: List[Dict[str, Any]]):
+        if not ids:
+            return
+        self._check_writable()
+        vectors = np.asarray(embeddings, dtype=np.float32)
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('dim', ?)", (str(self.dim),))
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Vector store holds {self.dim}-dimensional embeddings, got {vectors.shape[1]}")
+
+            start = self._rows
+            vectors = _normalize(vectors)
+            with self._vectors_path(self.generation).open("ab") as f:
+                f.write(vectors.tobytes())
+            if self.quantized:
+                # A crash between the two appends is repaired on open by re-encoding
+                with self._codes_path(self.generation).open("ab") as f:
+                    f.write(encode(self.quantization, vectors).tobytes())
+
+            replaced = self._rows_of(ids)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?)",
+                [(chunk_id, start + i, text, json.dumps(metadata or {})) for i, (chunk_id, text, metadata) in enumerate(zip(ids, documents, metadatas))],
+            )
+            self._conn.commit()
+
+            # Readers keep the arrays they started with, so both are replaced rather than mutated
+            alive = np.concatenate([self._alive, np.zeros(len(ids), dtype=bool)])
+            alive[replaced] = False
+            # An id repeated within the batch keeps its last row
+            alive[start + self._last_rows(ids)] = True
+            self._rows = start + len(ids)
+            self._alive = alive
+            self._remap()
+            self._maybe_compact()
+
+    @staticmethod
+    def _last_rows(ids: List[str]) -> np.ndarray:
+        last = {chunk_id: i for i, chunk_id in enumerate(ids)}
+        return np.fromiter(last.values(), dtype=np.int64, count=len(last))
+
+    def add_documents(self, documents: List[Document], ids: Optional[List[str]] = None):
+        ids = ids if ids is not None else [doc.metadata["chunk_id"] for doc in documents]
+        texts = [doc.page_content for doc in documents]
+        self.upsert(ids, self.embedding_function.embed_documents(texts), texts, [doc.metadata for doc in documents])
+
+    def delete(self, ids: Optional[List[str]] = None):
+        if not ids:
+            return
+        self._check_writable()
+        with self._lock:
+            rows = self._rows_of(ids)
+            for placeholders, batch in in_batches(ids):
+                self._conn.execute(f"DELETE FROM chunks WHERE id IN ({placeholders})", batch)
+            self._conn.commit()
+
+            alive = self._alive.copy()
+            alive[rows] = False
+            self._alive = alive
+            self._maybe_compact()
+
+    def _check_writable(self):
+        if self.read_only:
+            raise PermissionError(f"{self.directory} was opened read-only")
+
+    def _rows_of(self, ids: List[str]) -> np.ndarray:
+        rows = []
+        for placeholders, batch in in_batches(ids):
+            rows.extend(row for (row,) in self._conn.execute(f"SELECT row FROM chunks WHERE id IN ({placeholders})", batch))
+        return np.asarray(rows, dtype=np.int64)
+
+    def _maybe_compact(self):
+        live = int(self._alive.sum())
+        if self._rows - live > live:
+            self.compact()
+
+    def compact(self):
+        """
+        Rewrites the live rows into a new generation of the vector file.
+        """
+        self._check_writable()
+        with self._lock:
+            live = np.flatnonzero(self._alive)
+            generation = self.generation + 1
+            with self._vectors_path(generation).open("wb") as f:
+                for start in range(0, len(live), self.block_size):
+                    f.write(np.ascontiguousarray(self._matrix[live[start:start + self.block_size]]).tobytes())
+
+            if self.quantized:
+                with self._codes_path(generation).open("wb") as f:
+                    for start in range(0, len(live), self.block_size):
+                        f.write(np.ascontiguousarray(self._codes[live[start:start + self.block_size]]).tobytes())
+
+            # Rows only move down, in ascending order, so the unique row index never collides
+            self._conn.executemany("UPDATE chunks SET row = ? WHERE row = ?", ((new, int(old)) for new, old in enumerate(live)))
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('generation', ?)", (str(generation),))
+            self._conn.commit()
+
+            previous = [self._vectors_path(self.generation), self._codes_path(self.generation)]
+            self.generation = generation
+            self._rows = len(live)
+            self._alive = np.ones(len(live), dtype=bool)
+            self._remap()
+            for path in previous:
+                path.unlink(missing_ok=True)
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self, embedding: List[float], k: int = 4, filter: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[Document, float]]:
+        query = _normalize(np.asarray(embedding, dtype=np.float32))
+        if self.dim is not None and len(query) != self.dim:
+            raise ValueError(f"Vector store holds {self.dim}-dimensional embeddings, got a {len(query)}-dimensional query")
+
+        while True:
+            with self._lock:
+                generation, matrix, codes, alive = self.generation, self._matrix, self._codes, self._alive
+                allowed = self._filter_rows(filter) if filter else None
+            if matrix is None:
+                return []
+
+            rows, scores = self._top_k(matrix, codes, alive, query, k, allowed)
+
+            with self._lock:
+                # A compaction renumbered the rows in between; search the new generation
+                if self.generation != generation:
+                    continue
+                documents = self._documents_at(rows)
+            return [(documents[row], 1.0 - float(score)) for row, score in zip(rows, scores) if row in documents]
+
+    async def asimilarity_search_with_score(self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None) -> List[Tuple[Document, float]]:
+        embedding = await asyncio.to_thread(self.embedding_function.embed_query, query)
+        return await asyncio.to_thread(self.similarity_search_by_vector_with_relevance_scores, embedding, k, filter=filter)
+
+    def _filter_rows(self, where: Dict[str, Any]) -> np.ndarray:
+        sql, params = where_sql(where)
+        return np.fromiter((row for (row,) in self._conn.execute(f"SELECT row FROM chunks WHERE {sql}", params)), dtype=np.int64)
+
+    def _top_k(self, matrix: np.ndarray, codes: Optional[np.ndarray], alive: np.ndarray, query: np.ndarray, k: int, allowed: Optional[np.ndarray]):
+        rows = len(alive)
+        if allowed is not None and len(allowed) < rows // 4:
+            # Selective filters score only their rows instead of scanning everything
+            candidates = np.sort(allowed[alive[allowed]])
+            scores = matrix[candidates] @ query if len(candidates) else np.zeros(0, dtype=np.float32)
+            return self._select(candidates, scores, k)
+
+        mask = alive
+        if allowed is not None:
+            mask = np.zeros(rows, dtype=bool)
+            mask[allowed] = True
+            mask &= alive
+
+        if codes is None:
+            return self._scan(lambda start, end: matrix[start:end] @ query, mask, k)
+
+        candidates, _ = self._scan(lambda start, end: code_scores(self.quantization, codes[start:end], query), mask, k * self.rescore_factor)
+        # Reading the candidates in file order keeps the float32 page faults sequential
+        candidates = np.sort(candidates)
+        return self._select(candidates, matrix[candidates] @ query, k)
+
+    def _scan(self, score_block, mask: np.ndarray, k: int):
+        best_rows, best_scores = [], []
+        for start in range(0, len(mask), self.block_size):
+            block = mask[start:start + self.block_size]
+            if not block.any():
+                continue
+            scores = score_block(start, start + len(block))
+            scores[~block] = -np.inf
+            block_rows, block_scores = self._select(np.arange(start, start + len(block)), scores, k)
+            best_rows.append(block_rows)
+            best_scores.append(block_scores)
+
+        if not best_rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        return self._select(np.concatenate(best_rows), np.concatenate(best_scores), k)
+
+    @staticmethod
+    def _select(rows: np.ndarray, scores: np.ndarray, k: int):
+        keep = np.isfinite(scores)
+        rows, scores = rows[keep], scores[keep]
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return rows[order], scores[order]
+
+    def _documents_at(self, rows: Iterable[int]) -> Dict[int, Document]:
+        rows = [int(row) for row in rows]
+        found = {}
+        for placeholders, batch in in_batches(rows):
+            for chunk_id, row, text, metadata in self._conn.execute(
+                f"SELECT id, row, document, metadata FROM chunks WHERE row IN ({placeholders})", batch
+            ):
+                found[row] = Document(id=chunk_id, page_content=text, metadata=json.loads(metadata))
+        return found
+
+    def get_by_ids(self, ids: List[str]) -> List[Document]:
+        documents = []
+        with self._lock:
+            for placeholders, batch in in_batches(ids):
+                for chunk_id, text, metadata in self._conn.execute(
+                    f"SELECT id, document, metadata FROM chunks WHERE id IN ({placeholders})", batch
+                ):
+                    documents.append(Document(id=chunk_id, page_content=text, metadata=json.loads(metadata)))
+        return documents
+
+    def get(self, limit: Optional[int] = None, offset: int = 0, include: Optional[List[str]] = None) -> Dict[str, List]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, document, metadata FROM chunks ORDER BY row LIMIT ? OFFSET ?",
+                (-1 if limit is None else limit, offset),
+            ).fetchall()
+        return {
+            "ids": [chunk_id for chunk_id, _, _ in rows],
+            "documents": [text for _, text, _ in rows],
+            "metadatas": [json.loads(metadata) for _, _, metadata in rows],
+        }
+
+    def heartbeat(self) -> int:
+        return time.time_ns()
+
+    def snapshot(self, target: Path):
+        """
+        Copies a consistent image of the store to ``target``; writers wait until it is done.
+        """
+        target = Path(target)
+        target.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._conn.commit()
+            destination = sqlite3.connect(str(target / "chunks.db"))
+            with destination:
+                self._conn.backup(destination)
+            destination.close()
+
+            files = [(self._vectors_path(self.generation), self.dim * 4 if self.dim else 0)]
+            if self.quantized:
+                files.append((self._codes_path(self.generation), self.bytes_per_chunk or 0))
+            for path, row_bytes in files:
+                if path.exists():
+                    shutil.copyfile(path, target / path.name)
+                    # Only whole rows; anything past them was never committed
+                    os.truncate(target / path.name, self._rows * row_bytes)
+
+    @staticmethod
+    def restore(snapshot: Path, directory: Path):
+        """
+        Replaces the store in ``directory`` with a snapshot. The caller holds
+        ``locked_directory(directory)``, so no writer has the store open.
+        """
+        snapshot, directory = Path(snapshot), Path(directory)
+        if not (snapshot / "chunks.db").exists():
+            raise FileNotFoundError(f"No vector store snapshot in {snapshot}")
+
+        for path in [*directory.glob("vectors-*.f32"), *directory.glob("codes-*"), *directory.glob("chunks.db*")]:
+            path.unlink()
+        for path in [snapshot / "chunks.db", *snapshot.glob("vectors-*.f32"), *snapshot.glob("codes-*")]:
+            shutil.copy2(path, directory / path.name)
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+            self._matrix = None
+            self._codes = None
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+
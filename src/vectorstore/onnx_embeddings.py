@@ -0,0 +1,197 @@
+import json
+
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from langchain_core.embeddings import Embeddings
+
+CONFIG_FILE = "embedding.json"
+TOKENIZER_FILE = "tokenizer.json"
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+
+POOLINGS = ("mean", "cls", "lasttoken")
+
+
+def pool(hidden: np.ndarray, attention_mask: np.ndarray, pooling: str) -> np.ndarray:
+    """
+    Reduces ``(batch, tokens, hidden)`` states to one vector per text the way the
+    sentence-transformers ``Pooling`` module does.
+    """
+    if pooling == "mean":
+        mask = attention_mask[:, :, None].astype(hidden.dtype)
+        return (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+    if pooling == "cls":
+        return hidden[:, 0]
+
+    if pooling == "lasttoken":
+        # Last attended position, whichever side the tokenizer pads on
+        positions = np.arange(attention_mask.shape[1])
+        last = (attention_mask * positions).argmax(axis=1)
+        return hidden[np.arange(len(hidden)), last]
+
+    raise ValueError(f"Unknown pooling: {pooling}")
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    Runs an embedding model exported by ``export_onnx`` on onnxruntime instead of
+    PyTorch: the transformer is an ONNX graph, and tokenization, pooling and
+    normalization follow the sentence-transformers configuration recorded at export.
+
+    ``quantized`` loads the int8 dynamically quantized graph, which is faster but only
+    approximately equal to the float32 model. ``intra_op_threads`` of ``0`` lets
+    onnxruntime use one thread per physical core. Texts are sorted by length before
+    batching so each batch carries little padding.
+    """
+
+    def __init__(self, directory: Path, quantized: bool = False, intra_op_threads: int = 0, batch_size: int = 64):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        self.directory = Path(directory)
+        self.config = json.loads((self.directory / CONFIG_FILE).read_text())
+        self.batch_size = batch_size
+
+        self.tokenizer = Tokenizer.from_file(str(self.directory / TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(self.config["max_length"])
+        self.tokenizer.enable_padding(
+            direction=self.config["padding_side"],
+            pad_id=self.config["pad_token_id"],
+            pad_token=self.config["pad_token"],
+        )
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+
+        model_file = QUANTIZED_MODEL_FILE if quantized else MODEL_FILE
+        self.session = onnxruntime.InferenceSession(
+            str(self.directory / model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+    @property
+    def model_name(self) -> str:
+        return self.config["model"]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = np.empty((len(texts), self.config["dimension"]), dtype=np.float32)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            vectors[batch] = self._embed_batch([texts[i] for i in batch])
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed_batch([text])[0].tolist()
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        # Same preprocessing as HuggingFaceEmbeddings and the model's default prompt
+        prompt = self.config.get("prompt", "")
+        encodings = self.tokenizer.encode_batch([prompt + text.replace("\n", " ") for text in texts])
+
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        inputs = {
+            "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+            "attention_mask": attention_mask,
+        }
+        if "token_type_ids" in self.input_names:
+            inputs["token_type_ids"] = np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+
+        (hidden,) = self.session.run(["last_hidden_state"], inputs)
+        vectors = pool(hidden.astype(np.float32), attention_mask, self.config["pooling"])
+        return normalize(vectors) if self.config["normalize"] else vectors
+
+
+def export_onnx(model_name: str, directory: Path, quantize: bool = False, opset: int = 17) -> Dict[str, Any]:
+    """
+    Exports the transformer of a sentence-transformers model to ``directory`` along
+    with its fast tokenizer and the pooling settings ``OnnxEmbeddings`` needs. With
+    ``quantize`` an int8 dynamically quantized copy of the graph is written as well.
+    Needs torch and sentence-transformers, unlike loading the export.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize, Pooling
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0]
+    pooling = next(module for module in model if isinstance(module, Pooling)).get_pooling_mode_str()
+    if pooling not in POOLINGS:
+        raise ValueError(f"Pooling {pooling!r} is not supported by the ONNX backend")
+
+    tokenizer = transformer.tokenizer
+    tokenizer.backend_tokenizer.save(str(directory / TOKENIZER_FILE))
+
+    config = {
+        "model": model_name,
+        "dimension": model.get_sentence_embedding_dimension(),
+        "pooling": pooling,
+        "normalize": any(isinstance(module, Normalize) for module in model),
+        "max_length": model.max_seq_length,
+        "padding_side": tokenizer.padding_side,
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": tokenizer.pad_token_id,
+        "prompt": model.prompts.get(model.default_prompt_name, "") if model.default_prompt_name else "",
+    }
+
+    class LastHiddenState(torch.nn.Module):
+        def __init__(self, auto_model, input_names):
+            super().__init__()
+            self.auto_model = auto_model
+            self.input_names = input_names
+
+        def forward(self, *inputs):
+            return self.auto_model(**dict(zip(self.input_names, inputs))).last_hidden_state
+
+    input_names = ["input_ids", "attention_mask"]
+    sample = tokenizer(["export sample", "a longer export sample text"], padding=True, return_tensors="pt")
+    if "token_type_ids" in sample:
+        input_names.append("token_type_ids")
+
+    dynamic_axes = {name: {0: "batch", 1: "tokens"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "tokens"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            LastHiddenState(transformer.auto_model.eval(), input_names),
+            tuple(sample[name] for name in input_names),
+            str(directory / MODEL_FILE),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            dynamo=False,
+        )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        # Models over 2 GB keep their weights next to the graph
+        quantize_dynamic(
+            str(directory / MODEL_FILE),
+            str(directory / QUANTIZED_MODEL_FILE),
+            weight_type=QuantType.QInt8,
+            use_external_data_format=True,
+        )
+
+    (directory / CONFIG_FILE).write_text(json.dumps(config, indent=2))
+    return config
+
@@ -0,0 +1,71 @@
+import numpy as np
+
+QUANTIZATIONS = ("none", "int8", "binary")
+
+# First-pass candidates per result; sign bits alone rank neighbours much more coarsely than int8
+RESCORE_FACTORS = {"int8": 4, "binary": 32}
+
+_INT8_ROWS = 512
+
+# Bits set per byte value, for numpy versions without np.bitwise_count
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def code_bytes(kind: str, dim: int) -> int:
+    """
+    Bytes per vector in the first-pass file: a float32 scale plus one signed byte per
+    dimension for ``int8``, one bit per dimension for ``binary``.
+    """
+    if kind == "int8":
+        return 4 + dim
+    if kind == "binary":
+        return (dim + 7) // 8
+    raise ValueError(f"Unknown quantization: {kind}")
+
+
+def encode(kind: str, vectors: np.ndarray) -> np.ndarray:
+    """
+    Quantizes float32 rows into ``uint8`` rows of ``code_bytes(kind, dim)``.
+    """
+    if kind == "binary":
+        return np.packbits(vectors > 0, axis=1)
+
+    if kind == "int8":
+        # Each row gets its own scale, so codes never depend on vectors added later
+        scales = np.abs(vectors).max(axis=1, keepdims=True) / 127
+        scales[scales == 0] = 1
+        codes = np.rint(vectors / scales).astype(np.int8)
+        return np.hstack([scales.astype(np.float32).view(np.uint8), codes.view(np.uint8)])
+
+    raise ValueError(f"Unknown quantization: {kind}")
+
+
+def code_scores(kind: str, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """
+    First-pass similarity of each code row to a unit-normalized float32 query, higher
+    is better. ``int8`` approximates the dot product; ``binary`` ranks by Hamming
+    distance to the query's sign bits.
+    """
+    if kind == "int8":
+        scales = np.ascontiguousarray(codes[:, :4]).view(np.float32)[:, 0]
+        values = codes[:, 4:].view(np.int8)
+        dots = np.empty(len(codes), dtype=np.float32)
+        # numpy has no int8 matrix product, so rows are widened to float32 in cache-sized pieces
+        buffer = np.empty((_INT8_ROWS, values.shape[1]), dtype=np.float32)
+        for start in range(0, len(values), _INT8_ROWS):
+            piece = values[start:start + _INT8_ROWS]
+            np.copyto(buffer[:len(piece)], piece, casting="unsafe")
+            dots[start:start + len(piece)] = buffer[:len(piece)] @ query
+        return scales * dots
+
+    if kind == "binary":
+        difference = codes ^ np.packbits(query > 0)
+        if hasattr(np, "bitwise_count") and difference.shape[1] % 8 == 0:
+            distance = np.bitwise_count(difference.view(np.uint64)).sum(axis=1, dtype=np.int32)
+        elif hasattr(np, "bitwise_count"):
+            distance = np.bitwise_count(difference).sum(axis=1, dtype=np.int32)
+        else:
+            distance = _POPCOUNT[difference].sum(axis=1, dtype=np.int32)
+        return -distance.astype(np.float32)
+
+    raise ValueError(f"Unknown quantization: {kind}")
@@ -0,0 +1,13 @@
+from typing import Iterator, List, Sequence, Tuple
+
+# Stay well below SQLite's bound-parameter limit
+QUERY_BATCH = 500
+
+
+def in_batches(values: Sequence) -> Iterator[Tuple[str, List]]:
+    """
+    Splits ``values`` for ``IN (...)`` clauses, yielding the placeholders and values of each batch.
+    """
+    for start in range(0, len(values), QUERY_BATCH):
+        batch = list(values[start:start + QUERY_BATCH])
+        yield ",".join("?" * len(batch)), batch
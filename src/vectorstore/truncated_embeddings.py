@@ -0,0 +1,40 @@
+from typing import Callable, List
+
+import numpy as np
+
+from langchain_core.embeddings import Embeddings
+
+
+def truncate(vectors: List[List[float]], dimension: int) -> List[List[float]]:
+    """
+    Keeps the first ``dimension`` components of each vector and rescales it to unit length.
+    """
+    truncated = np.asarray(vectors, dtype=np.float32)[:, :dimension]
+    norms = np.linalg.norm(truncated, axis=1, keepdims=True)
+    return (truncated / np.where(norms == 0, 1, norms)).tolist()
+
+
+class TruncatedEmbeddings(Embeddings):
+    """
+    Matryoshka-style output dimension for models trained to keep their leading
+    components meaningful, such as Qwen3-Embedding. Documents and queries are
+    truncated the same way, so every vector searched against one collection has
+    the same dimension.
+    """
+
+    def __init__(self, embeddings: Embeddings, dimension: int):
+        self.embeddings = embeddings
+        self.dimension = dimension
+
+    @classmethod
+    def from_factory(cls, factory: Callable[[], Embeddings], dimension: int) -> "TruncatedEmbeddings":
+        # Picklable through functools.partial, for embedding worker processes
+        return cls(factory(), dimension)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return truncate(self.embeddings.embed_documents(texts), self.dimension)
+
+    def embed_query(self, text: str) -> List[float]:
+        return truncate([self.embeddings.embed_query(text)], self.dimension)[0]
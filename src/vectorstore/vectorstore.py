@@ -1,26 +1,240 @@
-from typing import List, Tuple
+import asyncio
+
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from langchain_chroma import Chroma
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.documents import Document
 
+from ingestion.hashing import ChunkHasher
+from vectorstore.bulk import bulk_upsert
+from vectorstore.embedding_cache import CachedEmbeddings, EmbeddingCache
+from vectorstore.embedding_executor import EmbeddingExecutor
+from vectorstore.filters import MetadataFilter
+from vectorstore.local_store import LocalVectorStore
+from vectorstore.onnx_embeddings import OnnxEmbeddings
+from vectorstore.query_batcher import QueryEmbeddingBatcher
+from vectorstore.truncated_embeddings import TruncatedEmbeddings, truncate
+
 class VectorStoreBuilder:
-    def __init__(self, collection_name: str, host: str, port: int, embedding_model: str):
+    def __init__(
+        self,
+        collection_name: str,
+        host: str,
+        port: int,
+        embedding_model: str,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        backend: str = "chroma",
+        local_directory: Optional[Path] = None,
+        quantization: str = "none",
+        rescore_factor: Optional[int] = None,
+        embedding_dimension: Optional[int] = None,
+        embedding_backend: str = "torch",
+        onnx_directory: Optional[Path] = None,
+        onnx_quantized: bool = False,
+        onnx_threads: int = 0,
+        chunk_hash_algorithm: str = "sha256",
+    ):
         self.collection_name = collection_name
         self.host = host
         self.port = port
-        self.embedding_model = HuggingFaceEmbeddings(model=embedding_model, model_kwargs={"device": "cpu"}, encode_kwargs={"batch_size": 64})
-        self.vector_store = Chroma(
-            collection_name=collection_name,
-            embedding_function=self.embedding_model,
-            host=host,
-            port=port
-        )
+        # Picklable constructor so worker processes can load their own copy of the model
+        self.embedding_backend = embedding_backend
+        if embedding_backend == "torch":
+            self.embedding_factory = partial(HuggingFaceEmbeddings, model=embedding_model, model_kwargs={"device": "cpu"}, encode_kwargs={"batch_size": 64})
+        elif embedding_backend == "onnx":
+            self.embedding_factory = partial(OnnxEmbeddings, onnx_directory, quantized=onnx_quantized, intra_op_threads=onnx_threads, batch_size=64)
+        else:
+            raise ValueError(f"Unknown embedding backend: {embedding_backend}")
+        self.embedding_model = self.embedding_factory()
+
+        if embedding_backend == "onnx" and self.embedding_model.model_name != embedding_model:
+            raise ValueError(
+                f"{onnx_directory} holds an export of {self.embedding_model.model_name!r}, not {embedding_model!r}; "
+                "export the configured model with src/scripts/export_onnx_embeddings.py"
+            )
+        self.embedding_executor: Optional[EmbeddingExecutor] = None
+        self.query_batcher: Optional[QueryEmbeddingBatcher] = None
+
+        # Document embeddings go through the on-disk cache when one is configured
+        self.embedding_cache = embedding_cache
+        self.cached_embeddings: Optional[CachedEmbeddings] = None
+        self.document_embeddings = self.embedding_model
+        if embedding_cache is not None:
+            # The int8 graph only approximates the model, so its vectors are cached apart
+            cache_key = f"{embedding_model}:onnx-int8" if embedding_backend == "onnx" and onnx_quantized else embedding_model
+            # Must match the Chunker's hasher so the content hashes on chunks are cache keys
+            self.cached_embeddings = CachedEmbeddings(
+                self.embedding_model, embedding_cache, cache_key, hasher=ChunkHasher(chunk_hash_algorithm)
+            )
+            self.document_embeddings = self.cached_embeddings
+
+        # Truncation sits on top of the cache, so full vectors are cached once for every dimension
+        self.embedding_dimension = embedding_dimension
+        if embedding_dimension:
+            native = len(self.embedding_model.embed_query("dimension check"))
+            if embedding_dimension > native:
+                raise ValueError(
+                    f"Embedding dimension {embedding_dimension} exceeds the {native} dimensions {embedding_model!r} produces"
+                )
+            self.embedding_factory = partial(TruncatedEmbeddings.from_factory, self.embedding_factory, embedding_dimension)
+            self.embedding_model = TruncatedEmbeddings(self.embedding_model, embedding_dimension)
+            self.document_embeddings = TruncatedEmbeddings(self.document_embeddings, embedding_dimension)
+
+        # Both backends expose the same Chroma-style methods used below
+        self.backend = backend
+        if backend == "chroma":
+            self.vector_store = Chroma(
+                collection_name=collection_name,
+                embedding_function=self.document_embeddings,
+                host=host,
+                port=port
+            )
+        elif backend == "local":
+            self.vector_store = LocalVectorStore(
+                local_directory,
+                embedding_function=self.document_embeddings,
+                quantization=quantization,
+                rescore_factor=rescore_factor,
+            )
+        else:
+            raise ValueError(f"Unknown vector store backend: {backend}")
+
+        if quantization != "none" and backend != "local":
+            raise ValueError("Quantized vectors need the local vector store backend")
+
+    def stored_dimension(self) -> Optional[int]:
+        """
+        Dimension of the vectors already in the collection, or None while it is empty.
+        """
+        if self.backend == "local":
+            return self.vector_store.dim
+
+        page = self.vector_store._collection.get(limit=1, include=["embeddings"])
+        embeddings = page.get("embeddings")
+        if embeddings is None or len(embeddings) == 0:
+            return None
+        return len(embeddings[0])
+
+    def ensure_dimension(self):
+        """
+        Refuses to serve or extend a collection whose vectors have another dimension
+        than the embeddings configured now, which would make every search meaningless.
+        """
+        stored = self.stored_dimension()
+        if stored is None:
+            return
+
+        configured = len(self.embedding_model.embed_query("dimension check"))
+        if stored != configured:
+            raise ValueError(
+                f"Collection {self.collection_name!r} holds {stored}-dimensional embeddings but the embedding "
+                f"settings produce {configured}; ingest into a new collection or index directory to change the dimension"
+            )
 
     def add(self, documents: List[Document]):
         ids = [doc.metadata["chunk_id"] for doc in documents]
         self.vector_store.add_documents(documents=documents, ids=ids)
 
-    async def search(self, query: str, k: int = 3) -> List[Tuple[Document, float]]:
-        search_result = await self.vector_store.asimilarity_search_with_score(query, k=k)
-        return search_result
\ No newline at end of file
+    def bulk_add(self, documents: List[Document], batch_size: int = 256, max_retries: int = 3) -> Dict[str, Any]:
+        """
+        Upserts precomputed embeddings in batches of at most ``batch_size`` (capped at the
+        server's maximum), embedding the next batch while the previous one uploads.
+        """
+        if self.backend == "chroma":
+            batch_size = min(batch_size, self.vector_store._client.get_max_batch_size())
+
+        # Identical texts have identical hashes, so the chunker's hashes can be looked up by text
+        content_hashes = {doc.page_content: doc.metadata.get("content_hash") for doc in documents}
+
+        return bulk_upsert(
+            documents,
+            embed=lambda texts: self.embed_texts(texts, [content_hashes[text] for text in texts]),
+            upsert=self._upsert,
+            batch_size=batch_size,
+            max_retries=max_retries,
+        )
+
+    def embed_texts(self, texts: List[str], content_hashes: List[Optional[str]]) -> List[List[float]]:
+        """
+        Document embeddings that reuse precomputed content hashes for the cache lookup
+        instead of hashing every text again.
+        """
+        if self.cached_embeddings is None or None in content_hashes:
+            return self.document_embeddings.embed_documents(texts)
+
+        vectors = self.cached_embeddings.embed_documents_with_hashes(texts, content_hashes)
+        return truncate(vectors, self.embedding_dimension) if self.embedding_dimension and vectors else vectors
+
+    def _upsert(self, documents: List[Document], embeddings: List[List[float]]):
+        target = self.vector_store._collection if self.backend == "chroma" else self.vector_store
+        target.upsert(
+            ids=[doc.metadata["chunk_id"] for doc in documents],
+            embeddings=embeddings,
+            documents=[doc.page_content for doc in documents],
+            metadatas=[doc.metadata for doc in documents],
+        )
+
+    def iter_texts(self, batch_size: int = 1000) -> Iterator[List[Tuple[str, str]]]:
+        """
+        Pages through the collection yielding ``(chunk_id, text)`` pairs.
+        """
+        offset = 0
+        while True:
+            page = self.vector_store.get(limit=batch_size, offset=offset, include=["documents"])
+            if not page["ids"]:
+                return
+            yield list(zip(page["ids"], page["documents"]))
+            offset += len(page["ids"])
+
+    async def get_by_ids(self, ids: List[str]) -> List[Document]:
+        return await asyncio.to_thread(self.vector_store.get_by_ids, ids)
+
+    async def search(self, query: str, k: int = 3, filters: Optional[MetadataFilter] = None) -> List[Tuple[Document, float]]:
+        if self.embedding_executor is None and self.query_batcher is None:
+            search_result = await self.vector_store.asimilarity_search_with_score(query, k=k, filter=filters.where() if filters else None)
+            return search_result
+
+        embedding = await self.embed_query(query)
+        return await self.search_by_vector(embedding, k=k, filters=filters)
+
+    async def embed_query(self, query: str) -> List[float]:
+        if self.query_batcher is not None:
+            return await self.query_batcher.embed(query)
+        if self.embedding_executor is None:
+            return await asyncio.to_thread(self.embedding_model.embed_query, query)
+        return await self.embedding_executor.embed_query(query)
+
+    async def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        # One forward pass for the whole batch; queries and documents share encode kwargs here
+        if self.embedding_executor is None:
+            return await asyncio.to_thread(self.embedding_model.embed_documents, queries)
+        return await self.embedding_executor.embed_documents(queries)
+
+    async def search_by_vector(self, embedding: List[float], k: int = 3, filters: Optional[MetadataFilter] = None) -> List[Tuple[Document, float]]:
+        # The filter is applied by the backend, so only matching vectors are scanned
+        return await asyncio.to_thread(
+            self.vector_store.similarity_search_by_vector_with_relevance_scores, embedding, k, filter=filters.where() if filters else None
+        )
+
+    def heartbeat(self) -> int:
+        if self.backend == "local":
+            return self.vector_store.heartbeat()
+        return self.vector_store._client.heartbeat()
+
+    def close(self):
+        if self.query_batcher is not None:
+            self.query_batcher.close()
+            self.query_batcher = None
+        if self.embedding_executor is not None:
+            self.embedding_executor.shutdown()
+            self.embedding_executor = None
+        if self.embedding_cache is not None:
+            self.embedding_cache.close()
+            self.embedding_cache = None
+        if self.backend == "local" and self.vector_store is not None:
+            self.vector_store.close()
+        self.vector_store = None
+        self.embedding_model = None
@@ -1,44 +1,162 @@
-from typing import List
+import logging
+import threading
+import uuid
+
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
 from langchain_core.documents import Document
 
+from ingestion.hashing import ChunkHasher
 from ingestion.version_manager import (
     VersionManager,
-    hash_chunk_content,
-    hash_document_chunks,
     diff_chunks,
 )
+from vectorstore.lexical_index import LexicalIndex
 from vectorstore.vectorstore import VectorStoreBuilder
 
+logger = logging.getLogger(__name__)
+
 
 class VersionedVectorStore:
-    def __init__(self, store: VectorStoreBuilder, versions: VersionManager):
+    def __init__(
+        self,
+        store: VectorStoreBuilder,
+        versions: VersionManager,
+        batch_size: Optional[int] = None,
+        max_retries: int = 3,
+        hasher: Optional[ChunkHasher] = None,
+        lexical_index: Optional[LexicalIndex] = None,
+        generation_file: Optional[Path] = None,
+    ):
         self.store = store
         self.versions = versions
+        # Must match the Chunker's hasher so stored hashes are comparable
+        self.hasher = hasher or ChunkHasher()
+        # With a batch size, chunks go through the pipelined bulk upsert instead of add()
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        # Kept in step with every add and delete so hybrid retrieval sees the same corpus
+        self.lexical_index = lexical_index
+        # Rewritten on every change so AnswerCaches in other processes notice it
+        self.generation_file = generation_file
+        self.listeners: List[Callable[[], None]] = []
+
+        # Version state is shared by concurrent ingests of different documents, so every
+        # mutation and the save that commits it happen under one lock. Ingests of the
+        # same document must not overlap; IngestionRunner orders them.
+        self._versions_lock = threading.RLock()
+
+    def subscribe(self, listener: Callable[[], None]):
+        # Listeners are called whenever an ingest changes the indexed corpus
+        self.listeners.append(listener)
+
+    def _notify(self):
+        if self.generation_file is not None:
+            self.generation_file.write_text(uuid.uuid4().hex)
+        for listener in self.listeners:
+            listener()
+
+    def _add(self, chunks: List[Document]):
+        if self.batch_size is None:
+            self.store.add(chunks)
+        else:
+            stats = self.store.bulk_add(chunks, batch_size=self.batch_size, max_retries=self.max_retries)
+            logger.info(
+                "Upserted %d chunks in %d batches (%s chunks/s, %d retries)",
+                stats["chunks"], stats["batches"], stats["chunks_per_second"], stats["retries"],
+            )
+
+        if self.lexical_index is not None:
+            self.lexical_index.add((c.metadata["chunk_id"], c.page_content) for c in chunks)
+
+    def _delete(self, chunk_ids: List[str]):
+        self.store.vector_store.delete(ids=chunk_ids)
+        if self.lexical_index is not None:
+            self.lexical_index.delete(chunk_ids)
+
+    def _save(self, document_id: str, source: str, fingerprint: Optional[Dict]):
+        # The index goes first: if we stop before the version save, the re-ingest re-adds the same ids
+        if self.lexical_index is not None:
+            self.lexical_index.flush()
+        # The file fingerprint is only recorded together with a successful ingest
+        if fingerprint is not None:
+            self.versions.record_fingerprint(document_id, source, fingerprint)
+        self.versions.save()
 
-    def ingest(self, document_id: str, source: str, chunks: List[Document]):
+    def backfill_lexical_index(self) -> int:
+        """
+        Indexes the chunks already in Chroma when the lexical index is empty, e.g. when
+        hybrid retrieval is enabled on an existing collection. Returns the chunks indexed.
+        """
+        if self.lexical_index is None or self.lexical_index.size or self.store is None:
+            return 0
+
+        indexed = 0
+        for texts in self.store.iter_texts():
+            self.lexical_index.add(texts)
+            # Seals the delta into segments as it fills, keeping memory bounded
+            self.lexical_index.flush()
+            indexed += len(texts)
+
+        if indexed:
+            self.lexical_index.save()
+        return indexed
+
+    def diff(self, document_id: str, chunks: List[Document]):
+        """
+        What ``ingest`` would change for these chunks, without touching the store or
+        the version state.
+        """
         chunk_hashes = {
-            c.metadata["chunk_id"]: hash_chunk_content(c.page_content)
+            c.metadata["chunk_id"]: self.hasher.chunk_content_hash(c)
             for c in chunks
         }
-        document_hash = hash_document_chunks(chunks)
+        document_hash = self.hasher.document_hash(chunks)
 
-        doc = self.versions.get_document(document_id)
+        with self._versions_lock:
+            doc = self.versions.get_document(document_id)
 
         if doc and doc["current_hash"] == document_hash:
-            self.versions.add_source(document_id, document_hash, source)
-            self.versions.save()
+            return {"skipped": True, "reason": "content unchanged"}
+
+        if not doc:
+            return {"added": len(chunks)}
+
+        diff = diff_chunks(doc["versions"][doc["current_hash"]]["chunk_hashes"], chunk_hashes)
+        return {
+            "added": len(diff["add"]),
+            "deleted": len(diff["delete"]),
+        }
+
+    def ingest(self, document_id: str, source: str, chunks: List[Document], fingerprint: Optional[Dict] = None):
+        chunk_hashes = {
+            c.metadata["chunk_id"]: self.hasher.chunk_content_hash(c)
+            for c in chunks
+        }
+        document_hash = self.hasher.document_hash(chunks)
+
+        with self._versions_lock:
+            doc = self.versions.get_document(document_id)
+
+        if doc and doc["current_hash"] == document_hash:
+            with self._versions_lock:
+                self.versions.add_source(document_id, document_hash, source)
+                self._save(document_id, source, fingerprint)
             return {"skipped": True, "reason": "content unchanged"}
 
 
         if not doc:
-            self.store.add(chunks)
-            self.versions.register_version(
-                document_id,
-                document_hash,
-                source,
-                chunk_hashes,
-            )
-            self.versions.save()
+            if chunks:
+                self._add(chunks)
+            with self._versions_lock:
+                self.versions.register_version(
+                    document_id,
+                    document_hash,
+                    source,
+                    chunk_hashes,
+                )
+                self._save(document_id, source, fingerprint)
+            self._notify()
             return {"added": len(chunks)}
         
         old_hash = doc["current_hash"]
@@ -47,7 +165,7 @@ class VersionedVectorStore:
         diff = diff_chunks(old_version["chunk_hashes"], chunk_hashes)
 
         if diff["delete"]:
-            self.store.vector_store.delete(ids=list(diff["delete"]))
+            self._delete(list(diff["delete"]))
 
 
         chunks_to_add = [
@@ -56,16 +174,20 @@ class VersionedVectorStore:
         ]
 
         if chunks_to_add:
-            self.store.add(chunks_to_add)
+            self._add(chunks_to_add)
 
 
-        self.versions.register_version(
-            document_id,
-            document_hash,
-            source,
-            chunk_hashes,
-        )
-        self.versions.save()
+        with self._versions_lock:
+            self.versions.register_version(
+                document_id,
+                document_hash,
+                source,
+                chunk_hashes,
+            )
+            self._save(document_id, source, fingerprint)
+
+        if chunks_to_add or diff["delete"]:
+            self._notify()
 
         return {
             "added": len(chunks_to_add),
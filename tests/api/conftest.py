@@ -16,7 +16,7 @@ def mock_rag_pipeline(monkeypatch):
 
 @pytest.fixture
 def client(mock_rag_pipeline):
-    app = create_app(enable_ingestion=False)
+    app = create_app(enable_ingestion=False, enable_resources=False)
     app.dependency_overrides[get_rag_pipeline] = lambda: mock_rag_pipeline
 
     with TestClient(app) as client:
@@ -1,3 +1,10 @@
+import json
+
+from unittest.mock import MagicMock
+
+from vectorstore.embedding_executor import EmbeddingQueueFull
+
+
 def test_ask_endpoint_success(client, mock_rag_pipeline):
     response = client.post(
         "/ask",
@@ -44,4 +51,80 @@ def test_ask_endpoint_no_documents(client, mock_rag_pipeline):
     )
 
     assert response.status_code == 200
-    assert response.json()["sources"] == []
\ No newline at end of file
+    assert response.json()["sources"] == []
+
+
+def test_ask_endpoint_returns_503_when_embedding_queue_full(client, mock_rag_pipeline):
+    mock_rag_pipeline.ask.side_effect = EmbeddingQueueFull(retry_after=2)
+
+    response = client.post(
+        "/ask",
+        json={"question": "test"}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+
+
+def parse_sse(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_ask_stream_sends_sources_then_tokens(client, mock_rag_pipeline):
+    async def fake_stream(question, k, filters=None):
+        yield {"event": "sources", "data": [{"source": "data/doc1.pdf", "file_name": "doc1.pdf", "page": 0}]}
+        yield {"event": "token", "data": "mocked "}
+        yield {"event": "token", "data": "answer"}
+        yield {"event": "done", "data": {"cached": False, "time_to_first_token_ms": 1.0}}
+
+    mock_rag_pipeline.ask_stream = MagicMock(side_effect=fake_stream)
+
+    response = client.post("/ask/stream", json={"question": "What is SAP?"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_sse(response.text)
+
+    assert [name for name, _ in events] == ["sources", "token", "token", "done"]
+    assert "".join(data for name, data in events if name == "token") == "mocked answer"
+
+
+def test_ask_stream_returns_503_when_embedding_queue_full(client, mock_rag_pipeline):
+    async def fake_stream(question, k, filters=None):
+        raise EmbeddingQueueFull(retry_after=2)
+        yield
+
+    mock_rag_pipeline.ask_stream = MagicMock(side_effect=fake_stream)
+
+    response = client.post("/ask/stream", json={"question": "test"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+
+
+def test_ask_stream_reports_generation_failure_as_event(client, mock_rag_pipeline):
+    async def fake_stream(question, k, filters=None):
+        yield {"event": "sources", "data": []}
+        raise RuntimeError("LLM down")
+
+    mock_rag_pipeline.ask_stream = MagicMock(side_effect=fake_stream)
+
+    response = client.post("/ask/stream", json={"question": "test"})
+
+    events = parse_sse(response.text)
+
+    assert [name for name, _ in events] == ["sources", "error"]
+
+
+def test_ask_passes_metadata_filters(client, mock_rag_pipeline):
+    from vectorstore.filters import MetadataFilter
+
+    response = client.post("/ask", json={"question": "Emissions?", "document_ids": ["sr_2015"], "year_from": 2015, "year_to": 2016})
+
+    assert response.status_code == 200
+    assert mock_rag_pipeline.ask.call_args.kwargs["filters"] == MetadataFilter(document_ids=("sr_2015",), year_from=2015, year_to=2016)
@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+from langchain_core.documents import Document
+
+from api.app import create_app
+from ingestion.chunker import Chunker
+from ingestion.cleaner import Cleaner
+
+
+@pytest.fixture
+def blocking_ingestion(monkeypatch, tmp_path):
+    monkeypatch.setenv("NTT_RAG_INDEX_GENERATION_FILE", str(tmp_path / "generation"))
+    release = threading.Event()
+
+    def lazy_load(paths):
+        release.wait(5)
+        yield Document(page_content="hello", metadata={"source": "sr_2015_20150301_v01.pdf", "page": 0})
+
+    loader = MagicMock()
+    loader.list_files.return_value = ["sr_2015_20150301_v01.pdf"]
+    loader.lazy_load.side_effect = lazy_load
+    cleaner = Cleaner()
+    chunker = Chunker()
+
+    results = [(Document(page_content="content", metadata={"source": "a.pdf", "file_name": "a.pdf", "page": 0}), 0.1)]
+
+    with patch("api.app.get_ingestion_components", return_value=(loader, cleaner, chunker)), \
+         patch("vectorstore.vectorstore.HuggingFaceEmbeddings") as mock_embeddings, \
+         patch("vectorstore.vectorstore.Chroma") as mock_chroma, \
+         patch("rag.llm.ChatOpenAI") as mock_chat, \
+         patch("api.resources.build_version_manager") as mock_versions:
+
+        mock_embeddings.return_value.embed_query.return_value = [0.1, 0.2]
+        mock_embeddings.return_value.embed_documents.side_effect = lambda texts: [[0.1, 0.2] for _ in texts]
+        mock_chroma.return_value.similarity_search_by_vector_with_relevance_scores.return_value = results
+        mock_chroma.return_value._client.heartbeat.return_value = 1
+        mock_chroma.return_value._client.get_max_batch_size.return_value = 5461
+
+        mock_versions.return_value.get_document.return_value = None
+        mock_versions.return_value.is_unchanged.return_value = False
+
+        llm_instance = MagicMock()
+        llm_instance.agenerate = AsyncMock(return_value=MagicMock(generations=[[MagicMock(text="answer")]]))
+        llm_instance.root_async_client.close = AsyncMock()
+        mock_chat.return_value = llm_instance
+
+        yield release
+
+
+def wait_for_state(client, state, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = client.get("/ingest/status").json()
+        if status["state"] == state:
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"ingestion never reached {state}: {status}")
+
+
+def test_api_serves_requests_while_ingesting(blocking_ingestion):
+    app = create_app()
+
+    with TestClient(app) as client:
+        wait_for_state(client, "running")
+
+        assert client.get("/health/live").status_code == 200
+        assert client.get("/health/ready").status_code == 200
+        assert client.post("/ask", json={"question": "What is SAP?"}).status_code == 200
+
+        blocking_ingestion.set()
+        status = wait_for_state(client, "completed")
+
+    assert status["documents_processed"] == 1
+    assert status["chunks_added"] == 1
+
+
+def test_readiness_can_wait_for_ingestion(blocking_ingestion, monkeypatch):
+    from api.app_services import get_config
+
+    monkeypatch.setattr(get_config(), "READY_REQUIRES_INGESTION", True)
+
+    app = create_app()
+
+    with TestClient(app) as client:
+        wait_for_state(client, "running")
+
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["components"]["ingestion"] == "running"
+
+        blocking_ingestion.set()
+        wait_for_state(client, "completed")
+
+        assert client.get("/health/ready").status_code == 200
+
+
+def test_ingest_status_when_disabled():
+    app = create_app(enable_ingestion=False, enable_resources=False)
+
+    with TestClient(app) as client:
+        assert client.get("/ingest/status").json() == {"state": "disabled"}
+        assert client.get("/health/live").status_code == 200
+        assert client.get("/health/ready").status_code == 503
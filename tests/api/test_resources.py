@@ -0,0 +1,155 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+from langchain_core.documents import Document
+
+from api.app import create_app
+
+
+@pytest.fixture
+def patched_clients():
+    with patch("vectorstore.vectorstore.HuggingFaceEmbeddings") as mock_embeddings, \
+         patch("vectorstore.vectorstore.Chroma") as mock_chroma, \
+         patch("rag.llm.ChatOpenAI") as mock_chat:
+
+        results = [
+            (Document(page_content="content", metadata={"source": "a.pdf", "file_name": "a.pdf", "page": 0}), 0.1)
+        ]
+        mock_chroma.return_value.asimilarity_search_with_score = AsyncMock(return_value=results)
+        mock_chroma.return_value.similarity_search_by_vector_with_relevance_scores.return_value = results
+        mock_embeddings.return_value.embed_query.return_value = [0.1, 0.2]
+        mock_embeddings.return_value.embed_documents.side_effect = lambda texts: [[0.1, 0.2] for _ in texts]
+        mock_chroma.return_value._client.heartbeat.return_value = 1
+
+        llm_instance = MagicMock()
+        llm_instance.agenerate = AsyncMock(
+            return_value=MagicMock(generations=[[MagicMock(text="answer")]])
+        )
+        llm_instance.root_async_client.close = AsyncMock()
+        mock_chat.return_value = llm_instance
+
+        yield mock_embeddings, mock_chroma, mock_chat
+
+
+def test_clients_are_constructed_once_across_requests(patched_clients):
+    mock_embeddings, mock_chroma, mock_chat = patched_clients
+
+    app = create_app(enable_ingestion=False)
+
+    with TestClient(app) as client:
+        for _ in range(5):
+            response = client.post("/ask", json={"question": "What is SAP?"})
+            assert response.status_code == 200
+
+    assert mock_embeddings.call_count == 1
+    assert mock_chroma.call_count == 1
+    assert mock_chat.call_count == 1
+
+
+def test_warm_up_embeds_once_on_startup(patched_clients):
+    mock_embeddings, _, _ = patched_clients
+
+    app = create_app(enable_ingestion=False)
+
+    with TestClient(app):
+        mock_embeddings.return_value.embed_query.assert_called_once()
+
+
+def test_health_reports_components(patched_clients):
+    app = create_app(enable_ingestion=False)
+
+    with TestClient(app) as client:
+        data = client.get("/health").json()
+
+    assert data["status"] == "OK"
+    assert data["components"] == {"vectorstore": "OK", "llm": "OK"}
+
+
+def test_health_reports_degraded_vectorstore(patched_clients):
+    _, mock_chroma, _ = patched_clients
+    mock_chroma.return_value._client.heartbeat.side_effect = ConnectionError("refused")
+
+    app = create_app(enable_ingestion=False)
+
+    with TestClient(app) as client:
+        data = client.get("/health").json()
+
+    assert data["status"] == "DEGRADED"
+    assert data["components"]["vectorstore"].startswith("unavailable")
+
+
+def test_readiness_fails_when_inference_server_is_down(patched_clients):
+    _, _, mock_chat = patched_clients
+    mock_chat.return_value.root_client.with_options.return_value.models.list.side_effect = ConnectionError("refused")
+
+    app = create_app(enable_ingestion=False)
+
+    with TestClient(app) as client:
+        response = client.get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json()["components"]["llm"] == "unavailable: refused"
+    mock_chat.return_value.root_client.with_options.assert_called_with(timeout=2.0, max_retries=0)
+
+
+def test_shutdown_closes_llm_client(patched_clients):
+    _, _, mock_chat = patched_clients
+
+    app = create_app(enable_ingestion=False)
+
+    with TestClient(app):
+        pass
+
+    mock_chat.return_value.root_async_client.close.assert_awaited_once()
+
+
+def test_stats_exposes_embedding_executor(patched_clients):
+    app = create_app(enable_ingestion=False)
+
+    with TestClient(app) as client:
+        client.post("/ask", json={"question": "What is SAP?"})
+        data = client.get("/stats").json()
+
+    executor_stats = data["embedding_executor"]
+    assert executor_stats["queue_depth"] == 0
+    assert executor_stats["queue_wait"]["count"] >= 1
+
+
+def test_concurrent_questions_share_embedding_batches(patched_clients):
+    mock_embeddings, _, _ = patched_clients
+
+    app = create_app(enable_ingestion=False)
+
+    with TestClient(app) as client:
+        for question in ["What is SAP?", "What is NTT?", "What is RAG?"]:
+            client.post("/ask", json={"question": question})
+        data = client.get("/stats").json()
+
+    assert data["query_batcher"]["queries"] == 3
+    assert mock_embeddings.return_value.embed_documents.call_count == data["query_batcher"]["batches"]
+
+
+def test_repeated_question_is_served_from_answer_cache(patched_clients):
+    _, _, mock_chat = patched_clients
+
+    app = create_app(enable_ingestion=False)
+
+    with TestClient(app) as client:
+        for _ in range(3):
+            assert client.post("/ask", json={"question": "What is SAP?"}).status_code == 200
+        data = client.get("/stats").json()
+
+    assert mock_chat.return_value.agenerate.await_count == 1
+    assert data["answer_cache"]["hits"] == 2
+    assert data["answer_cache"]["misses"] == 1
+
+
+def test_stats_reports_context_packing_savings(patched_clients):
+    app = create_app(enable_ingestion=False)
+
+    with TestClient(app) as client:
+        answer = client.post("/ask", json={"question": "What is SAP?"}).json()
+        data = client.get("/stats").json()
+
+    assert answer["context"]["tokens_packed"] <= answer["context"]["tokens_retrieved"]
+    assert data["context_packing"]["requests"] == 1
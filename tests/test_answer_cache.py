@@ -0,0 +1,136 @@
+import time
+
+from rag.answer_cache import AnswerCache, normalize_question
+
+
+ANSWER = {"answer": "42", "sources": [{"source": "a.pdf", "file_name": "a.pdf", "page": 0}]}
+
+
+def make_key(question, k=3, model="llm", temperature=0.0, collection="docs"):
+    return AnswerCache.make_key(question, k=k, model=model, temperature=temperature, collection=collection)
+
+
+def test_normalize_question():
+    assert normalize_question("  What   is SAP? ") == "what is sap"
+
+
+def test_exact_hit_ignores_case_and_whitespace():
+    cache = AnswerCache()
+
+    cache.put(make_key("What is SAP?"), ANSWER)
+
+    assert cache.get(make_key("what  is sap")) == ANSWER
+    assert cache.stats()["hits"] == 1
+
+
+def test_key_includes_answer_settings():
+    cache = AnswerCache()
+
+    cache.put(make_key("What is SAP?"), ANSWER)
+
+    assert cache.get(make_key("What is SAP?", k=5)) is None
+    assert cache.get(make_key("What is SAP?", model="other")) is None
+    assert cache.get(make_key("What is SAP?", temperature=0.7)) is None
+    assert cache.get(make_key("What is SAP?", collection="other")) is None
+
+
+def test_cached_answer_is_a_copy():
+    cache = AnswerCache()
+    cache.put(make_key("q"), ANSWER)
+
+    cache.get(make_key("q"))["sources"].clear()
+
+    assert cache.get(make_key("q")) == ANSWER
+
+
+def test_semantic_hit_within_distance():
+    cache = AnswerCache(semantic_distance=0.05)
+
+    cache.put(make_key("What is SAP?"), ANSWER, embedding=[1.0, 0.0])
+
+    assert cache.get_similar(make_key("Tell me about SAP"), [0.99, 0.05]) == ANSWER
+    assert cache.get_similar(make_key("Unrelated"), [0.0, 1.0]) is None
+
+    stats = cache.stats()
+    assert stats["semantic_hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_semantic_hit_requires_same_settings():
+    cache = AnswerCache(semantic_distance=0.05)
+
+    cache.put(make_key("What is SAP?"), ANSWER, embedding=[1.0, 0.0])
+
+    assert cache.get_similar(make_key("What is SAP", k=10), [1.0, 0.0]) is None
+
+
+def test_lru_eviction_by_entry_count():
+    cache = AnswerCache(max_entries=2)
+
+    cache.put(make_key("a"), ANSWER)
+    cache.put(make_key("b"), ANSWER)
+    cache.get(make_key("a"))
+    cache.put(make_key("c"), ANSWER)
+
+    assert cache.get(make_key("a")) is not None
+    assert cache.get(make_key("b")) is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_by_memory_cap():
+    cache = AnswerCache(max_bytes=300)
+
+    for question in ["a", "b", "c", "d"]:
+        cache.put(make_key(question), ANSWER)
+
+    stats = cache.stats()
+    assert stats["size_bytes"] <= 300
+    assert stats["entries"] < 4
+
+
+def test_entries_expire_after_ttl():
+    cache = AnswerCache(ttl_seconds=0.01)
+
+    cache.put(make_key("q"), ANSWER, embedding=[1.0, 0.0])
+    time.sleep(0.02)
+
+    assert cache.get(make_key("q")) is None
+    assert cache.get_similar(make_key("q2"), [1.0, 0.0]) is None
+
+
+def test_invalidate_clears_entries_and_rejects_stale_puts():
+    cache = AnswerCache()
+
+    generation = cache.generation
+    cache.put(make_key("a"), ANSWER)
+    cache.invalidate()
+    cache.put(make_key("b"), ANSWER, generation=generation)
+
+    assert cache.get(make_key("a")) is None
+    assert cache.get(make_key("b")) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_ingest_in_another_process_clears_the_cache(tmp_path):
+    marker = tmp_path / "generation"
+    cache = AnswerCache(generation_file=marker)
+    cache.put(make_key("a"), ANSWER)
+    generation = cache.generation
+
+    marker.write_text("1")
+
+    assert cache.get(make_key("a")) is None
+    cache.put(make_key("b"), ANSWER, generation=generation)
+    assert cache.get(make_key("b")) is None
+    cache.put(make_key("c"), ANSWER)
+    assert cache.get(make_key("c")) == ANSWER
+
+
+def test_filters_are_part_of_the_key():
+    from vectorstore.filters import MetadataFilter
+
+    cache = AnswerCache()
+    cache.put(make_key("What is SAP?"), ANSWER)
+
+    filtered = AnswerCache.make_key("What is SAP?", k=3, model="llm", temperature=0.0, collection="docs", filters=MetadataFilter(year_from=2019))
+    assert cache.get(filtered) is None
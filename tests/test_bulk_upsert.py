@@ -0,0 +1,83 @@
+import threading
+
+from unittest.mock import patch
+
+import pytest
+
+from langchain_core.documents import Document
+
+from vectorstore.bulk import bulk_upsert
+
+
+def make_documents(n):
+    return [Document(page_content=f"chunk {i}", metadata={"chunk_id": str(i)}) for i in range(n)]
+
+
+def fake_embed(texts):
+    return [[float(len(text))] for text in texts]
+
+
+def test_bulk_upsert_splits_into_batches():
+    uploaded = []
+
+    stats = bulk_upsert(make_documents(10), embed=fake_embed, upsert=lambda batch, _: uploaded.append(len(batch)), batch_size=4)
+
+    assert uploaded == [4, 4, 2]
+    assert stats["chunks"] == 10
+    assert stats["batches"] == 3
+    assert stats["retries"] == 0
+    assert stats["chunks_per_second"] > 0
+
+
+def test_next_batch_is_embedded_while_previous_uploads():
+    upload_started = threading.Event()
+    second_embedded = threading.Event()
+    embedded = []
+
+    def embed(texts):
+        embedded.append(texts)
+        if len(embedded) == 2:
+            second_embedded.set()
+        return fake_embed(texts)
+
+    def upsert(batch, embeddings):
+        upload_started.set()
+        if batch[0].metadata["chunk_id"] == "0":
+            # The first upload only finishes once the second batch has been embedded
+            assert second_embedded.wait(timeout=5)
+
+    bulk_upsert(make_documents(4), embed=embed, upsert=upsert, batch_size=2)
+
+    assert upload_started.is_set()
+    assert len(embedded) == 2
+
+
+def test_failed_upserts_are_retried_a_bounded_number_of_times():
+    attempts = []
+
+    def flaky(batch, embeddings):
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("chroma unavailable")
+
+    with patch("vectorstore.bulk.time.sleep"):
+        stats = bulk_upsert(make_documents(2), embed=fake_embed, upsert=flaky, max_retries=3)
+
+    assert stats["retries"] == 2
+
+    def broken(batch, embeddings):
+        raise ConnectionError("chroma unavailable")
+
+    with patch("vectorstore.bulk.time.sleep") as sleep, pytest.raises(ConnectionError):
+        bulk_upsert(make_documents(2), embed=fake_embed, upsert=broken, max_retries=2)
+
+    assert sleep.call_count == 2
+
+
+def test_batches_are_formed_from_similar_lengths():
+    documents = [Document(page_content="x" * n, metadata={"chunk_id": str(n)}) for n in (50, 1, 40, 2, 30, 3)]
+    batches = []
+
+    bulk_upsert(documents, embed=fake_embed, upsert=lambda batch, _: batches.append([len(d.page_content) for d in batch]), batch_size=2)
+
+    assert batches == [[1, 2], [3, 30], [40, 50]]
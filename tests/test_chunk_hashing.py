@@ -0,0 +1,69 @@
+import hashlib
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from langchain_core.documents import Document
+
+from ingestion.chunker import Chunker
+from ingestion.hashing import ChunkHasher
+from ingestion.version_manager import VersionManager, hash_chunk_content, hash_document_chunks
+from vectorstore.versioned_store import VersionedVectorStore
+
+
+def make_pages(text="Annual report paragraph. " * 40):
+    return [Document(page_content=text, metadata={"source": "sr_2015.pdf", "page": 0})]
+
+
+def test_sha256_reproduces_existing_ids_and_hashes():
+    chunks = Chunker(chunk_size=100, chunk_overlap=0).chunk(make_pages())
+    hasher = ChunkHasher("sha256")
+
+    for chunk in chunks:
+        raw_id = f"0::{chunk.metadata['chunk_index']}::{chunk.page_content.strip()}"
+        assert chunk.metadata["chunk_id"] == hashlib.sha256(raw_id.encode("utf-8")).hexdigest()
+        assert chunk.metadata["content_hash"] == hash_chunk_content(chunk.page_content)
+
+    assert hasher.document_hash(chunks) == hash_document_chunks(chunks)
+
+
+@pytest.mark.parametrize("algorithm", ["blake2b", "xxhash"])
+def test_fast_algorithms_hash_each_chunk_text_once(algorithm):
+    if algorithm == "xxhash":
+        pytest.importorskip("xxhash")
+
+    hasher = ChunkHasher(algorithm)
+    pages = make_pages()
+
+    with patch.object(hasher, "digest", wraps=hasher.digest) as digest:
+        chunks = Chunker(chunk_size=100, chunk_overlap=0, hasher=hasher).chunk(pages)
+        document_hash = hasher.document_hash(chunks)
+
+    texts = {c.page_content for c in chunks}
+    hashed_texts = [call.args[0] for call in digest.call_args_list if call.args[0] in texts]
+    assert len(hashed_texts) == len(chunks)
+    assert document_hash == ChunkHasher(algorithm).document_hash(chunks)
+
+
+def test_unknown_algorithm_is_rejected():
+    with pytest.raises(ValueError):
+        ChunkHasher("md5")
+
+
+def test_versioned_store_detects_changes_with_blake2b(tmp_path):
+    hasher = ChunkHasher("blake2b")
+    chunker = Chunker(chunk_size=100, chunk_overlap=0, hasher=hasher)
+    store = VersionedVectorStore(
+        store=MagicMock(),
+        versions=VersionManager(tmp_path / "versions.json"),
+        hasher=hasher,
+    )
+
+    first = chunker.chunk(make_pages())
+    assert store.ingest("sr_2015", "sr_2015.pdf", first) == {"added": len(first)}
+    assert store.ingest("sr_2015", "sr_2015.pdf", chunker.chunk(make_pages()))["skipped"]
+
+    edited = chunker.chunk(make_pages("Annual report paragraph. " * 39 + "Restated figures."))
+    result = store.ingest("sr_2015", "sr_2015.pdf", edited)
+    assert result["added"] == result["deleted"] == 1
@@ -1,4 +1,8 @@
 import hashlib
+import re
+
+import pytest
+
 from ingestion.chunker import Chunker
 from langchain_core.documents import Document
 
@@ -117,3 +121,48 @@ def test_chunker_handles_empty_input():
     chunks = chunker.chunk([])
 
     assert chunks == []
+
+
+def test_chunk_iter_matches_chunk():
+    docs = [
+        Document("A sentence here. " * 40, metadata={"source": "file.pdf", "page": 1}),
+        Document("Another one. " * 40, metadata={"source": "file.pdf", "page": 2}),
+    ]
+
+    chunker = Chunker(chunk_size=60, chunk_overlap=10)
+
+    eager = chunker.chunk(docs)
+    lazy = list(chunker.chunk_iter(iter(docs)))
+
+    assert [(c.page_content, c.metadata) for c in lazy] == [(c.page_content, c.metadata) for c in eager]
+
+
+class WhitespaceTokenizer:
+    """Offset-mapping stand-in for a Hugging Face fast tokenizer: one token per word."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text, add_special_tokens=False, return_offsets_mapping=False):
+        self.calls += 1
+        return {"offset_mapping": [(m.start(), m.end()) for m in re.finditer(r"\S+", text)]}
+
+
+def test_token_chunking_uses_token_windows_with_overlap():
+    tokenizer = WhitespaceTokenizer()
+    words = [f"w{i}" for i in range(25)]
+    doc = Document(page_content="  ".join(words), metadata={"source": "a.pdf", "page": 0})
+
+    chunks = Chunker(chunk_size=10, chunk_overlap=3, tokenizer=tokenizer).chunk([doc])
+
+    assert [c.page_content.split() for c in chunks] == [words[0:10], words[7:17], words[14:24], words[21:25]]
+    assert [c.metadata["token_count"] for c in chunks] == [10, 10, 10, 4]
+    assert chunks[0].page_content == "  ".join(words[0:10])
+    # The page is tokenized once, not once per window
+    assert tokenizer.calls == 1
+    assert len({c.metadata["chunk_id"] for c in chunks}) == 4
+
+
+def test_token_chunking_rejects_overlap_not_below_size():
+    with pytest.raises(ValueError):
+        Chunker(chunk_size=10, chunk_overlap=10, tokenizer=WhitespaceTokenizer())
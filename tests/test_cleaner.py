@@ -1,4 +1,8 @@
-from ingestion.cleaner import Cleaner
+import random
+import re
+import unicodedata
+
+from ingestion.cleaner import Cleaner, clean_text
 from langchain_core.documents import Document
 
 
@@ -101,3 +105,67 @@ def test_cleaner_handles_empty_input_gracefully():
     cleaned = cleaner.clean([])
 
     assert cleaned == []
+
+
+def test_cleaner_clean_iter_is_lazy():
+    cleaner = Cleaner()
+
+    def documents():
+        yield Document(page_content="First   page.", metadata={"page": 0})
+        raise AssertionError("second document pulled too early")
+
+    cleaned = cleaner.clean_iter(documents())
+
+    assert next(cleaned).page_content == "First page."
+
+
+def reference_clean_text(text):
+    # The original per-character implementation the compiled one must match exactly
+    text = unicodedata.normalize("NFKC", text)
+    text = "".join(" " if 0xE000 <= ord(ch) <= 0xF8FF else ch for ch in text)
+    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
+    text = text.replace("\r\n", "\n")
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = re.sub(r"[ \t]{2,}", " ", text)
+    return text.strip()
+
+
+def test_clean_text_matches_reference_implementation():
+    rng = random.Random(0)
+    alphabet = ["a", "b", "1", "_", "-", "\n", "\r", " ", "\t", "", "", "", "Ｎ", "é", "́", "ﬁ", "é"]
+
+    for _ in range(5000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        assert clean_text(text) == reference_clean_text(text), repr(text)
+
+
+def test_parallel_clean_matches_serial():
+    documents = [
+        Document(page_content=f"Page  {i} of a bio-\ntechnology report.\n\n\n\nEnd .", metadata={"page": i})
+        for i in range(40)
+    ]
+
+    parallel = Cleaner(workers=2, chunksize=8).clean(documents)
+
+    assert parallel == Cleaner().clean(documents)
+
+
+def test_parallel_clean_iter_matches_serial():
+    documents = [Document(page_content=f"Page  {i}\n\n\n\nof  text.", metadata={"page": i}) for i in range(20)]
+
+    parallel = list(Cleaner(workers=2, chunksize=3).clean_iter(iter(documents)))
+
+    assert parallel == Cleaner().clean(documents)
+
+
+def test_ingestion_cleaner_uses_configured_workers(monkeypatch, tmp_path):
+    from api.app_services import get_ingestion_components
+    from config.config import AppConfig
+
+    monkeypatch.setenv("NTT_RAG_INFERENCE_SERVER_URL", "http://localhost:8001")
+    monkeypatch.setenv("NTT_RAG_PDF_LOCATION", str(tmp_path))
+    monkeypatch.setenv("NTT_RAG_CLEANER_WORKERS", "3")
+
+    _, cleaner, _ = get_ingestion_components(AppConfig())
+
+    assert cleaner.workers == 3
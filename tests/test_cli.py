@@ -0,0 +1,125 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from langchain_core.documents import Document
+
+from cli.main import build_parser, ingest, restore, snapshot
+from config.config import BaseConfig
+from ingestion.chunker import Chunker
+from ingestion.cleaner import Cleaner
+from vectorstore.local_store import LocalVectorStore
+
+
+@pytest.fixture
+def config(monkeypatch, tmp_path):
+    monkeypatch.setenv("NTT_RAG_PDF_LOCATION", str(tmp_path))
+    monkeypatch.setenv("NTT_RAG_INFERENCE_SERVER_URL", "http://localhost:8001")
+    monkeypatch.setenv("NTT_RAG_INDEX_GENERATION_FILE", str(tmp_path / "generation"))
+    return BaseConfig()
+
+
+@pytest.fixture
+def components():
+    loader = MagicMock()
+    loader.list_files.return_value = ["sr_2015_20150301_v01.pdf"]
+    loader.lazy_load.side_effect = lambda paths: (
+        Document(page_content="hello", metadata={"source": path, "page": 0}) for path in paths
+    )
+    loader.errors = {}
+
+    with patch("cli.main.get_ingestion_components", return_value=(loader, Cleaner(), Chunker())) as get_components, \
+         patch("cli.main.build_vectorstore") as build_vectorstore, \
+         patch("cli.main.build_version_manager") as build_version_manager:
+        build_version_manager.return_value.get_document.return_value = None
+        build_version_manager.return_value.is_unchanged.return_value = False
+        yield get_components, build_vectorstore, build_version_manager
+
+
+def test_flags_override_config(config, components, tmp_path):
+    get_components, build_vectorstore, _ = components
+    args = build_parser().parse_args([
+        "ingest", "--workers", "4", "--batch-size", "64", "--checkpoint", str(tmp_path / "checkpoint"),
+    ])
+
+    assert ingest(args, config) == 0
+
+    used = get_components.call_args.args[0]
+    assert used.PDF_LOADER_WORKERS == 4
+    assert used.INGEST_BATCH_SIZE == 64
+    build_vectorstore.return_value.bulk_add.assert_called_once()
+    assert build_vectorstore.return_value.bulk_add.call_args.kwargs["batch_size"] == 64
+    # A completed run leaves no checkpoint behind
+    assert not (tmp_path / "checkpoint").exists()
+    assert (tmp_path / "generation").exists()
+
+
+def test_dry_run_writes_nothing(config, components, tmp_path, capsys):
+    _, build_vectorstore, build_version_manager = components
+    args = build_parser().parse_args(["ingest", "--dry-run", "--checkpoint", str(tmp_path / "checkpoint")])
+
+    assert ingest(args, config) == 0
+
+    build_vectorstore.assert_not_called()
+    build_version_manager.return_value.register_version.assert_not_called()
+    build_version_manager.return_value.save.assert_not_called()
+    assert '"chunks_added": 1' in capsys.readouterr().out
+    assert not (tmp_path / "generation").exists()
+
+
+def test_since_must_be_iso_date():
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(["ingest", "--since", "last week"])
+
+    assert build_parser().parse_args(["ingest", "--since", "2024-06-01"]).since.year == 2024
+
+
+@pytest.fixture
+def local_config(monkeypatch, config, tmp_path):
+    monkeypatch.setenv("NTT_RAG_VECTOR_BACKEND", "local")
+    monkeypatch.setenv("NTT_RAG_VECTOR_INDEX_DIR", str(tmp_path / "index"))
+    monkeypatch.setenv("NTT_RAG_DATA_VERSION_FILE", str(tmp_path / "versions.json"))
+    monkeypatch.setenv("NTT_RAG_VERSION_DB_FILE", str(tmp_path / "versions.db"))
+    store = LocalVectorStore(tmp_path / "index")
+    store.upsert(ids=["a"], embeddings=[[1.0, 0.0]], documents=["a"], metadatas=[{}])
+    store.close()
+    return BaseConfig()
+
+
+def test_snapshot_needs_the_local_backend(config, tmp_path, capsys):
+    args = build_parser().parse_args(["snapshot", str(tmp_path / "snapshot")])
+
+    assert snapshot(args, config) == 1
+    assert "NTT_RAG_VECTOR_BACKEND=local" in capsys.readouterr().err
+
+
+def test_snapshot_and_restore_refuse_an_index_in_use(local_config, tmp_path):
+    store = LocalVectorStore(tmp_path / "index")
+
+    assert snapshot(build_parser().parse_args(["snapshot", str(tmp_path / "snapshot")]), local_config) == 1
+    assert restore(build_parser().parse_args(["restore", str(tmp_path / "snapshot")]), local_config) == 1
+    assert store.size == 1
+    store.close()
+
+
+def test_restore_brings_back_the_snapshot(local_config, tmp_path):
+    assert snapshot(build_parser().parse_args(["snapshot", str(tmp_path / "snapshot")]), local_config) == 0
+
+    store = LocalVectorStore(tmp_path / "index")
+    store.delete(ids=["a"])
+    store.close()
+
+    assert restore(build_parser().parse_args(["restore", str(tmp_path / "snapshot")]), local_config) == 0
+    assert LocalVectorStore(tmp_path / "index", read_only=True).get()["ids"] == ["a"]
+
+
+def test_ingest_refuses_an_index_in_use(local_config, tmp_path, capsys):
+    store = LocalVectorStore(tmp_path / "index")
+    args = build_parser().parse_args(["ingest", "--checkpoint", str(tmp_path / "checkpoint")])
+
+    with patch("cli.main.get_ingestion_components", return_value=(MagicMock(), Cleaner(), Chunker())), \
+         patch("vectorstore.vectorstore.HuggingFaceEmbeddings"):
+        assert ingest(args, local_config) == 1
+
+    assert "in use by another process" in capsys.readouterr().err
+    store.close()
@@ -0,0 +1,84 @@
+from langchain_core.documents import Document
+
+from rag.context import ContextPacker, estimate_tokens, overlap_length
+
+
+def chunk(text, source="sr_2015.pdf", page=0, index=0):
+    return Document(
+        page_content=text,
+        metadata={"source": source, "file_name": source, "page": page, "chunk_index": index, "chunk_id": f"{source}:{page}:{index}"},
+    )
+
+
+FIRST = "NTT Data reduced its carbon emissions by twelve percent across all data centres in 2015"
+# Starts with the last 31 characters of FIRST, as the splitter's overlap would
+SECOND = "across all data centres in 2015 thanks to renewable energy contracts in Europe"
+
+
+def test_overlap_length_finds_shared_suffix_and_prefix():
+    assert overlap_length(FIRST, SECOND, max_overlap=1000) == len("across all data centres in 2015")
+    # Short coincidental matches are not treated as overlap
+    assert overlap_length("the report ends with a", "a new section", max_overlap=1000) == 0
+
+
+def test_consecutive_chunks_of_a_page_are_merged_once():
+    packer = ContextPacker(max_tokens=1000)
+
+    packed, stats = packer.pack([chunk(SECOND, index=1), chunk(FIRST, index=0)])
+
+    assert len(packed) == 1
+    assert packed[0].page_content == FIRST + SECOND[len("across all data centres in 2015"):]
+    assert packed[0].metadata["merged_chunks"] == 2
+    assert stats["tokens_saved"] > 0
+
+
+def test_chunks_of_other_pages_are_not_merged():
+    packer = ContextPacker(max_tokens=1000)
+
+    packed, _ = packer.pack([chunk(FIRST, page=0, index=3), chunk(SECOND, page=1, index=4)])
+
+    assert len(packed) == 2
+
+
+def test_near_duplicates_keep_the_better_ranked_chunk():
+    packer = ContextPacker(max_tokens=1000, duplicate_threshold=0.8)
+    copy = chunk(FIRST + " overall", source="sr_2015_copy.pdf")
+
+    packed, stats = packer.pack([copy, chunk(FIRST), chunk(FIRST)])
+
+    assert [doc.metadata["source"] for doc in packed] == ["sr_2015_copy.pdf"]
+    assert stats["chunks_duplicate"] == 2
+
+
+def test_budget_keeps_best_ranked_passages_in_document_order():
+    texts = [f"passage {i} " + "word " * 40 for i in range(4)]
+    documents = [chunk(text, source=f"doc{i}.pdf") for i, text in zip([3, 0, 2, 1], texts)]
+    budget = estimate_tokens(texts[0]) * 2
+
+    packed, stats = ContextPacker(max_tokens=budget).pack(documents)
+
+    # The two best-ranked chunks fit; they are emitted sorted by source
+    assert [doc.metadata["source"] for doc in packed] == ["doc0.pdf", "doc3.pdf"]
+    assert stats["passages_packed"] == 2
+    assert stats["tokens_packed"] <= budget
+
+
+def test_packing_is_independent_of_retrieval_order():
+    documents = [chunk(FIRST, source="a.pdf"), chunk(SECOND, source="b.pdf")]
+    packer = ContextPacker(max_tokens=1000)
+
+    first, _ = packer.pack(documents)
+    second, _ = packer.pack(list(reversed(documents)))
+
+    assert [doc.page_content for doc in first] == [doc.page_content for doc in second]
+
+
+def test_stats_accumulate_across_requests():
+    packer = ContextPacker(max_tokens=1000)
+    packer.pack([chunk(FIRST), chunk(FIRST)])
+    packer.pack([chunk(SECOND)])
+
+    stats = packer.stats()
+    assert stats["requests"] == 2
+    assert stats["tokens_saved"] == estimate_tokens(FIRST)
+    assert 0 < stats["savings_ratio"] < 1
@@ -0,0 +1,89 @@
+from unittest.mock import MagicMock
+
+from vectorstore.embedding_cache import CachedEmbeddings, EmbeddingCache
+from ingestion.version_manager import hash_chunk_content
+
+
+def make_model():
+    model = MagicMock()
+    model.embed_documents.side_effect = lambda texts: [[float(len(t)), 0.5] for t in texts]
+    model.embed_query.side_effect = lambda text: [float(len(text)), 1.0]
+    return model
+
+
+def test_cache_round_trip(tmp_path):
+    cache = EmbeddingCache(tmp_path / "cache.sqlite")
+
+    cache.put_many("model-a", {"h1": [1.0, 2.0], "h2": [3.0, 4.0]})
+
+    assert cache.get_many("model-a", ["h1", "h2", "h3"]) == {"h1": [1.0, 2.0], "h2": [3.0, 4.0]}
+    assert cache.get_many("model-b", ["h1"]) == {}
+    assert cache.count("model-a") == 2
+
+
+def test_cache_persists_across_instances(tmp_path):
+    EmbeddingCache(tmp_path / "cache.sqlite").put_many("model", {"h1": [1.0]})
+
+    reopened = EmbeddingCache(tmp_path / "cache.sqlite")
+
+    assert reopened.get_many("model", ["h1"]) == {"h1": [1.0]}
+
+
+def test_cached_embeddings_only_embeds_misses(tmp_path):
+    model = make_model()
+    cache = EmbeddingCache(tmp_path / "cache.sqlite")
+    cached = CachedEmbeddings(model, cache, "model")
+
+    first = cached.embed_documents(["alpha", "beta"])
+    second = cached.embed_documents(["beta", "gamma", "alpha"])
+
+    assert first == [[5.0, 0.5], [4.0, 0.5]]
+    assert second == [[4.0, 0.5], [5.0, 0.5], [5.0, 0.5]]
+
+    assert model.embed_documents.call_args_list[1].args[0] == ["gamma"]
+    assert cached.hits == 2
+    assert cached.misses == 3
+
+
+def test_cached_embeddings_embeds_duplicate_texts_once(tmp_path):
+    model = make_model()
+    cached = CachedEmbeddings(model, EmbeddingCache(tmp_path / "cache.sqlite"), "model")
+
+    result = cached.embed_documents(["same", "same"])
+
+    assert result == [[4.0, 0.5], [4.0, 0.5]]
+    model.embed_documents.assert_called_once_with(["same"])
+
+
+def test_cache_is_keyed_by_content_hash(tmp_path):
+    cache = EmbeddingCache(tmp_path / "cache.sqlite")
+    cached = CachedEmbeddings(make_model(), cache, "model")
+
+    cached.embed_documents(["alpha"])
+
+    assert cache.get_many("model", [hash_chunk_content("alpha")]) == {hash_chunk_content("alpha"): [5.0, 0.5]}
+
+
+def test_embed_query_bypasses_cache(tmp_path):
+    model = make_model()
+    cache = EmbeddingCache(tmp_path / "cache.sqlite")
+    cached = CachedEmbeddings(model, cache, "model")
+
+    assert cached.embed_query("abc") == [3.0, 1.0]
+    assert cache.count("model") == 0
+
+
+def test_chunk_hashes_and_rehashed_texts_share_entries(tmp_path):
+    from ingestion.hashing import ChunkHasher
+
+    model = make_model()
+    cache = EmbeddingCache(tmp_path / "cache.sqlite")
+    hasher = ChunkHasher("blake2b")
+    cached = CachedEmbeddings(model, cache, "model", hasher=hasher)
+
+    cached.embed_documents_with_hashes(["alpha"], [hasher.content_hash("alpha")])
+    cached.embed_documents(["alpha"])
+
+    model.embed_documents.assert_called_once_with(["alpha"])
+    assert cache.count("model:blake2b") == 1
+    assert cache.count("model") == 0
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+
+import pytest
+from unittest.mock import MagicMock
+
+from vectorstore.embedding_executor import EmbeddingExecutor, EmbeddingQueueFull
+
+
+def make_embeddings():
+    embeddings = MagicMock()
+    embeddings.embed_query.side_effect = lambda text: [float(len(text))]
+    embeddings.embed_documents.side_effect = lambda texts: [[float(len(t))] for t in texts]
+    return embeddings
+
+
+@pytest.mark.asyncio
+async def test_embed_query_runs_off_the_event_loop_thread():
+    loop_thread = threading.get_ident()
+    worker_threads = []
+
+    embeddings = MagicMock()
+    embeddings.embed_query.side_effect = lambda text: worker_threads.append(threading.get_ident()) or [1.0]
+
+    executor = EmbeddingExecutor(embeddings, max_workers=1)
+
+    result = await executor.embed_query("hello")
+
+    assert result == [1.0]
+    assert worker_threads and worker_threads[0] != loop_thread
+
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_embed_documents_returns_vectors():
+    executor = EmbeddingExecutor(make_embeddings())
+
+    result = await executor.embed_documents(["a", "abc"])
+
+    assert result == [[1.0], [3.0]]
+
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_is_full():
+    release = threading.Event()
+
+    embeddings = MagicMock()
+    embeddings.embed_query.side_effect = lambda text: release.wait(5) and [1.0]
+
+    executor = EmbeddingExecutor(embeddings, max_workers=1, max_queue_size=2, retry_after=3)
+
+    first = asyncio.create_task(executor.embed_query("a"))
+    second = asyncio.create_task(executor.embed_query("b"))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(EmbeddingQueueFull) as exc_info:
+        await executor.embed_query("c")
+
+    assert exc_info.value.retry_after == 3
+
+    stats = executor.stats()
+    assert stats["in_flight"] == 2
+    assert stats["queue_depth"] == 1
+    assert stats["rejected"] == 1
+
+    release.set()
+    await asyncio.gather(first, second)
+
+    assert executor.stats()["in_flight"] == 0
+
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_stats_record_queue_wait_time():
+    executor = EmbeddingExecutor(make_embeddings())
+
+    await executor.embed_query("a")
+    await executor.embed_query("b")
+
+    stats = executor.stats()
+
+    assert stats["queue_wait"]["count"] == 2
+    assert stats["run_time"]["count"] == 2
+
+    executor.shutdown()
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        EmbeddingExecutor(make_embeddings(), mode="gpu")
+
+
+def test_process_mode_requires_factory():
+    with pytest.raises(ValueError):
+        EmbeddingExecutor(make_embeddings(), mode="process")
@@ -0,0 +1,326 @@
+import json
+import os
+import random
+import threading
+import time
+
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from langchain_core.documents import Document
+
+import pytest
+
+from ingestion.checkpoint import IngestCheckpoint
+from ingestion.chunker import Chunker
+from ingestion.cleaner import Cleaner
+from ingestion.runner import IngestionRunner, derive_document_id, derive_year, group_by_source
+from ingestion.version_manager import VersionManager, file_fingerprint
+from vectorstore.versioned_store import VersionedVectorStore
+
+
+def make_chunk(text, source):
+    return Document(page_content=text, metadata={"source": source, "chunk_id": text})
+
+
+def make_runner(chunks, ingest_results):
+    loader = MagicMock()
+    loader.list_files.return_value = sorted({c.metadata["source"] for c in chunks})
+    loader.lazy_load.return_value = (page for page in ["raw"])
+    cleaner = MagicMock()
+    cleaner.clean_iter.return_value = iter(["clean"])
+    chunker = MagicMock()
+    chunker.chunk_iter.return_value = iter(chunks)
+
+    versioned_store = MagicMock()
+    versioned_store.ingest.side_effect = ingest_results
+    versioned_store.versions.is_unchanged.return_value = False
+
+    return IngestionRunner(loader, cleaner, chunker, versioned_store), versioned_store
+
+
+def test_derive_document_id():
+    assert derive_document_id("data/raw/sr_2015_20150301_v01.pdf") == "sr_2015"
+    assert derive_document_id("SR_2019.pdf") == "sr_2019"
+
+
+def test_derive_year():
+    assert derive_year("data/raw/sr_2015_20160301_v01.pdf") == 2015
+    assert derive_year("annual_report.pdf") is None
+    assert derive_year("report_12015.pdf") is None
+
+
+def test_run_ingests_each_source_and_reports_progress():
+    chunks = [
+        make_chunk("a", "sr_2015_20150301_v01.pdf"),
+        make_chunk("b", "sr_2015_20150301_v01.pdf"),
+        make_chunk("c", "sr_2016_20160301_v01.pdf"),
+    ]
+    runner, versioned_store = make_runner(
+        chunks,
+        [{"added": 2}, {"skipped": True, "reason": "content unchanged"}],
+    )
+
+    assert runner.status()["state"] == "pending"
+
+    status = runner.run()
+
+    assert versioned_store.ingest.call_count == 2
+    first_call = versioned_store.ingest.call_args_list[0].kwargs
+    assert first_call["document_id"] == "sr_2015"
+    assert len(first_call["chunks"]) == 2
+    assert first_call["chunks"][0].metadata["document_id"] == "sr_2015"
+    assert first_call["chunks"][0].metadata["year"] == 2015
+
+    assert status["state"] == "completed"
+    assert status["documents_total"] == 2
+    assert status["documents_processed"] == 2
+    assert status["chunks_added"] == 2
+    assert status["documents_skipped"] == 1
+    assert status["finished_at"] is not None
+    assert runner.finished
+
+
+def test_run_records_failure():
+    runner, _ = make_runner([], [])
+    runner.loader.list_files.side_effect = FileNotFoundError("no such directory")
+
+    status = runner.run()
+
+    assert status["state"] == "failed"
+    assert "no such directory" in status["error"]
+
+
+def test_cancel_stops_between_documents():
+    chunks = [make_chunk("a", "one.pdf"), make_chunk("b", "two.pdf")]
+    runner, versioned_store = make_runner(chunks, [])
+
+    def ingest_and_cancel(**kwargs):
+        runner.cancel()
+        return {"added": 1}
+
+    versioned_store.ingest.side_effect = ingest_and_cancel
+
+    status = runner.run()
+
+    assert versioned_store.ingest.call_count == 1
+    assert status["state"] == "cancelled"
+
+
+def test_group_by_source_yields_contiguous_groups():
+    chunks = [make_chunk("a", "one.pdf"), make_chunk("b", "one.pdf"), make_chunk("c", "two.pdf")]
+
+    groups = [(source, [c.page_content for c in group]) for source, group in group_by_source(chunks)]
+
+    assert groups == [("one.pdf", ["a", "b"]), ("two.pdf", ["c"])]
+
+
+def test_group_by_source_rejects_interleaved_sources():
+    chunks = [make_chunk("a", "one.pdf"), make_chunk("b", "two.pdf"), make_chunk("c", "one.pdf")]
+
+    with pytest.raises(ValueError):
+        list(group_by_source(chunks))
+
+
+def test_each_source_is_ingested_before_the_next_is_loaded():
+    events = []
+
+    def lazy_load(paths):
+        for source in paths:
+            events.append(f"load {source}")
+            yield Document(page_content=f"text of {source}", metadata={"source": source, "page": 0})
+
+    loader = MagicMock()
+    loader.list_files.return_value = ["one.pdf", "two.pdf", "three.pdf"]
+    loader.lazy_load.side_effect = lazy_load
+
+    versioned_store = MagicMock()
+    versioned_store.ingest.side_effect = lambda **kwargs: events.append(f"ingest {kwargs['source']}") or {"added": 1}
+
+    runner = IngestionRunner(loader, Cleaner(), Chunker(chunk_size=100, chunk_overlap=0), versioned_store)
+
+    status = runner.run()
+
+    # A source is complete once the first page of the next one arrives
+    assert events == [
+        "load one.pdf",
+        "load two.pdf",
+        "ingest one.pdf",
+        "load three.pdf",
+        "ingest two.pdf",
+        "ingest three.pdf",
+    ]
+    assert status["documents_processed"] == 3
+
+
+def test_unchanged_files_are_not_loaded(tmp_path):
+    unchanged = tmp_path / "sr_2015_20150301_v01.pdf"
+    changed = tmp_path / "sr_2016_20160301_v01.pdf"
+    unchanged.write_bytes(b"%PDF-1.4 one")
+    changed.write_bytes(b"%PDF-1.4 two")
+
+    versions = VersionManager(tmp_path / "versions.json")
+    versions.register_version("sr_2015", "h1", str(unchanged), {"a": "h1"})
+    versions.record_fingerprint("sr_2015", str(unchanged), file_fingerprint(str(unchanged)))
+
+    chunks = [make_chunk("b", str(changed))]
+    runner, versioned_store = make_runner(chunks, [{"added": 1}])
+    runner.loader.list_files.return_value = [str(unchanged), str(changed)]
+    versioned_store.versions = versions
+
+    status = runner.run()
+
+    runner.loader.lazy_load.assert_called_once_with([str(changed)])
+    assert versioned_store.ingest.call_args.kwargs["fingerprint"] == file_fingerprint(str(changed))
+    assert status["documents_total"] == 2
+    assert status["documents_unchanged"] == 1
+
+
+class InMemoryStore:
+    """Stands in for VectorStoreBuilder; records chunks by id like the Chroma collection."""
+
+    def __init__(self, delay=0.0):
+        self.contents = {}
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        self.vector_store = MagicMock()
+        self.vector_store.delete.side_effect = lambda ids: [self.contents.pop(i) for i in ids]
+
+    def add(self, chunks):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay * random.random())
+        with self.lock:
+            self.active -= 1
+            self.contents.update({c.metadata["chunk_id"]: c.page_content for c in chunks})
+
+
+def run_corpus(tmp_path, concurrency, delay=0.0):
+    sources = [f"sr_{2010 + i % 6}_2020010{i // 6}_v0{i // 6}.pdf" for i in range(18)]
+    pages = [
+        Document(page_content=f"Report {source[:7]} revision {i // 6} paragraph {p}", metadata={"source": source, "page": p})
+        for i, source in enumerate(sources)
+        for p in range(3)
+    ]
+
+    loader = MagicMock()
+    loader.list_files.return_value = sources
+    loader.lazy_load.side_effect = lambda paths: (page for page in pages)
+
+    store = InMemoryStore(delay)
+    versions = VersionManager(tmp_path / f"versions_{concurrency}.json")
+    runner = IngestionRunner(
+        loader, Cleaner(), Chunker(chunk_size=30, chunk_overlap=0), VersionedVectorStore(store, versions),
+        concurrency=concurrency,
+    )
+
+    status = runner.run()
+
+    state = json.loads((tmp_path / f"versions_{concurrency}.json").read_text())
+    for doc in state.values():
+        for version in doc["versions"].values():
+            version.pop("last_indexed")
+
+    return status, store, state
+
+
+def test_concurrent_ingestion_matches_serial(tmp_path):
+    serial_status, serial_store, serial_state = run_corpus(tmp_path, concurrency=1)
+    status, store, state = run_corpus(tmp_path, concurrency=4, delay=0.01)
+
+    assert status["state"] == "completed"
+    assert store.contents == serial_store.contents
+    assert state == serial_state
+    for key in ("documents_processed", "chunks_added", "chunks_deleted", "documents_skipped"):
+        assert status[key] == serial_status[key]
+    assert 1 < store.max_active <= 4
+
+
+def test_concurrent_ingestion_reports_failure(tmp_path):
+    chunks = [make_chunk("a", "one.pdf"), make_chunk("b", "two.pdf"), make_chunk("c", "three.pdf")]
+    runner, versioned_store = make_runner(chunks, [{"added": 1}, RuntimeError("chroma down"), {"added": 1}])
+    runner.concurrency = 2
+
+    status = runner.run()
+
+    assert status["state"] == "failed"
+    assert status["error"] == "chroma down"
+
+
+def test_checkpoint_resumes_interrupted_run(tmp_path):
+    checkpoint_file = tmp_path / "checkpoint"
+    checkpoint_file.write_text("one.pdf\ntwo.p")
+
+    chunks = [make_chunk("c", "three.pdf")]
+    # two.pdf yields no chunks and is recorded as an empty source first
+    runner, versioned_store = make_runner(chunks, [{"added": 0}, {"added": 1}])
+    runner.loader.list_files.return_value = ["one.pdf", "two.pdf", "three.pdf"]
+    runner.checkpoint = IngestCheckpoint(checkpoint_file)
+
+    status = runner.run()
+
+    # The partial last line of a killed run does not count as finished
+    runner.loader.lazy_load.assert_called_once_with(["two.pdf", "three.pdf"])
+    assert status["documents_resumed"] == 1
+    assert status["state"] == "completed"
+    assert not checkpoint_file.exists()
+
+
+def test_checkpoint_records_each_ingested_source(tmp_path):
+    chunks = [make_chunk("a", "one.pdf"), make_chunk("b", "two.pdf")]
+    runner, versioned_store = make_runner(chunks, [{"added": 1}, RuntimeError("chroma down")])
+    runner.checkpoint = IngestCheckpoint(tmp_path / "checkpoint")
+
+    status = runner.run()
+
+    assert status["state"] == "failed"
+    assert IngestCheckpoint(tmp_path / "checkpoint").completed == {"one.pdf"}
+
+
+def test_since_skips_files_modified_earlier(tmp_path):
+    old = tmp_path / "old.pdf"
+    new = tmp_path / "new.pdf"
+    old.write_bytes(b"old")
+    new.write_bytes(b"new")
+    os.utime(old, (1_600_000_000, 1_600_000_000))
+
+    runner, _ = make_runner([make_chunk("n", str(new))], [{"added": 1}])
+    runner.loader.list_files.return_value = [str(old), str(new)]
+    runner.since_ns = int(datetime(2024, 1, 1).timestamp() * 1e9)
+
+    runner.run()
+
+    runner.loader.lazy_load.assert_called_once_with([str(new)])
+
+
+def test_files_without_chunks_are_fingerprinted_and_skipped_next_run(tmp_path):
+    scanned = tmp_path / "sr_2014_20140301_v01.pdf"
+    text = tmp_path / "sr_2015_20150301_v01.pdf"
+    broken = tmp_path / "sr_2016_20160301_v01.pdf"
+    for path in (scanned, text, broken):
+        path.write_bytes(path.name.encode())
+    files = [str(scanned), str(text), str(broken)]
+
+    loader = MagicMock()
+    loader.list_files.return_value = files
+    loader.errors = {str(broken): "cannot open"}
+    loader.lazy_load.side_effect = lambda paths: (
+        page for page in [Document(page_content="Emissions fell", metadata={"source": str(text), "page": 0})] if page.metadata["source"] in paths
+    )
+    store = InMemoryStore()
+    versions = VersionManager(tmp_path / "versions.json")
+    runner = IngestionRunner(loader, Cleaner(), Chunker(chunk_size=30, chunk_overlap=0), VersionedVectorStore(store, versions))
+
+    status = runner.run()
+
+    assert status["state"] == "completed"
+    assert status["documents_failed"] == 1
+    assert versions.is_unchanged(str(scanned), file_fingerprint(str(scanned)))
+    assert versions.get_fingerprint(str(broken)) is None
+    assert len(store.contents) == 1
+
+    rerun = IngestionRunner(loader, Cleaner(), Chunker(chunk_size=30, chunk_overlap=0), VersionedVectorStore(store, versions))
+    assert rerun.changed_files(files) == [str(broken)]
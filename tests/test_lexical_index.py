@@ -0,0 +1,181 @@
+from os import replace as os_replace
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from vectorstore.lexical_index import LexicalIndex, tokenize
+
+
+CHUNKS = [
+    ("a", "NTT Data sustainability report 2015 covers carbon emissions"),
+    ("b", "The 2019 report describes the SAP migration programme"),
+    ("c", "Employee wellbeing and diversity figures for 2019"),
+    ("d", "Carbon neutral data centres and renewable energy"),
+]
+
+
+def ids(results):
+    return [chunk_id for chunk_id, _ in results]
+
+
+def test_tokenize_keeps_numbers_and_identifiers():
+    assert tokenize("SR_2015 report, FY2019!") == ["sr_2015", "report", "fy2019"]
+
+
+def test_search_ranks_by_bm25():
+    index = LexicalIndex()
+    index.add(CHUNKS)
+
+    assert ids(index.search("SAP migration"))[0] == "b"
+    assert set(ids(index.search("2019"))) == {"b", "c"}
+    assert ids(index.search("carbon 2015"))[0] == "a"
+    assert index.search("unknownterm") == []
+
+
+def test_search_respects_k():
+    index = LexicalIndex()
+    index.add(CHUNKS)
+
+    assert len(index.search("report carbon 2019", k=2)) == 2
+
+
+def test_delete_and_replace():
+    index = LexicalIndex()
+    index.add(CHUNKS)
+
+    index.delete(["b"])
+    assert ids(index.search("SAP")) == []
+    assert index.size == 3
+
+    # Re-adding an id replaces its text
+    index.add([("c", "SAP rollout")])
+    assert ids(index.search("SAP")) == ["c"]
+    assert ids(index.search("wellbeing")) == []
+
+
+def test_segments_merge_and_compact():
+    index = LexicalIndex(merge_postings=5)
+    for chunk in CHUNKS:
+        index.add([chunk])
+        index.flush()
+    assert not index.delta
+    assert len(index.segments) < len(CHUNKS)
+
+    index.delete(["a", "b", "c"])
+    index.save()
+    # Tombstones outnumbered live chunks, so doc ids were compacted
+    assert index.chunk_ids == ["d"]
+    assert ids(index.search("carbon")) == ["d"]
+    assert ids(index.search("2019")) == []
+
+
+def test_segments_survive_reload(tmp_path):
+    index = LexicalIndex(tmp_path / "lexical", merge_postings=5)
+    for chunk in CHUNKS:
+        index.add([chunk])
+        index.flush()
+    index.delete(["d"])
+    index.flush()
+
+    reopened = LexicalIndex(tmp_path / "lexical")
+    assert reopened.size == 3
+    assert ids(reopened.search("carbon")) == ["a"]
+    assert set(ids(reopened.search("2019"))) == {"b", "c"}
+
+
+def test_journal_is_replayed_after_crash(tmp_path):
+    index = LexicalIndex(tmp_path / "lexical")
+    index.add(CHUNKS)
+    index.delete(["d"])
+    index.flush()
+    # No close(): only the journal is on disk
+
+    reopened = LexicalIndex(tmp_path / "lexical")
+    assert reopened.size == 3
+    assert ids(reopened.search("carbon")) == ["a"]
+
+
+def test_snapshot_round_trip(tmp_path):
+    index = LexicalIndex(tmp_path / "lexical")
+    index.add(CHUNKS)
+    index.close()
+
+    reopened = LexicalIndex(tmp_path / "lexical")
+    assert (tmp_path / "lexical" / "journal.jsonl").stat().st_size == 0
+    assert ids(reopened.search("SAP migration"))[0] == "b"
+
+    # Changes on top of a memory-mapped snapshot
+    reopened.add([("e", "SAP licensing")])
+    reopened.delete(["b"])
+    assert ids(reopened.search("SAP")) == ["e"]
+    reopened.close()
+
+    assert ids(LexicalIndex(tmp_path / "lexical").search("SAP")) == ["e"]
+
+
+def test_crash_before_the_manifest_keeps_the_previous_save(tmp_path):
+    index = LexicalIndex(tmp_path / "lexical")
+    index.add(CHUNKS)
+    index.save()
+    # Tombstones now outnumber live chunks, so the next save compacts and renumbers
+    index.delete(["a", "b", "d"])
+    index.flush()
+
+    def replace(src, dst):
+        if Path(dst).name == "manifest.json":
+            raise OSError("crash")
+        return os_replace(src, dst)
+
+    with patch("vectorstore.lexical_index.os.replace", side_effect=replace):
+        with pytest.raises(OSError):
+            index.save()
+
+    reopened = LexicalIndex(tmp_path / "lexical")
+    assert reopened.size == 1
+    assert ids(reopened.search("2019")) == ["c"]
+
+
+def test_torn_journal_line_is_ignored(tmp_path):
+    index = LexicalIndex(tmp_path / "lexical")
+    index.add(CHUNKS[:1])
+    index.flush()
+    with (tmp_path / "lexical" / "journal.jsonl").open("a") as f:
+        f.write('{"add": [["b", {"sap"')
+
+    assert LexicalIndex(tmp_path / "lexical").size == 1
+
+
+def test_pruned_search_matches_exhaustive_bm25():
+    import math
+    import random
+    from collections import Counter
+
+    rng = random.Random(0)
+    words = [f"w{i}" for i in range(60)]
+    texts = {f"c{i}": " ".join(rng.choices(words, weights=[1 / (r + 1) for r in range(60)], k=rng.randint(5, 40))) for i in range(300)}
+
+    index = LexicalIndex()
+    index.add(texts.items())
+    index.delete([f"c{i}" for i in range(0, 300, 7)])
+    live = {chunk_id: Counter(text.split()) for chunk_id, text in texts.items() if chunk_id in index.ids}
+    avg_len = sum(sum(c.values()) for c in live.values()) / len(live)
+
+    def bm25(query):
+        scores = {}
+        for term in set(query.split()):
+            df = sum(1 for c in live.values() if term in c)
+            if not df:
+                continue
+            idf = math.log(1 + (len(live) - df + 0.5) / (df + 0.5))
+            for chunk_id, counts in live.items():
+                tf = counts[term]
+                if tf:
+                    norm = tf + 1.5 * (1 - 0.75 + 0.75 * sum(counts.values()) / avg_len)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * 2.5 / norm
+        return sorted(scores.values(), reverse=True)
+
+    for _ in range(50):
+        query = " ".join(rng.sample(words, rng.randint(1, 6)))
+        expected = bm25(query)[:5]
+        assert [round(score, 4) for _, score in index.search(query, k=5)] == [round(score, 4) for score in expected]
@@ -19,4 +19,20 @@ async def test_llm_interface_generate_returns_text():
     result = await llm_interface.generate("test message")
 
     mock_llm.agenerate.assert_called_once()
-    assert result == "hello world"
\ No newline at end of file
+    assert result == "hello world"
+
+@pytest.mark.asyncio
+async def test_llm_interface_stream_yields_non_empty_tokens():
+    async def fake_astream(messages):
+        for content in ["hello", "", " world"]:
+            yield MagicMock(content=content)
+
+    mock_llm = MagicMock()
+    mock_llm.astream = fake_astream
+
+    llm_interface = LLMInterface.__new__(LLMInterface)
+    llm_interface.llm = mock_llm
+
+    tokens = [token async for token in llm_interface.stream("test message")]
+
+    assert tokens == ["hello", " world"]
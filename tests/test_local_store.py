@@ -0,0 +1,220 @@
+import numpy as np
+import pytest
+
+from vectorstore.local_store import IndexLocked, LocalVectorStore, locked_directory, where_sql
+
+
+def vector(*values):
+    return list(values) + [0.0] * (4 - len(values))
+
+
+def add(store, chunk_id, embedding, **metadata):
+    store.upsert(ids=[chunk_id], embeddings=[embedding], documents=[f"text {chunk_id}"], metadatas=[metadata])
+
+
+def ids(results):
+    return [doc.id for doc, _ in results]
+
+
+def test_search_ranks_by_cosine_similarity(tmp_path):
+    store = LocalVectorStore(tmp_path / "index")
+    add(store, "a", vector(1, 0))
+    add(store, "b", vector(1, 1))
+    add(store, "c", vector(0, 1))
+
+    results = store.similarity_search_by_vector_with_relevance_scores(vector(2, 0.1), k=2)
+
+    assert ids(results) == ["a", "b"]
+    # Cosine distance, like Chroma's scores
+    assert results[0][1] == pytest.approx(0.0012, abs=1e-4)
+    assert results[0][0].page_content == "text a"
+
+
+def test_upsert_replaces_and_delete_removes(tmp_path):
+    store = LocalVectorStore(tmp_path / "index")
+    add(store, "a", vector(1, 0))
+    add(store, "b", vector(0, 1))
+
+    add(store, "a", vector(0, 0, 1))
+    store.delete(["b"])
+
+    assert store.size == 1
+    assert ids(store.similarity_search_by_vector_with_relevance_scores(vector(0, 0, 1), k=5)) == ["a"]
+    assert store.get_by_ids(["a", "b"])[0].page_content == "text a"
+
+
+def test_dead_rows_are_compacted_into_a_new_generation(tmp_path):
+    store = LocalVectorStore(tmp_path / "index")
+    for i in range(4):
+        add(store, f"c{i}", vector(1, i))
+    store.delete(["c0", "c1", "c2"])
+
+    assert store.generation == 1
+    assert [p.name for p in (tmp_path / "index").glob("vectors-*.f32")] == ["vectors-1.f32"]
+    assert ids(store.similarity_search_by_vector_with_relevance_scores(vector(1, 3), k=5)) == ["c3"]
+
+
+def test_reopened_store_is_memory_mapped(tmp_path):
+    store = LocalVectorStore(tmp_path / "index")
+    add(store, "a", vector(1, 0))
+    add(store, "b", vector(0, 1))
+    store.delete(["a"])
+    store.close()
+
+    reopened = LocalVectorStore(tmp_path / "index")
+    assert isinstance(reopened._matrix, np.memmap)
+    assert reopened.size == 1
+    assert ids(reopened.similarity_search_by_vector_with_relevance_scores(vector(1, 1), k=5)) == ["b"]
+
+
+def test_uncommitted_tail_is_ignored(tmp_path):
+    store = LocalVectorStore(tmp_path / "index")
+    add(store, "a", vector(1, 0))
+    store.close()
+    # A crash after appending a partial row, before the SQLite commit
+    with (tmp_path / "index" / "vectors-0.f32").open("ab") as f:
+        f.write(b"\x00" * 6)
+
+    reopened = LocalVectorStore(tmp_path / "index")
+    assert reopened.size == 1
+    add(reopened, "b", vector(0, 1))
+    assert ids(reopened.similarity_search_by_vector_with_relevance_scores(vector(0, 1), k=1)) == ["b"]
+
+
+def test_rejects_embeddings_of_another_dimension(tmp_path):
+    store = LocalVectorStore(tmp_path / "index")
+    add(store, "a", vector(1, 0))
+
+    with pytest.raises(ValueError, match="4-dimensional"):
+        store.upsert(ids=["b"], embeddings=[[1.0, 0.0]], documents=["b"], metadatas=[{}])
+
+
+def test_filters_restrict_the_scan(tmp_path):
+    store = LocalVectorStore(tmp_path / "index")
+    add(store, "a", vector(1, 0), document_id="sr_2015", year=2015, file_name="sr_2015.pdf")
+    add(store, "b", vector(1, 0.1), document_id="sr_2019", year=2019, file_name="sr_2019.pdf")
+    add(store, "c", vector(0, 1), document_id="sr_2019", year=2019, file_name="sr_2019.pdf")
+
+    def search(where):
+        return ids(store.similarity_search_by_vector_with_relevance_scores(vector(1, 0), k=5, filter=where))
+
+    assert search({"document_id": {"$in": ["sr_2019"]}}) == ["b", "c"]
+    assert search({"$and": [{"year": {"$gte": 2016}}, {"year": {"$lte": 2020}}]}) == ["b", "c"]
+    assert search({"$or": [{"source": {"$in": ["sr_2015.pdf"]}}, {"file_name": {"$in": ["sr_2015.pdf"]}}]}) == ["a"]
+    assert search({"year": 2030}) == []
+
+
+def test_where_sql_rejects_unknown_operators():
+    with pytest.raises(ValueError):
+        where_sql({"year": {"$regex": "20"}})
+
+
+def test_snapshot_and_restore(tmp_path):
+    store = LocalVectorStore(tmp_path / "index")
+    add(store, "a", vector(1, 0))
+    store.snapshot(tmp_path / "snapshot")
+
+    add(store, "b", vector(0, 1))
+    store.close()
+
+    with locked_directory(tmp_path / "index"):
+        LocalVectorStore.restore(tmp_path / "snapshot", tmp_path / "index")
+    restored = LocalVectorStore(tmp_path / "index")
+    assert restored.size == 1
+    assert ids(restored.similarity_search_by_vector_with_relevance_scores(vector(0, 1), k=5)) == ["a"]
+
+
+def test_a_second_writer_fails_fast(tmp_path):
+    store = LocalVectorStore(tmp_path / "index")
+    add(store, "a", vector(1, 0))
+
+    with pytest.raises(IndexLocked):
+        LocalVectorStore(tmp_path / "index")
+    with pytest.raises(IndexLocked):
+        with locked_directory(tmp_path / "index", shared=True):
+            pass
+
+    store.close()
+    with locked_directory(tmp_path / "index", shared=True):
+        with pytest.raises(IndexLocked):
+            LocalVectorStore(tmp_path / "index")
+
+
+def test_read_only_open_leaves_the_files_alone(tmp_path):
+    store = LocalVectorStore(tmp_path / "index")
+    add(store, "a", vector(1, 0))
+    # A row the writer is still appending
+    with (tmp_path / "index" / "vectors-0.f32").open("ab") as f:
+        f.write(b"\x00" * 6)
+    (tmp_path / "index" / "vectors-1.f32").write_bytes(b"")
+
+    reader = LocalVectorStore(tmp_path / "index", read_only=True)
+    assert ids(reader.similarity_search_by_vector_with_relevance_scores(vector(1, 0), k=5)) == ["a"]
+    assert (tmp_path / "index" / "vectors-0.f32").stat().st_size == 16 + 6
+    assert (tmp_path / "index" / "vectors-1.f32").exists()
+    with pytest.raises(PermissionError):
+        add(reader, "b", vector(0, 1))
+    reader.close()
+    store.close()
+
+
+def test_get_pages_in_insertion_order(tmp_path):
+    store = LocalVectorStore(tmp_path / "index")
+    for chunk_id in ["a", "b", "c"]:
+        add(store, chunk_id, vector(1, 0))
+
+    assert store.get(limit=2, offset=1)["ids"] == ["b", "c"]
+
+
+def clustered(rng, count, dim=256):
+    # Queries and chunks share the clusters, like questions and chunks of one corpus
+    centres = np.random.default_rng(1).standard_normal((16, dim))
+    return centres[rng.integers(0, 16, count)] + 0.5 * rng.standard_normal((count, dim))
+
+
+@pytest.mark.parametrize("quantization, bytes_per_chunk, min_recall", [("int8", 260, 0.99), ("binary", 32, 0.95)])
+def test_quantized_search_rescores_to_near_exact_recall(tmp_path, quantization, bytes_per_chunk, min_recall):
+    rng = np.random.default_rng(0)
+    vectors = clustered(rng, 2000)
+    exact = LocalVectorStore(tmp_path / "exact")
+    store = LocalVectorStore(tmp_path / quantization, quantization=quantization)
+    for target in (exact, store):
+        target.upsert([str(i) for i in range(2000)], vectors, ["x"] * 2000, [{}] * 2000)
+
+    recalls = []
+    for query in clustered(rng, 50):
+        expected = set(ids(exact.similarity_search_by_vector_with_relevance_scores(query, k=10)))
+        recalls.append(len(expected & set(ids(store.similarity_search_by_vector_with_relevance_scores(query, k=10)))) / 10)
+
+    assert store.bytes_per_chunk == bytes_per_chunk
+    assert exact.bytes_per_chunk == 1024
+    assert np.mean(recalls) >= min_recall
+
+
+def test_codes_are_rebuilt_when_quantization_changes(tmp_path):
+    store = LocalVectorStore(tmp_path / "index")
+    for i in range(4):
+        add(store, f"c{i}", vector(1, i))
+    store.close()
+
+    quantized = LocalVectorStore(tmp_path / "index", quantization="int8")
+    assert (tmp_path / "index" / "codes-0.int8").stat().st_size == 4 * quantized.bytes_per_chunk
+    assert ids(quantized.similarity_search_by_vector_with_relevance_scores(vector(1, 3), k=1)) == ["c3"]
+
+    # Codes follow compaction into the next generation
+    quantized.delete(["c0", "c1", "c2"])
+    assert sorted(p.name for p in (tmp_path / "index").iterdir() if p.suffix != ".db" and "chunks.db" not in p.name) == ["codes-1.int8", "vectors-1.f32"]
+    assert ids(quantized.similarity_search_by_vector_with_relevance_scores(vector(1, 3), k=5)) == ["c3"]
+    quantized.close()
+
+    # Switching back drops the codes of the other setting
+    LocalVectorStore(tmp_path / "index").close()
+    assert not list((tmp_path / "index").glob("codes-*"))
+
+
+def test_rejects_queries_of_another_dimension(tmp_path):
+    store = LocalVectorStore(tmp_path / "index")
+    add(store, "a", vector(1, 0))
+
+    with pytest.raises(ValueError, match="2-dimensional query"):
+        store.similarity_search_by_vector_with_relevance_scores([1.0, 0.0], k=1)
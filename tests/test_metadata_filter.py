@@ -0,0 +1,30 @@
+from vectorstore.filters import MetadataFilter
+
+
+def test_empty_filter_does_not_filter():
+    assert not MetadataFilter()
+    assert MetadataFilter().where() is None
+    assert MetadataFilter().matches({})
+
+
+def test_single_field_is_a_plain_clause():
+    assert MetadataFilter(document_ids=("sr_2015", "sr_2016")).where() == {"document_id": {"$in": ["sr_2015", "sr_2016"]}}
+
+
+def test_fields_are_combined_with_and():
+    where = MetadataFilter(sources=("sr_2019.pdf",), year_from=2018, year_to=2020).where()
+
+    assert where == {"$and": [
+        {"$or": [{"source": {"$in": ["sr_2019.pdf"]}}, {"file_name": {"$in": ["sr_2019.pdf"]}}]},
+        {"year": {"$gte": 2018}},
+        {"year": {"$lte": 2020}},
+    ]}
+
+
+def test_matches_agrees_with_where():
+    filters = MetadataFilter(document_ids=("sr_2019",), sources=("sr_2019.pdf",), year_from=2019, year_to=2019)
+
+    assert filters.matches({"document_id": "sr_2019", "source": "data/sr_2019.pdf", "file_name": "sr_2019.pdf", "year": 2019})
+    assert not filters.matches({"document_id": "sr_2019", "file_name": "sr_2019.pdf", "year": 2018})
+    assert not filters.matches({"document_id": "sr_2019", "file_name": "sr_2019.pdf"})
+    assert not filters.matches({"document_id": "sr_2015", "file_name": "sr_2019.pdf", "year": 2019})
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from unittest.mock import Mock, patch
+
+from vectorstore.onnx_embeddings import pool
+from vectorstore.vectorstore import VectorStoreBuilder
+
+
+def test_mean_pooling_ignores_padding():
+    hidden = np.array([[[1.0, 2.0], [3.0, 4.0], [100.0, 100.0]]])
+
+    pooled = pool(hidden, np.array([[1, 1, 0]]), "mean")
+
+    assert pooled.tolist() == [[2.0, 3.0]]
+
+
+@pytest.mark.parametrize("mask", [[[1, 1, 0]], [[0, 1, 1]]], ids=["right-padded", "left-padded"])
+def test_last_token_pooling_takes_the_last_attended_position(mask):
+    hidden = np.arange(6, dtype=np.float32).reshape(1, 3, 2)
+    last = max(i for i, attended in enumerate(mask[0]) if attended)
+
+    pooled = pool(hidden, np.array(mask), "lasttoken")
+
+    assert pooled.tolist() == [hidden[0, last].tolist()]
+
+
+def test_unknown_pooling_is_rejected():
+    with pytest.raises(ValueError):
+        pool(np.zeros((1, 1, 2)), np.ones((1, 1)), "max")
+
+
+@pytest.fixture
+def onnx_model():
+    with patch("vectorstore.vectorstore.OnnxEmbeddings") as onnx_embeddings, patch("vectorstore.vectorstore.Chroma"):
+        onnx_embeddings.return_value = Mock(model_name="fake-model")
+        yield onnx_embeddings
+
+
+def test_builder_loads_the_onnx_export(onnx_model, tmp_path):
+    builder = VectorStoreBuilder(
+        "test", "localhost", 8000, "fake-model",
+        embedding_backend="onnx", onnx_directory=tmp_path, onnx_quantized=True, onnx_threads=2,
+    )
+
+    onnx_model.assert_called_once_with(tmp_path, quantized=True, intra_op_threads=2, batch_size=64)
+    assert builder.embedding_model is onnx_model.return_value
+
+
+def test_builder_refuses_an_export_of_another_model(onnx_model, tmp_path):
+    with pytest.raises(ValueError, match="fake-model"):
+        VectorStoreBuilder("test", "localhost", 8000, "other-model", embedding_backend="onnx", onnx_directory=tmp_path)
+
+
+def test_quantized_export_is_cached_apart_from_the_model(onnx_model, tmp_path):
+    from vectorstore.embedding_cache import EmbeddingCache
+
+    builder = VectorStoreBuilder(
+        "test", "localhost", 8000, "fake-model", embedding_cache=EmbeddingCache(tmp_path / "cache.db"),
+        embedding_backend="onnx", onnx_directory=tmp_path, onnx_quantized=True,
+    )
+
+    assert builder.cached_embeddings.model_name == "fake-model:onnx-int8"
+
+
+@pytest.fixture(scope="module")
+def exported_model(tmp_path_factory):
+    pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+
+    from vectorstore.onnx_embeddings import export_onnx
+
+    # A small randomly initialised BERT, so the test needs no download
+    directory = tmp_path_factory.mktemp("model")
+    words = "the company reported total emissions energy water board of directors year".split()
+    (directory / "vocab.txt").write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", *words]))
+    transformers.BertTokenizerFast(vocab_file=str(directory / "vocab.txt")).save_pretrained(directory)
+    config = transformers.BertConfig(
+        vocab_size=len(words) + 5, hidden_size=32, num_hidden_layers=2, num_attention_heads=2, intermediate_size=64,
+    )
+    transformers.BertModel(config).save_pretrained(directory)
+
+    models = sentence_transformers.models
+    transformer = models.Transformer(str(directory), max_seq_length=64)
+    model = sentence_transformers.SentenceTransformer(
+        modules=[transformer, models.Pooling(transformer.get_word_embedding_dimension(), "mean"), models.Normalize()]
+    )
+    model.save(str(directory / "sentence-transformer"))
+
+    export = tmp_path_factory.mktemp("onnx")
+    export_onnx(str(directory / "sentence-transformer"), export, quantize=True)
+    return directory / "sentence-transformer", export
+
+
+TEXTS = [
+    "the company reported total emissions",
+    "energy\nwater",
+    "board of directors of the company for the year",
+    "unknown words only",
+]
+
+
+@pytest.mark.parametrize("quantized, tolerance", [(False, 1e-5), (True, 0.05)], ids=["float32", "int8"])
+def test_export_matches_the_pytorch_model(exported_model, quantized, tolerance):
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    from vectorstore.onnx_embeddings import OnnxEmbeddings
+
+    model_path, export = exported_model
+    reference = HuggingFaceEmbeddings(model=str(model_path), model_kwargs={"device": "cpu"})
+    onnx_embeddings = OnnxEmbeddings(export, quantized=quantized, batch_size=3)
+
+    np.testing.assert_allclose(onnx_embeddings.embed_documents(TEXTS), reference.embed_documents(TEXTS), atol=tolerance)
+    np.testing.assert_allclose(onnx_embeddings.embed_query(TEXTS[0]), reference.embed_query(TEXTS[0]), atol=tolerance)
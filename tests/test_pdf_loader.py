@@ -39,3 +39,77 @@ def test_loader_is_initialized_once():
 
         # DirectoryLoader should only be instantiated once
         assert MockDirectoryLoader.call_count == 1
+
+
+def write_pdf(path, pages):
+    pymupdf = pytest.importorskip("pymupdf")
+
+    pdf = pymupdf.open()
+    for text in pages:
+        page = pdf.new_page()
+        page.insert_text((72, 72), text)
+    pdf.save(str(path))
+    pdf.close()
+
+
+def test_parallel_load_is_ordered_and_complete(tmp_path):
+    write_pdf(tmp_path / "b.pdf", ["b page 1", "b page 2"])
+    write_pdf(tmp_path / "a.pdf", ["a page 1"])
+    (tmp_path / "nested").mkdir()
+    write_pdf(tmp_path / "nested" / "c.pdf", ["c page 1"])
+
+    loader = PDFLoader(str(tmp_path), workers=2, chunksize=1)
+
+    docs = loader.load()
+
+    assert [(d.metadata["source"], d.metadata["page"]) for d in docs] == [
+        (str(tmp_path / "a.pdf"), 0),
+        (str(tmp_path / "b.pdf"), 0),
+        (str(tmp_path / "b.pdf"), 1),
+        (str(tmp_path / "nested" / "c.pdf"), 0),
+    ]
+    assert "b page 2" in docs[2].page_content
+    assert loader.errors == {}
+
+
+def test_parallel_load_isolates_corrupt_files(tmp_path):
+    write_pdf(tmp_path / "good.pdf", ["good page"])
+    (tmp_path / "bad.pdf").write_bytes(b"this is not a pdf")
+
+    loader = PDFLoader(str(tmp_path), workers=2)
+
+    docs = loader.load()
+
+    assert [d.metadata["source"] for d in docs] == [str(tmp_path / "good.pdf")]
+    assert list(loader.errors) == [str(tmp_path / "bad.pdf")]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_lazy_load_yields_pages_in_file_order(tmp_path, workers):
+    write_pdf(tmp_path / "a.pdf", ["a page 1", "a page 2"])
+    write_pdf(tmp_path / "b.pdf", ["b page 1"])
+    (tmp_path / "c.pdf").write_bytes(b"corrupt")
+
+    loader = PDFLoader(str(tmp_path), workers=workers, chunksize=1)
+
+    pages = loader.lazy_load()
+    first = next(pages)
+
+    assert first.metadata["source"] == str(tmp_path / "a.pdf")
+    assert [(d.metadata["source"], d.metadata["page"]) for d in [first, *pages]] == [
+        (str(tmp_path / "a.pdf"), 0),
+        (str(tmp_path / "a.pdf"), 1),
+        (str(tmp_path / "b.pdf"), 0),
+    ]
+    assert list(loader.errors) == [str(tmp_path / "c.pdf")]
+
+
+def test_failed_files_are_logged_with_the_traceback(tmp_path, caplog):
+    (tmp_path / "bad.pdf").write_bytes(b"corrupt")
+
+    assert list(PDFLoader(str(tmp_path)).lazy_load()) == []
+
+    (record,) = [r for r in caplog.records if r.name == "ingestion.loader"]
+    assert record.levelname == "WARNING"
+    assert str(tmp_path / "bad.pdf") in record.getMessage()
+    assert record.exc_info is not None
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock
+
+from vectorstore.query_batcher import QueryEmbeddingBatcher
+
+
+def make_embed_batch():
+    return AsyncMock(side_effect=lambda texts: [[float(len(t))] for t in texts])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_are_embedded_in_one_batch():
+    embed_batch = make_embed_batch()
+    batcher = QueryEmbeddingBatcher(embed_batch, max_batch_size=10, max_wait_ms=20)
+
+    results = await asyncio.gather(*(batcher.embed(q) for q in ["a", "bb", "ccc"]))
+
+    assert results == [[1.0], [2.0], [3.0]]
+    embed_batch.assert_awaited_once_with(["a", "bb", "ccc"])
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_flushed_without_waiting():
+    embed_batch = make_embed_batch()
+    batcher = QueryEmbeddingBatcher(embed_batch, max_batch_size=2, max_wait_ms=10_000)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(batcher.embed(q) for q in ["a", "bb", "ccc", "dddd"])),
+        timeout=1,
+    )
+
+    assert results == [[1.0], [2.0], [3.0], [4.0]]
+    assert embed_batch.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_single_query_is_flushed_after_max_wait():
+    embed_batch = make_embed_batch()
+    batcher = QueryEmbeddingBatcher(embed_batch, max_batch_size=32, max_wait_ms=1)
+
+    result = await asyncio.wait_for(batcher.embed("abc"), timeout=1)
+
+    assert result == [3.0]
+    assert batcher.stats()["mean_batch_size"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_is_propagated_to_every_caller():
+    embed_batch = AsyncMock(side_effect=RuntimeError("model crashed"))
+    batcher = QueryEmbeddingBatcher(embed_batch, max_batch_size=10, max_wait_ms=1)
+
+    results = await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -50,4 +50,199 @@ async def test_rag_pipeline_returns_answers_and_sources():
     result = await pipeline.ask("What does NTT Data promote?")
 
     assert "NTT Data promotes sustainability." in result["answer"]
-    assert result["sources"] == [{"source": "doc1.pdf", "file_name": "doc1.pdf", "page": 0}]
\ No newline at end of file
+    assert result["sources"] == [{"source": "doc1.pdf", "file_name": "doc1.pdf", "page": 0}]
+
+@pytest.mark.asyncio
+async def test_rag_pipeline_serves_repeated_question_from_cache():
+    from rag.answer_cache import AnswerCache
+
+    fake_results = [
+        (
+            Document(
+                page_content="NTT Data promotes sustainability.",
+                metadata={"source": "doc1.pdf", "file_name": "doc1.pdf", "page": 0},
+            ),
+            0.01,
+        )
+    ]
+
+    mock_vectorstore = MagicMock()
+    mock_vectorstore.collection_name = "docs"
+    mock_vectorstore.embed_query = AsyncMock(return_value=[1.0, 0.0])
+    mock_vectorstore.search_by_vector = AsyncMock(return_value=fake_results)
+
+    mock_llm = MagicMock()
+    mock_llm.model = "llm"
+    mock_llm.temperature = 0.0
+    mock_llm.generate = AsyncMock(return_value="NTT Data promotes sustainability.")
+
+    pipeline = RAGPipeline(vectorstore=mock_vectorstore, llm=mock_llm, cache=AnswerCache())
+
+    first = await pipeline.ask("What does NTT Data promote?")
+    second = await pipeline.ask("what does ntt data promote")
+    third = await pipeline.ask("What is promoted by NTT Data?")
+
+    assert first == second == third
+    mock_llm.generate.assert_awaited_once()
+    mock_vectorstore.search_by_vector.assert_awaited_once_with([1.0, 0.0], k=3, filters=None)
+
+
+def make_streaming_pipeline(closed):
+    fake_results = [
+        (
+            Document(
+                page_content="NTT Data promotes sustainability.",
+                metadata={"source": "doc1.pdf", "file_name": "doc1.pdf", "page": 0},
+            ),
+            0.01,
+        )
+    ]
+
+    mock_vectorstore = MagicMock()
+    mock_vectorstore.search = AsyncMock(return_value=fake_results)
+
+    async def fake_stream(messages):
+        try:
+            for token in ["NTT Data ", "promotes ", "sustainability."]:
+                yield token
+        finally:
+            closed.append(True)
+
+    mock_llm = MagicMock()
+    mock_llm.stream = fake_stream
+
+    return RAGPipeline(vectorstore=mock_vectorstore, llm=mock_llm)
+
+
+@pytest.mark.asyncio
+async def test_ask_stream_yields_sources_before_tokens():
+    pipeline = make_streaming_pipeline(closed=[])
+
+    events = [event async for event in pipeline.ask_stream("What does NTT Data promote?")]
+
+    assert [e["event"] for e in events] == ["sources", "token", "token", "token", "done"]
+    assert events[0]["data"] == [{"source": "doc1.pdf", "file_name": "doc1.pdf", "page": 0}]
+    assert "".join(e["data"] for e in events if e["event"] == "token") == "NTT Data promotes sustainability."
+
+    assert events[-1]["data"]["time_to_first_token_ms"] > 0
+    assert pipeline.time_to_first_token.snapshot()["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_ask_stream_close_cancels_upstream_generation():
+    closed = []
+    pipeline = make_streaming_pipeline(closed)
+
+    events = pipeline.ask_stream("What does NTT Data promote?")
+    await events.__anext__()
+    await events.__anext__()
+    await events.aclose()
+
+    assert closed == [True]
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    from rag.pipeline import reciprocal_rank_fusion
+
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d"]], k=60)
+
+    assert [key for key, _ in fused] == ["c", "a", "b", "d"]
+    assert fused[0][1] == pytest.approx(1 / 63 + 1 / 61)
+
+
+@pytest.mark.asyncio
+async def test_hybrid_retrieval_fuses_lexical_hits():
+    from vectorstore.lexical_index import LexicalIndex
+
+    def chunk(chunk_id, text):
+        return Document(page_content=text, metadata={"chunk_id": chunk_id, "source": f"{chunk_id}.pdf"})
+
+    index = LexicalIndex()
+    index.add([("sr_2015", "Sustainability report SR_2015 carbon figures"), ("b", "Unrelated carbon text")])
+
+    mock_vectorstore = MagicMock()
+    mock_vectorstore.search = AsyncMock(return_value=[(chunk("b", "Unrelated carbon text"), 0.3), (chunk("c", "Other"), 0.4)])
+    mock_vectorstore.get_by_ids = AsyncMock(return_value=[chunk("sr_2015", "Sustainability report SR_2015 carbon figures")])
+
+    pipeline = RAGPipeline(vectorstore=mock_vectorstore, llm=MagicMock(), lexical_index=index, hybrid_candidates=10)
+    documents = await pipeline._retrieve("SR_2015 carbon", k=2)
+
+    # Dense candidates are over-fetched for fusion
+    assert mock_vectorstore.search.call_args.kwargs["k"] == 10
+    mock_vectorstore.get_by_ids.assert_awaited_once_with(["sr_2015"])
+    # "b" is found by both retrievers; the lexical-only hit outranks the dense-only "c"
+    assert [doc.metadata["chunk_id"] for doc in documents] == ["b", "sr_2015"]
+
+
+@pytest.mark.asyncio
+async def test_hybrid_retrieval_drops_lexical_hits_outside_filters():
+    from vectorstore.filters import MetadataFilter
+    from vectorstore.lexical_index import LexicalIndex
+
+    def chunk(chunk_id, year):
+        return Document(page_content="carbon", metadata={"chunk_id": chunk_id, "year": year})
+
+    index = LexicalIndex()
+    index.add([("old", "carbon"), ("new", "carbon")])
+
+    mock_vectorstore = MagicMock()
+    mock_vectorstore.search = AsyncMock(return_value=[])
+    mock_vectorstore.get_by_ids = AsyncMock(return_value=[chunk("old", 2015), chunk("new", 2020)])
+
+    pipeline = RAGPipeline(vectorstore=mock_vectorstore, llm=MagicMock(), lexical_index=index)
+    filters = MetadataFilter(year_from=2019)
+    documents = await pipeline._retrieve("carbon", k=3, filters=filters)
+
+    assert mock_vectorstore.search.call_args.kwargs["filters"] == filters
+    assert [doc.metadata["chunk_id"] for doc in documents] == ["new"]
+
+
+@pytest.mark.asyncio
+async def test_packed_context_reports_token_savings():
+    from rag.answer_cache import AnswerCache
+    from rag.context import ContextPacker
+
+    text = "NTT Data promotes sustainability across its data centres and offices."
+    fake_results = [
+        (Document(page_content=text, metadata={"source": "doc1.pdf", "file_name": "doc1.pdf", "page": 0, "chunk_id": "a"}), 0.01),
+        (Document(page_content=text, metadata={"source": "doc2.pdf", "file_name": "doc2.pdf", "page": 3, "chunk_id": "b"}), 0.02),
+    ]
+
+    mock_vectorstore = MagicMock()
+    mock_vectorstore.search = AsyncMock(return_value=fake_results)
+    mock_vectorstore.collection_name = "test"
+
+    mock_llm = MagicMock()
+    mock_llm.generate = AsyncMock(return_value="Sustainability.")
+    mock_llm.model = "test-model"
+    mock_llm.temperature = 0.0
+
+    pipeline = RAGPipeline(vectorstore=mock_vectorstore, llm=mock_llm, cache=AnswerCache(semantic_distance=0), packer=ContextPacker(max_tokens=1000))
+
+    result = await pipeline.ask("What does NTT Data promote?")
+
+    assert result["sources"] == [{"source": "doc1.pdf", "file_name": "doc1.pdf", "page": 0}]
+    assert result["context"]["chunks_duplicate"] == 1
+    assert result["context"]["tokens_saved"] > 0
+    assert text in mock_llm.generate.await_args.args[0][1].content
+
+    # Cached answers did not spend prompt tokens, so they carry no packing report
+    assert "context" not in await pipeline.ask("What does NTT Data promote?")
+
+
+@pytest.mark.asyncio
+async def test_reranker_receives_over_fetched_candidates():
+    candidates = [(Document(page_content=f"chunk {i}", metadata={"chunk_id": str(i)}), 0.1) for i in range(10)]
+
+    mock_vectorstore = MagicMock()
+    mock_vectorstore.search = AsyncMock(return_value=candidates)
+
+    reranker = MagicMock()
+    reranker.rerank = AsyncMock(side_effect=lambda question, documents, top_n: list(reversed(documents))[:top_n])
+
+    pipeline = RAGPipeline(vectorstore=mock_vectorstore, llm=MagicMock(), reranker=reranker, rerank_candidates=10)
+
+    documents = await pipeline._retrieve("What is SAP?", k=2)
+
+    mock_vectorstore.search.assert_awaited_once_with(query="What is SAP?", k=10, filters=None)
+    assert [doc.metadata["chunk_id"] for doc in documents] == ["9", "8"]
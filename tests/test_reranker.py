@@ -0,0 +1,69 @@
+import pytest
+from unittest.mock import patch
+
+from langchain_core.documents import Document
+
+from rag.reranker import CrossEncoderReranker
+
+
+def doc(chunk_id, text):
+    return Document(page_content=text, metadata={"chunk_id": chunk_id})
+
+
+def fake_scores(model_name, batch_size, pairs):
+    # Longer passages score higher, which is enough to check ordering
+    return [float(len(text)) for _, text in pairs]
+
+
+CANDIDATES = [doc("a", "x"), doc("b", "xxx"), doc("c", "xx"), doc("d", "xxxx")]
+
+
+@pytest.mark.asyncio
+async def test_rerank_keeps_best_scored_top_n():
+    reranker = CrossEncoderReranker("test-model")
+
+    with patch("rag.reranker.score_pairs", side_effect=fake_scores):
+        reranked = await reranker.rerank("q", CANDIDATES, top_n=2)
+
+    assert [d.metadata["chunk_id"] for d in reranked] == ["d", "b"]
+
+
+@pytest.mark.asyncio
+async def test_scores_are_cached_per_question_and_chunk():
+    reranker = CrossEncoderReranker("test-model")
+
+    with patch("rag.reranker.score_pairs", side_effect=fake_scores) as scorer:
+        await reranker.rerank("q", CANDIDATES, top_n=2)
+        await reranker.rerank("q", CANDIDATES[:2] + [doc("e", "xxxxx")], top_n=2)
+        await reranker.rerank("other question", CANDIDATES[:1], top_n=1)
+
+    # One batch per call, each with only the pairs not scored before
+    assert [len(call.args[2]) for call in scorer.call_args_list] == [4, 1, 1]
+    assert reranker.stats()["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used_scores():
+    reranker = CrossEncoderReranker("test-model", cache_size=2)
+
+    with patch("rag.reranker.score_pairs", side_effect=fake_scores):
+        await reranker.rerank("q", CANDIDATES, top_n=1)
+
+    assert reranker.stats()["cached_scores"] == 2
+
+
+@pytest.mark.asyncio
+async def test_scoring_runs_on_the_embedding_executor():
+    from langchain_core.embeddings import FakeEmbeddings
+
+    from vectorstore.embedding_executor import EmbeddingExecutor
+
+    executor = EmbeddingExecutor(FakeEmbeddings(size=4))
+    reranker = CrossEncoderReranker("test-model", executor=executor)
+
+    with patch("rag.reranker.score_pairs", side_effect=fake_scores):
+        reranked = await reranker.rerank("q", CANDIDATES, top_n=1)
+
+    assert reranked[0].metadata["chunk_id"] == "d"
+    assert executor.stats()["run_time"]["count"] == 1
+    executor.shutdown()
@@ -0,0 +1,87 @@
+import json
+
+from pathlib import Path
+
+from ingestion.sqlite_version_manager import SQLiteVersionManager
+from ingestion.version_manager import VersionManager
+
+
+def test_register_and_lookup(tmp_path: Path):
+    vm = SQLiteVersionManager(tmp_path / "versions.db")
+    vm.register_version("sr_2015", "abc123", "sr_2015_20150301_v01.pdf", {"c1": "h1", "c2": "h2"})
+    vm.add_source("sr_2015", "abc123", "copy.pdf")
+    vm.save()
+    vm.close()
+
+    loaded = SQLiteVersionManager(tmp_path / "versions.db")
+    doc = loaded.get_document("sr_2015")
+
+    assert doc["current_hash"] == "abc123"
+    assert doc["versions"]["abc123"]["chunk_hashes"] == {"c1": "h1", "c2": "h2"}
+    assert doc["versions"]["abc123"]["sources"] == ["sr_2015_20150301_v01.pdf", "copy.pdf"]
+    assert loaded.get_document("missing") is None
+
+
+def test_unsaved_writes_are_not_persisted(tmp_path: Path):
+    vm = SQLiteVersionManager(tmp_path / "versions.db")
+    vm.register_version("sr_2015", "h1", "a.pdf", {"c1": "h1"})
+    vm.save()
+    vm.register_version("sr_2016", "h2", "b.pdf", {"c2": "h2"})
+
+    # A second connection only sees committed documents
+    other = SQLiteVersionManager(tmp_path / "versions.db")
+    assert other.get_document("sr_2015") is not None
+    assert other.get_document("sr_2016") is None
+
+
+def test_prune_history_keeps_current_version(tmp_path: Path):
+    vm = SQLiteVersionManager(tmp_path / "versions.db")
+    for i in range(4):
+        vm.register_version("sr_2015", f"h{i}", "a.pdf", {"c1": f"h{i}"}, last_indexed=f"2024-01-0{i + 1}")
+
+    assert vm.prune_history(keep=2) == 2
+    assert vm.get_version("sr_2015", "h3") is not None
+    assert vm.get_version("sr_2015", "h2") is not None
+    assert vm.get_version("sr_2015", "h1") is None
+
+
+def test_keep_versions_prunes_on_register(tmp_path: Path):
+    vm = SQLiteVersionManager(tmp_path / "versions.db", keep_versions=1)
+    vm.register_version("sr_2015", "h1", "a.pdf", {"c1": "h1"})
+    vm.register_version("sr_2015", "h2", "a.pdf", {"c1": "h2"})
+
+    assert vm.get_version("sr_2015", "h1") is None
+    assert vm.get_document("sr_2015")["current_hash"] == "h2"
+
+
+def test_fingerprints(tmp_path: Path):
+    vm = SQLiteVersionManager(tmp_path / "versions.db")
+    vm.record_fingerprint("sr_2015", "a.pdf", {"size": 1, "mtime_ns": 2})
+
+    assert vm.is_unchanged("a.pdf", {"size": 1, "mtime_ns": 2})
+    assert not vm.is_unchanged("a.pdf", {"size": 1, "mtime_ns": 3})
+    assert vm.get_fingerprint("b.pdf") is None
+
+
+def test_migrate_json_imports_existing_versions(tmp_path: Path):
+    json_file = tmp_path / "versions.json"
+    legacy = VersionManager(json_file)
+    legacy.register_version("sr_2015", "old", "a.pdf", {"c1": "h0"})
+    legacy.register_version("sr_2015", "new", "a.pdf", {"c1": "h1", "c2": "h2"})
+    legacy.add_source("sr_2015", "new", "b.pdf")
+    legacy.record_fingerprint("sr_2015", "a.pdf", {"size": 1, "mtime_ns": 2})
+    legacy.save()
+
+    vm = SQLiteVersionManager.migrate_json(json_file, tmp_path / "versions.db")
+
+    expected = json.loads(json_file.read_text())["sr_2015"]
+    doc = vm.get_document("sr_2015")
+    assert doc["current_hash"] == "new"
+    assert doc["versions"]["new"] == expected["versions"]["new"]
+    assert vm.get_version("sr_2015", "old") == expected["versions"]["old"]
+    assert vm.is_unchanged("a.pdf", {"size": 1, "mtime_ns": 2})
+
+    # Reopening does not import twice
+    vm.close()
+    reopened = SQLiteVersionManager.migrate_json(json_file, tmp_path / "versions.db")
+    assert reopened.document_count() == 1
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from unittest.mock import patch
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from vectorstore.truncated_embeddings import TruncatedEmbeddings, truncate
+from vectorstore.vectorstore import VectorStoreBuilder
+
+
+def test_truncate_keeps_leading_components_at_unit_length():
+    (vector,) = truncate([[3.0, 4.0, 12.0]], 2)
+
+    assert vector == pytest.approx([0.6, 0.8])
+
+
+def test_documents_and_queries_are_truncated_alike():
+    embeddings = TruncatedEmbeddings(DeterministicFakeEmbedding(size=32), 8)
+
+    (document,) = embeddings.embed_documents(["Carbon emissions"])
+    query = embeddings.embed_query("Carbon emissions")
+
+    assert len(document) == len(query) == 8
+    assert np.linalg.norm(document) == pytest.approx(1.0)
+    assert document == pytest.approx(query)
+
+
+@pytest.fixture
+def builder_factory(tmp_path):
+    def build(dimension, directory="index"):
+        with patch("vectorstore.vectorstore.HuggingFaceEmbeddings", lambda **kwargs: DeterministicFakeEmbedding(size=32)):
+            return VectorStoreBuilder(
+                "test", "localhost", 8000, "fake", backend="local", local_directory=tmp_path / directory, embedding_dimension=dimension
+            )
+    return build
+
+
+def test_builder_truncates_at_ingest_and_query_time(builder_factory):
+    from langchain_core.documents import Document
+
+    builder = builder_factory(8)
+    builder.add([Document(page_content="SAP migration", metadata={"chunk_id": "a"})])
+
+    assert builder.vector_store.dim == 8
+    assert len(builder.embedding_model.embed_query("SAP")) == 8
+    # Process workers build their own model through the factory
+    assert len(builder.embedding_factory().embed_query("SAP")) == 8
+
+
+def test_mixed_dimensions_are_refused(builder_factory):
+    from langchain_core.documents import Document
+
+    builder = builder_factory(8)
+    builder.add([Document(page_content="SAP migration", metadata={"chunk_id": "a"})])
+    builder.ensure_dimension()
+    builder.close()
+
+    for dimension in (16, None):
+        builder = builder_factory(dimension)
+        with pytest.raises(ValueError, match="8-dimensional"):
+            builder.ensure_dimension()
+        builder.close()
+
+
+def test_dimension_above_the_model_output_is_refused(builder_factory):
+    with pytest.raises(ValueError, match="exceeds the 32 dimensions"):
+        builder_factory(64)
+
+
+def test_chroma_dimension_is_read_from_a_stored_vector():
+    with patch("vectorstore.vectorstore.HuggingFaceEmbeddings") as embeddings, patch("vectorstore.vectorstore.Chroma") as chroma:
+        embeddings.return_value.embed_query.return_value = [0.1] * 1024
+        chroma.return_value._collection.get.return_value = {"embeddings": np.zeros((1, 1024))}
+        builder = VectorStoreBuilder("test", "localhost", 8000, "fake", embedding_dimension=256)
+
+    assert builder.stored_dimension() == 1024
+    with pytest.raises(ValueError, match="1024-dimensional"):
+        builder.ensure_dimension()
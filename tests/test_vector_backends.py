@@ -0,0 +1,133 @@
+"""
+Behaviour both vector store backends must share, run against an in-process Chroma
+client and the local store with and without quantized vectors.
+"""
+import uuid
+
+from functools import partial
+from unittest.mock import patch
+
+import pytest
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from ingestion.version_manager import VersionManager
+from vectorstore.filters import MetadataFilter
+from vectorstore.vectorstore import VectorStoreBuilder
+from vectorstore.versioned_store import VersionedVectorStore
+
+
+@pytest.fixture(params=["chroma", "local", "local-int8", "local-binary"])
+def builder(request, tmp_path):
+    embeddings = DeterministicFakeEmbedding(size=16)
+
+    with patch("vectorstore.vectorstore.HuggingFaceEmbeddings", lambda **kwargs: embeddings):
+        if request.param == "chroma":
+            chromadb = pytest.importorskip("chromadb")
+            from langchain_chroma import Chroma
+
+            with patch("vectorstore.vectorstore.Chroma", partial(Chroma, client=chromadb.EphemeralClient())):
+                builder = VectorStoreBuilder(f"test-{uuid.uuid4().hex}", "localhost", 8000, "fake")
+        else:
+            quantization = request.param.partition("-")[2] or "none"
+            builder = VectorStoreBuilder(
+                "test", "localhost", 8000, "fake", backend="local", local_directory=tmp_path / "index", quantization=quantization
+            )
+
+    yield builder
+    builder.close()
+
+
+def chunk(chunk_id, text, document_id="sr_2015", year=2015):
+    return Document(
+        page_content=text,
+        metadata={"chunk_id": chunk_id, "source": f"data/{document_id}.pdf", "file_name": f"{document_id}.pdf", "document_id": document_id, "year": year},
+    )
+
+
+CHUNKS = [
+    chunk("a", "Carbon emissions fell in 2015"),
+    chunk("b", "SAP migration programme", document_id="sr_2019", year=2019),
+    chunk("c", "Diversity figures for employees", document_id="sr_2019", year=2019),
+]
+
+
+def ids(results):
+    return [doc.metadata["chunk_id"] for doc, _ in results]
+
+
+@pytest.mark.asyncio
+async def test_add_then_search_returns_the_matching_chunk(builder):
+    builder.add(CHUNKS)
+
+    results = await builder.search("SAP migration programme", k=2)
+
+    assert ids(results)[0] == "b"
+    assert results[0][0].page_content == "SAP migration programme"
+    assert results[0][0].metadata["year"] == 2019
+
+
+@pytest.mark.asyncio
+async def test_scores_are_distances_with_the_best_match_first(builder):
+    builder.add(CHUNKS)
+
+    results = await builder.search("SAP migration programme", k=3)
+    scores = [score for _, score in results]
+
+    assert scores == sorted(scores)
+    assert scores[0] == pytest.approx(0.0, abs=1e-4)
+    assert scores[-1] > scores[0]
+
+
+@pytest.mark.asyncio
+async def test_bulk_add_then_search_by_vector(builder):
+    builder.bulk_add(CHUNKS, batch_size=2)
+
+    embedding = builder.embedding_model.embed_query("Diversity figures for employees")
+    assert ids(await builder.search_by_vector(embedding, k=1)) == ["c"]
+
+
+@pytest.mark.asyncio
+async def test_filters_are_applied_by_the_backend(builder):
+    builder.add(CHUNKS)
+
+    by_document = await builder.search("Carbon emissions fell in 2015", k=3, filters=MetadataFilter(document_ids=("sr_2019",)))
+    by_year = await builder.search("SAP", k=3, filters=MetadataFilter(year_from=2010, year_to=2016))
+    by_file = await builder.search("SAP", k=3, filters=MetadataFilter(sources=("sr_2015.pdf",)))
+
+    assert set(ids(by_document)) == {"b", "c"}
+    assert ids(by_year) == ["a"]
+    assert ids(by_file) == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_ingest_adds_and_deletes_incrementally(builder, tmp_path):
+    versioned = VersionedVectorStore(builder, VersionManager(tmp_path / "versions.json"))
+    versioned.ingest(document_id="sr_2015", source="sr_2015.pdf", chunks=CHUNKS[:2])
+
+    changed = chunk("d", "Carbon emissions rose in 2016")
+    result = versioned.ingest(document_id="sr_2015", source="sr_2015.pdf", chunks=[CHUNKS[1], changed])
+
+    assert result["added"] == 1 and result["deleted"] == 1
+    assert [doc.metadata["chunk_id"] for doc in await builder.get_by_ids(["a", "b", "d"])] == ["b", "d"]
+    assert "a" not in ids(await builder.search("Carbon emissions fell in 2015", k=3))
+
+
+def test_iter_texts_pages_through_every_chunk(builder):
+    builder.add(CHUNKS)
+
+    pages = list(builder.iter_texts(batch_size=2))
+
+    assert [len(page) for page in pages] == [2, 1]
+    assert dict(text for page in pages for text in page) == {c.metadata["chunk_id"]: c.page_content for c in CHUNKS}
+
+
+@pytest.mark.asyncio
+async def test_upsert_replaces_a_chunk_with_the_same_id(builder):
+    builder.bulk_add(CHUNKS)
+    builder.bulk_add([chunk("b", "Renewable energy contracts", document_id="sr_2019", year=2019)])
+
+    (replaced,) = await builder.get_by_ids(["b"])
+    assert replaced.page_content == "Renewable energy contracts"
+    assert ids(await builder.search("Renewable energy contracts", k=1)) == ["b"]
@@ -78,9 +78,111 @@ async def test_search(vector_store_builder):
     results = await vector_store_builder.search(query, k=k)
     
     vector_store_builder.vector_store.asimilarity_search_with_score.assert_called_once_with(
-        query, k=k
+        query, k=k, filter=None
     )
     
     assert len(results) == 2
     assert isinstance(results[0][0], Document)
     assert isinstance(results[0][1], float)
+
+
+@pytest.mark.asyncio
+async def test_search_uses_embedding_executor(vector_store_builder):
+    """Test that the query is embedded on the executor and searched by vector"""
+    executor = Mock()
+    executor.embed_query = AsyncMock(return_value=[0.1, 0.2])
+    vector_store_builder.embedding_executor = executor
+    vector_store_builder.vector_store.similarity_search_by_vector_with_relevance_scores = Mock(
+        return_value=[(Document(page_content="Test content 1"), 0.95)]
+    )
+
+    results = await vector_store_builder.search("test query", k=1)
+
+    executor.embed_query.assert_awaited_once_with("test query")
+    vector_store_builder.vector_store.similarity_search_by_vector_with_relevance_scores.assert_called_once_with(
+        [0.1, 0.2], 1, filter=None
+    )
+    vector_store_builder.vector_store.asimilarity_search_with_score.assert_not_called()
+    assert len(results) == 1
+
+
+def test_embedding_cache_wraps_document_embeddings(mock_embedding_model, mock_chroma, tmp_path):
+    """Test that Chroma embeds documents through the on-disk cache when configured"""
+    from vectorstore.embedding_cache import CachedEmbeddings, EmbeddingCache
+
+    builder = VectorStoreBuilder(
+        collection_name="test_collection",
+        host="localhost",
+        port=8000,
+        embedding_model="sentence-transformers/all-MiniLM-L6-v2",
+        embedding_cache=EmbeddingCache(tmp_path / "cache.sqlite"),
+    )
+
+    embedding_function = mock_chroma.call_args.kwargs["embedding_function"]
+    assert isinstance(embedding_function, CachedEmbeddings)
+    assert embedding_function.embeddings is builder.embedding_model
+
+
+def test_bulk_add_upserts_precomputed_embeddings(vector_store_builder):
+    vector_store_builder.embedding_model.embed_documents.side_effect = lambda texts: [[0.1, 0.2] for _ in texts]
+    vector_store_builder.vector_store._client.get_max_batch_size.return_value = 2
+    documents = [
+        Document(page_content=f"Chunk {i}", metadata={"chunk_id": f"id{i}", "source": "doc.pdf"})
+        for i in range(3)
+    ]
+
+    stats = vector_store_builder.bulk_add(documents, batch_size=100)
+
+    # The server's maximum batch size wins over the requested one
+    assert stats["batches"] == 2
+    upsert = vector_store_builder.vector_store._collection.upsert
+    assert upsert.call_count == 2
+    assert upsert.call_args_list[0].kwargs["ids"] == ["id0", "id1"]
+    assert upsert.call_args_list[1].kwargs["embeddings"] == [[0.1, 0.2]]
+    vector_store_builder.vector_store.add_documents.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_search_pushes_filters_down_as_where_clause(vector_store_builder):
+    from vectorstore.filters import MetadataFilter
+
+    vector_store_builder.vector_store.asimilarity_search_with_score = AsyncMock(return_value=[])
+
+    await vector_store_builder.search("emissions", k=4, filters=MetadataFilter(document_ids=("sr_2015",), year_from=2015))
+
+    vector_store_builder.vector_store.asimilarity_search_with_score.assert_called_once_with(
+        "emissions",
+        k=4,
+        filter={"$and": [{"document_id": {"$in": ["sr_2015"]}}, {"year": {"$gte": 2015}}]},
+    )
+
+
+def test_quantization_requires_the_local_backend(mock_embedding_model, mock_chroma):
+    with pytest.raises(ValueError, match="local"):
+        VectorStoreBuilder("test_collection", "localhost", 8000, "model", quantization="int8")
+
+
+def test_bulk_add_looks_up_the_cache_by_chunk_content_hash(mock_embedding_model, mock_chroma, tmp_path):
+    from vectorstore.embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache(tmp_path / "cache.sqlite")
+    builder = VectorStoreBuilder(
+        collection_name="test_collection",
+        host="localhost",
+        port=8000,
+        embedding_model="model",
+        embedding_cache=cache,
+        chunk_hash_algorithm="blake2b",
+    )
+    builder.embedding_model.embed_documents.side_effect = lambda texts: [[0.1, 0.2] for _ in texts]
+    mock_chroma.return_value._client.get_max_batch_size.return_value = 10
+    documents = [
+        Document(page_content=f"Chunk {i}", metadata={"chunk_id": f"id{i}", "content_hash": f"hash{i}"})
+        for i in range(3)
+    ]
+
+    with patch.object(builder.cached_embeddings.hasher, "content_hash") as rehash:
+        builder.bulk_add(documents)
+
+    rehash.assert_not_called()
+    assert sorted(cache.get_many("model:blake2b", ["hash0", "hash1", "hash2"])) == ["hash0", "hash1", "hash2"]
@@ -1,11 +1,16 @@
+import os
 from pathlib import Path
 from langchain_core.documents import Document
 
+import pytest
+
 from ingestion.version_manager import (
     VersionManager,
+    VersionStore,
     hash_chunk_content,
     hash_document_chunks,
     diff_chunks,
+    file_fingerprint,
 )
 
 
@@ -80,3 +85,49 @@ def test_add_source_same_content(tmp_path: Path):
     assert version is not None
     assert set(version["sources"]) == {"a.pdf", "b.pdf"}
     assert len(version["sources"]) == 2
+
+
+def test_file_fingerprint_tracks_size_mtime_and_content(tmp_path: Path):
+    path = tmp_path / "a.pdf"
+    path.write_bytes(b"one")
+
+    fingerprint = file_fingerprint(str(path), content_hash=True)
+    assert fingerprint["size"] == 3
+    assert file_fingerprint(str(path), content_hash=True) == fingerprint
+
+    # Same size and mtime, different bytes: only the content hash notices
+    stat = path.stat()
+    path.write_bytes(b"two")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert file_fingerprint(str(path)) == {"size": 3, "mtime_ns": stat.st_mtime_ns}
+    assert file_fingerprint(str(path), content_hash=True) != fingerprint
+
+
+def test_fingerprint_moves_with_source(tmp_path: Path):
+    vm = VersionManager(tmp_path / "versions.json")
+    vm.register_version("sr_2015", "h1", "a.pdf", {"c1": "h1"})
+    vm.register_version("sr_2016", "h2", "b.pdf", {"c2": "h2"})
+
+    vm.record_fingerprint("sr_2015", "a.pdf", {"size": 1, "mtime_ns": 1})
+    vm.record_fingerprint("sr_2016", "a.pdf", {"size": 2, "mtime_ns": 2})
+
+    assert "a.pdf" not in vm.get_document("sr_2015")["fingerprints"]
+    assert vm.get_fingerprint("a.pdf") == {"size": 2, "mtime_ns": 2}
+
+
+def test_prune_history(tmp_path: Path):
+    vm = VersionManager(tmp_path / "versions.json", keep_versions=2)
+    for i in range(3):
+        vm.register_version("sr_2015", f"h{i}", "a.pdf", {"c1": f"h{i}"})
+
+    assert set(vm.get_document("sr_2015")["versions"]) == {"h1", "h2"}
+
+
+def test_version_stores_must_implement_the_storage_methods():
+    class Partial(VersionStore):
+        def get_fingerprint(self, source):
+            return None
+
+    with pytest.raises(TypeError, match="_prune"):
+        Partial()
@@ -149,3 +149,100 @@ def test_partial_chunk_content_change(tmp_path):
 
     assert deleted_ids == ["c2"]
     assert added_chunks[0].metadata["chunk_id"] == "c2"
+
+
+def test_listeners_are_notified_only_when_corpus_changes(tmp_path):
+    store = make_store()
+    versions = VersionManager(tmp_path / "versions.json")
+    vvs = VersionedVectorStore(store, versions)
+
+    notifications = []
+    vvs.subscribe(lambda: notifications.append(True))
+
+    chunks = [make_chunk("hello", "c1", document_id="doc")]
+
+    vvs.ingest("doc", "doc_v1.pdf", chunks)
+    vvs.ingest("doc", "doc_v1.pdf", chunks)
+
+    assert len(notifications) == 1
+
+    vvs.ingest("doc", "doc_v1.pdf", [make_chunk("hello updated", "c1", document_id="doc")])
+
+    assert len(notifications) == 2
+
+
+def test_changes_rewrite_the_generation_file(tmp_path):
+    versions = VersionManager(tmp_path / "versions.json")
+    vvs = VersionedVectorStore(make_store(), versions, generation_file=tmp_path / "generation")
+
+    vvs.ingest("doc", "doc_v1.pdf", [make_chunk("hello", "c1", document_id="doc")])
+    first = (tmp_path / "generation").read_text()
+    vvs.ingest("doc", "doc_v1.pdf", [make_chunk("hello", "c1", document_id="doc")])
+    assert (tmp_path / "generation").read_text() == first
+
+    vvs.ingest("doc", "doc_v1.pdf", [make_chunk("hello updated", "c1", document_id="doc")])
+    assert (tmp_path / "generation").read_text() != first
+
+
+def test_ingest_records_fingerprint(tmp_path):
+    versions = VersionManager(tmp_path / "versions.json")
+    vs = VersionedVectorStore(make_store(), versions)
+    fingerprint = {"size": 10, "mtime_ns": 1}
+
+    vs.ingest(document_id="doc", source="doc_v1.pdf", chunks=[make_chunk("hello", "1")], fingerprint=fingerprint)
+
+    reloaded = VersionManager(tmp_path / "versions.json")
+    assert reloaded.is_unchanged("doc_v1.pdf", fingerprint)
+    assert not reloaded.is_unchanged("doc_v1.pdf", {"size": 11, "mtime_ns": 1})
+
+
+def test_batch_size_routes_through_bulk_add(tmp_path):
+    store = make_store()
+    store.bulk_add.return_value = {"chunks": 2, "batches": 1, "retries": 0, "chunks_per_second": 10.0}
+    vs = VersionedVectorStore(store, VersionManager(tmp_path / "versions.json"), batch_size=128)
+
+    vs.ingest(document_id="doc", source="doc_v1.pdf", chunks=[make_chunk("hello", "1"), make_chunk("world", "2")])
+
+    store.add.assert_not_called()
+    assert store.bulk_add.call_args.kwargs == {"batch_size": 128, "max_retries": 3}
+
+
+def test_partial_update_with_sqlite_versions(tmp_path):
+    from ingestion.sqlite_version_manager import SQLiteVersionManager
+
+    store = make_store()
+    vs = VersionedVectorStore(store, SQLiteVersionManager(tmp_path / "versions.db"))
+
+    vs.ingest(document_id="doc", source="doc_v1.pdf", chunks=[make_chunk("a", "1"), make_chunk("b", "2")])
+    result = vs.ingest(document_id="doc", source="doc_v2.pdf", chunks=[make_chunk("a", "1"), make_chunk("c", "3")])
+
+    assert result == {"added": 1, "deleted": 1}
+    store.vector_store.delete.assert_called_once_with(ids=["2"])
+
+
+def test_lexical_index_follows_adds_and_deletes(tmp_path):
+    from vectorstore.lexical_index import LexicalIndex
+
+    index = LexicalIndex(tmp_path / "lexical")
+    vs = VersionedVectorStore(make_store(), VersionManager(tmp_path / "versions.json"), lexical_index=index)
+
+    vs.ingest(document_id="doc", source="doc_v1.pdf", chunks=[make_chunk("carbon report", "1"), make_chunk("SAP migration", "2")])
+    vs.ingest(document_id="doc", source="doc_v2.pdf", chunks=[make_chunk("carbon report", "1"), make_chunk("SAP licensing", "3")])
+
+    assert [chunk_id for chunk_id, _ in index.search("SAP")] == ["3"]
+    # Each ingest flushes the journal, so a fresh index sees the same state
+    assert [chunk_id for chunk_id, _ in LexicalIndex(tmp_path / "lexical").search("SAP")] == ["3"]
+
+
+def test_backfill_lexical_index_from_store(tmp_path):
+    from vectorstore.lexical_index import LexicalIndex
+
+    store = make_store()
+    store.iter_texts.return_value = iter([[("1", "carbon report")], [("2", "SAP migration")]])
+    index = LexicalIndex(tmp_path / "lexical")
+    vs = VersionedVectorStore(store, VersionManager(tmp_path / "versions.json"), lexical_index=index)
+
+    assert vs.backfill_lexical_index() == 2
+    assert [chunk_id for chunk_id, _ in index.search("SAP")] == ["2"]
+    # A populated index is left alone
+    assert vs.backfill_lexical_index() == 0